@@ -0,0 +1,306 @@
+"""
+Пакетний (без інтерфейсу) запуск операцій програми
+
+Приклади:
+    python batch.py export --user-id 1 --output history.csv.gz
+    python batch.py export --user-id 1 --output history_dir --columnar
+    python batch.py import --user-id 1 --input history.csv --batch-size 5000
+    python batch.py calc working-days --input ranges.txt --output result.csv
+    python batch.py recur "FREQ=WEEKLY;BYDAY=MO,WE" --start 2024-01-01 --end 2024-12-31
+    python batch.py snapshot --rebuild
+    python batch.py retention
+    python batch.py reminders --holidays 2024
+
+Параметр --profile КАТАЛОГ (перед назвою команди) виконує команду під
+cProfile та tracemalloc і записує звіти у каталог (див. profiling.py).
+Команди calc, recur та reminders перед роботою будують знімок календарних
+таблиць (calendar_snapshot.py), якщо він відсутній або застарів.
+"""
+
+import argparse
+import csv
+import json
+import sys
+import time
+
+from main import DateTimeCalculator, DatabaseManager
+
+# Операції calc: назва -> (метод калькулятора, кількість полів у рядку)
+CALC_OPERATIONS = {
+    "difference": ("calculate_date_difference", 2),
+    "weekday": ("get_day_of_week", 1),
+    "add-days": ("add_days_to_date", 2),
+    "age": ("get_age", 1),
+    "working-days": ("get_working_days", 2)
+}
+
+
+def _print_progress(rows, seconds, rate):
+    """Виведення прогресу пакетної операції"""
+    print(f"\rОброблено {rows} рядків за {seconds:.1f} с ({rate:.0f} рядків/с)",
+          end="", flush=True)
+
+
+def run_export(args, db_manager):
+    """Експорт історії користувача у CSV або колонковий формат"""
+    if args.columnar:
+        from columnar import export_history_columnar
+
+        stats = export_history_columnar(db_manager, args.user_id, args.output,
+                                        args.chunk_size)
+    else:
+        from utils import stream_calculations_to_csv
+
+        stats = stream_calculations_to_csv(db_manager, args.user_id, args.output,
+                                           args.chunk_size,
+                                           progress_callback=_print_progress)
+        print()
+
+    if stats is None:
+        return 1
+    print(f"Експорт завершено: {stats}")
+    return 0
+
+
+def run_import(args, db_manager):
+    """Імпорт обчислень з CSV у базу даних"""
+    from utils import import_calculations_to_database
+
+    stats = import_calculations_to_database(db_manager, args.user_id, args.input,
+                                            args.batch_size,
+                                            use_load_data=args.load_data,
+                                            progress_callback=_print_progress)
+    print()
+
+    if stats is None or not stats["completed"]:
+        return 1
+    print(f"Імпорт завершено: {stats}")
+    return 0
+
+
+def run_calc(args, db_manager=None):
+    """Обчислення для кожного рядка вхідного файлу (поля через кому)
+
+    Результат записується в CSV як JSON, помилка - в окрему колонку.
+    """
+    method_name, fields = CALC_OPERATIONS[args.operation]
+    method = getattr(DateTimeCalculator(), method_name)
+    processed = errors = 0
+    started = time.perf_counter()
+
+    try:
+        with open(args.input, 'r', encoding='utf-8') as infile, \
+                open(args.output, 'w', newline='', encoding='utf-8') as outfile:
+            writer = csv.writer(outfile)
+            writer.writerow(['Вхідні дані', 'Результат', 'Помилка'])
+
+            for line in infile:
+                line = line.strip()
+                if not line:
+                    continue
+
+                values = [value.strip() for value in line.split(",")]
+                try:
+                    if len(values) != fields:
+                        raise ValueError(f"очікується полів: {fields}")
+                    if method_name == "add_days_to_date":
+                        values[1] = int(values[1])
+                    result = json.dumps(method(*values), ensure_ascii=False, default=str)
+                    error = ""
+                except ValueError as e:
+                    result = ""
+                    error = str(e)
+                    errors += 1
+
+                writer.writerow([line, result, error])
+                processed += 1
+
+    except OSError as e:
+        print(f"Помилка пакетного обчислення: {e}")
+        return 1
+
+    print(f"Оброблено {processed} рядків (помилок: {errors}) "
+          f"за {time.perf_counter() - started:.2f} с")
+    return 0
+
+
+def run_recur(args, db_manager=None):
+    """Події правила повторення: список, кількість у діапазоні або n-на подія"""
+    from recurrence import RecurrenceRule
+
+    try:
+        rule = RecurrenceRule.from_string(args.rule, args.start,
+                                          exclude_holidays=args.exclude_holidays)
+
+        if args.nth:
+            event = rule.nth(args.nth)
+            print(event.strftime("%Y-%m-%d %H:%M:%S") if event else "Подія відсутня")
+            return 0
+
+        if args.count_only:
+            if not args.end:
+                raise ValueError("Для --count-only потрібен --end")
+            print(rule.count_between(args.start, args.end))
+            return 0
+
+        output = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+        try:
+            for number, event in enumerate(rule.occurrences(args.start, args.end), 1):
+                if args.limit and number > args.limit:
+                    break
+                output.write(event.strftime("%Y-%m-%d %H:%M:%S") + "\n")
+        finally:
+            if output is not sys.stdout:
+                output.close()
+
+    except (ValueError, OSError) as e:
+        print(f"Помилка правила повторення: {e}")
+        return 1
+
+    return 0
+
+
+def run_snapshot(args, db_manager=None):
+    """Перевірка або перебудова знімка календарних таблиць"""
+    from calendar_snapshot import build_snapshot, open_snapshot
+
+    try:
+        if args.rebuild:
+            build_snapshot(args.path, args.first_year, args.last_year)
+        snapshot = open_snapshot(args.path, args.first_year, args.last_year)
+    except (ValueError, OSError) as e:
+        print(f"Помилка знімка календаря: {e}")
+        return 1
+
+    with snapshot:
+        print(f"Знімок {snapshot.path}: роки {snapshot.first_year}-{snapshot.last_year}, "
+              f"версія правил {snapshot.rules_version}")
+    return 0
+
+
+def run_retention(args, db_manager):
+    """Обслуговування секцій таблиці обчислень (MySQL)"""
+    from partitions import PartitionManager
+
+    print(PartitionManager(db_manager).apply_retention(args.retention_months))
+    return 0
+
+
+def run_reminders(args, db_manager):
+    """Фоновий планувальник нагадувань зі сховищем бази даних (до Ctrl+C)"""
+    from scheduler import ReminderScheduler
+
+    def report(batch):
+        for reminder in batch:
+            print(f"{reminder.due:%Y-%m-%d %H:%M} {reminder.kind} {reminder.payload or ''}",
+                  flush=True)
+
+    scheduler = ReminderScheduler(db_manager, report, batch_size=args.batch_size)
+    if args.holidays:
+        scheduler.schedule_holidays(args.holidays)
+    print(f"Заплановано нагадувань: {len(scheduler)}, найближче: {scheduler.next_due()}")
+
+    scheduler.start()
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        scheduler.stop()
+    return 0
+
+
+def build_parser():
+    """Параметри командного рядка"""
+    parser = argparse.ArgumentParser(description="Пакетні операції з датами та історією")
+    parser.add_argument("--profile", metavar="DIR",
+                        help="профілювати запуск і записати звіти у каталог")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export = commands.add_parser("export", help="експорт історії користувача")
+    export.add_argument("--user-id", type=int, required=True)
+    export.add_argument("--output", required=True, help="файл .csv/.csv.gz або каталог")
+    export.add_argument("--columnar", action="store_true", help="колонковий формат")
+    export.add_argument("--chunk-size", type=int, default=1000)
+    export.set_defaults(handler=run_export)
+
+    imports = commands.add_parser("import", help="імпорт історії з CSV")
+    imports.add_argument("--user-id", type=int, required=True)
+    imports.add_argument("--input", required=True)
+    imports.add_argument("--batch-size", type=int, default=1000)
+    imports.add_argument("--load-data", action="store_true",
+                         help="LOAD DATA LOCAL INFILE для MySQL")
+    imports.set_defaults(handler=run_import)
+
+    calc = commands.add_parser("calc", help="обчислення для рядків файлу")
+    calc.add_argument("operation", choices=sorted(CALC_OPERATIONS))
+    calc.add_argument("--input", required=True)
+    calc.add_argument("--output", required=True)
+    calc.set_defaults(handler=run_calc, needs_database=False, uses_snapshot=True)
+
+    recur = commands.add_parser("recur", help="події правила повторення (RRULE)")
+    recur.add_argument("rule", help="наприклад FREQ=WEEKLY;BYDAY=MO,WE;COUNT=10")
+    recur.add_argument("--start", required=True, help="дата початку РРРР-ММ-ДД")
+    recur.add_argument("--end", help="кінцева дата РРРР-ММ-ДД")
+    recur.add_argument("--exclude-holidays", action="store_true")
+    recur.add_argument("--count-only", action="store_true", help="лише кількість подій")
+    recur.add_argument("--nth", type=int, help="лише n-на подія (з 1)")
+    recur.add_argument("--limit", type=int, help="максимум подій у списку")
+    recur.add_argument("--output", help="файл для списку подій")
+    recur.set_defaults(handler=run_recur, needs_database=False, uses_snapshot=True)
+
+    snapshot = commands.add_parser("snapshot", help="знімок календарних таблиць")
+    snapshot.add_argument("--path", help="файл знімка (за замовчуванням з конфігурації)")
+    snapshot.add_argument("--first-year", type=int)
+    snapshot.add_argument("--last-year", type=int)
+    snapshot.add_argument("--rebuild", action="store_true", help="перебудувати примусово")
+    snapshot.set_defaults(handler=run_snapshot, needs_database=False)
+
+    retention = commands.add_parser("retention", help="архівування старих секцій")
+    retention.add_argument("--retention-months", type=int)
+    retention.set_defaults(handler=run_retention)
+
+    reminders = commands.add_parser("reminders", help="планувальник нагадувань")
+    reminders.add_argument("--holidays", type=int, metavar="YEAR",
+                           help="додати нагадування про свята року")
+    reminders.add_argument("--batch-size", type=int, default=100)
+    reminders.set_defaults(handler=run_reminders, uses_snapshot=True)
+
+    return parser
+
+
+def run(args):
+    """Виконання команди (з підключенням до бази та знімком календаря, якщо потрібні)"""
+    if getattr(args, "uses_snapshot", False):
+        from calendar_snapshot import get_snapshot
+
+        try:
+            get_snapshot(build=True)
+        except (ValueError, OSError) as e:
+            print(f"Помилка знімка календаря: {e}")
+
+    db_manager = None
+    if getattr(args, "needs_database", True):
+        db_manager = DatabaseManager()
+    return args.handler(args, db_manager)
+
+
+def main(argv=None):
+    """Точка входу командного рядка"""
+    args = build_parser().parse_args(argv)
+
+    if not args.profile:
+        return run(args)
+
+    from profiling import Profiler
+
+    with Profiler(args.profile) as profiler:
+        with profiler.operation(f"batch.{args.command}"):
+            code = run(args)
+    print(f"Звіти профілювання записано у {args.profile}")
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
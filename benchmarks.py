@@ -0,0 +1,413 @@
+"""
+Вимірювання продуктивності програми роботи з датами та часом
+
+Запуск:
+    python benchmarks.py                     - вимірювання та порівняння з базовими результатами
+    python benchmarks.py --output res.json   - додатково зберегти результати у JSON
+    python benchmarks.py --update-baseline   - записати поточні результати як базові
+    python benchmarks.py --filter storage    - лише вимірювання, назва яких містить рядок
+
+Код виходу 1 означає регресію: вимірювання повільніше за базове більш ніж
+на поріг (--threshold, частка від базового часу), або вимірювання, якого
+немає в базових результатах (нове чи перейменоване - базові результати
+слід оновити через --update-baseline). Щоб базові результати
+можна було порівнювати на іншій машині, час нормалізується за еталонним
+навантаженням (calibration), яке вимірюється безпосередньо перед кожним
+вимірюванням - так враховуються і зміни частоти процесора під час запуску.
+Щоб шум не давав хибних регресій, сповільнення менше MIN_REGRESSION_SECONDS
+на виклик не враховується, а вимірювання з диском мають власний поріг.
+"""
+
+import argparse
+import csv
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+from itertools import islice
+
+from main import DateTimeCalculator, DatabaseManager
+from storage import FileBackend, MemoryBackend, ShardedFileBackend
+from columnar import ColumnarHistory, write_columnar_history
+from utils import DateFormatter, DateValidator, HolidayCalculator, export_calculations_to_csv
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             "benchmarks_baseline.json")
+DEFAULT_THRESHOLD = 0.5
+DEFAULT_REPEAT = 7
+# Поріг вимірювань з записом на диск (час залежить від файлової системи)
+DISK_THRESHOLD = 1.0
+# Мінімальне сповільнення одного виклику, що вважається регресією (секунди)
+MIN_REGRESSION_SECONDS = 0.5e-6
+RESULTS_VERSION = 1
+
+
+class Benchmark:
+    """Опис одного вимірювання
+
+    setup() повертає функцію без аргументів, час виконання якої вимірюється.
+    setup викликається перед кожним повтором, тож стан (наприклад, сховище)
+    не накопичується між повторами. number - кількість викликів у повторі
+    (None - підбирається автоматично за min_time). threshold - власний
+    допустимий рівень сповільнення (None - лише загальний --threshold).
+    """
+
+    def __init__(self, name, setup, number=None, threshold=None):
+        self.name = name
+        self.setup = setup
+        self.number = number
+        self.threshold = threshold
+
+
+def measure(benchmark, repeat=DEFAULT_REPEAT, min_time=0.05):
+    """Вимірювання: мінімальний та медіанний час одного виклику (секунди)"""
+    number = benchmark.number
+    if number is None:
+        func = benchmark.setup()
+        number = 1
+        while True:
+            started = time.perf_counter()
+            for _ in range(number):
+                func()
+            if time.perf_counter() - started >= min_time:
+                break
+            number *= 2
+
+    timings = []
+    for _ in range(repeat):
+        func = benchmark.setup()
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        timings.append((time.perf_counter() - started) / number)
+
+    timings.sort()
+    return {
+        "seconds_per_op": timings[0],
+        "median_seconds_per_op": timings[len(timings) // 2],
+        "number": number,
+        "repeat": repeat
+    }
+
+
+def _calibration_workload():
+    """Еталонне навантаження на чистому Python для нормалізації результатів"""
+    total = 0
+    for i in range(1000):
+        total += len(str(i * 7919))
+    return total
+
+
+def calibrate(repeat=5, min_time=0.05):
+    """Час еталонного навантаження на поточній машині"""
+    benchmark = Benchmark("calibration", lambda: _calibration_workload)
+    return measure(benchmark, repeat, min_time)["seconds_per_op"]
+
+
+def calculator_benchmarks():
+    """Вимірювання методів DateTimeCalculator для малих та великих діапазонів"""
+    calculator = DateTimeCalculator()
+
+    def call(method, *args):
+        return lambda: lambda: method(*args)
+
+    return [
+        Benchmark("calculator.date_difference.small",
+                  call(calculator.calculate_date_difference, "2024-01-01", "2024-01-31")),
+        Benchmark("calculator.date_difference.huge",
+                  call(calculator.calculate_date_difference, "0001-01-01", "9999-12-31")),
+        Benchmark("calculator.day_of_week",
+                  call(calculator.get_day_of_week, "2024-03-08")),
+        Benchmark("calculator.add_days.small",
+                  call(calculator.add_days_to_date, "2024-01-01", 30)),
+        Benchmark("calculator.add_days.huge",
+                  call(calculator.add_days_to_date, "0001-01-01", 3000000)),
+        Benchmark("calculator.age",
+                  call(calculator.get_age, "1990-05-17")),
+        Benchmark("calculator.calendar_month",
+                  call(calculator.get_calendar_month, 2024, 2)),
+        Benchmark("calculator.working_days.small",
+                  call(calculator.get_working_days, "2024-01-01", "2024-01-31")),
+        Benchmark("calculator.working_days.huge",
+                  call(calculator.get_working_days, "1900-01-01", "2099-12-31")),
+    ]
+
+
+def holiday_benchmarks():
+    """Вимірювання HolidayCalculator"""
+    holidays = HolidayCalculator()
+
+    return [
+        Benchmark("holidays.is_holiday",
+                  lambda: lambda: holidays.is_holiday("2024-05-05")),
+        Benchmark("holidays.easter",
+                  lambda: lambda: holidays.calculate_easter(2024)),
+        Benchmark("holidays.year",
+                  lambda: lambda: holidays.get_holidays_in_year(2024)),
+    ]
+
+
+def utils_benchmarks():
+    """Вимірювання форматувальників та валідаторів з utils"""
+    dates = [f"2024-{month:02d}-{day:02d}" for month in range(1, 13)
+             for day in range(1, 29)] * 30
+    day_counts = list(range(10000))
+
+    return [
+        Benchmark("utils.format_ukrainian_date",
+                  lambda: lambda: DateFormatter.format_ukrainian_date("2024-03-08")),
+        Benchmark("utils.format_duration",
+                  lambda: lambda: DateFormatter.format_duration(1234)),
+        Benchmark("utils.format_durations.10k",
+                  lambda: lambda: DateFormatter.format_durations(day_counts)),
+        Benchmark("utils.format_ukrainian_dates.10k",
+                  lambda: lambda: DateFormatter.format_ukrainian_dates(dates)),
+        Benchmark("utils.is_valid_date",
+                  lambda: lambda: DateValidator.is_valid_date("2024-02-29")),
+        Benchmark("utils.validate_dates.10k",
+                  lambda: lambda: DateValidator.validate_dates(dates)),
+    ]
+
+
+def storage_benchmarks(temp_dir):
+    """Вимірювання операцій сховища (реєстрація, вхід, збереження, історія)"""
+    def backends():
+        # Кількість викликів для операцій, що накопичують стан
+        yield "memory", MemoryBackend, 5000, None
+        yield "file", lambda: FileBackend(tempfile.mkdtemp(dir=temp_dir)), 200, DISK_THRESHOLD
+        yield ("sharded", lambda: ShardedFileBackend(tempfile.mkdtemp(dir=temp_dir)), 200,
+               DISK_THRESHOLD)
+
+    benchmarks = []
+    for label, make_backend, number, threshold in backends():
+        def register(make_backend=make_backend):
+            db_manager = DatabaseManager(backend=make_backend())
+            names = iter(range(10 ** 9))
+            return lambda: db_manager.register_user(f"user{next(names)}", "secret")
+
+        def login(make_backend=make_backend):
+            db_manager = DatabaseManager(backend=make_backend())
+            db_manager.register_user("user", "secret")
+            return lambda: db_manager.login_user("user", "secret")
+
+        def save(make_backend=make_backend):
+            db_manager = DatabaseManager(backend=make_backend())
+            return lambda: db_manager.save_calculation(1, "Вік", "1990-01-01", "34 років")
+
+        def history(make_backend=make_backend):
+            db_manager = DatabaseManager(backend=make_backend())
+            for i in range(100):
+                db_manager.save_calculation(1, "Вік", f"input{i}", f"result{i}")
+            return lambda: db_manager.get_user_calculations(1)
+
+        benchmarks.extend([
+            Benchmark(f"storage.{label}.register", register, number=number,
+                      threshold=threshold),
+            Benchmark(f"storage.{label}.login", login),
+            Benchmark(f"storage.{label}.save", save, number=number, threshold=threshold),
+            Benchmark(f"storage.{label}.history", history),
+        ])
+
+    return benchmarks
+
+
+def export_benchmarks(temp_dir, rows=10000):
+    """Завантаження експортованої історії: CSV порівняно з колонковим форматом"""
+    history = [("Різниця між датами", f"2024-01-{number % 28 + 1:02d} - 2024-12-31",
+                f"{number % 365} днів", datetime(2024, 1, 1, 9, number % 60, number % 60))
+               for number in range(rows)]
+    csv_file = os.path.join(temp_dir, "history.csv")
+    columnar_dir = os.path.join(temp_dir, "history_columnar")
+    export_calculations_to_csv(history, csv_file)
+    write_columnar_history(history, columnar_dir)
+
+    def load_csv():
+        # Ті самі кортежі, що й у колонкового читача: час розбирається у datetime
+        with open(csv_file, newline="", encoding="utf-8") as f:
+            return [(calc_type, input_data, result,
+                     datetime.strptime(created_at, "%Y-%m-%d %H:%M:%S") if created_at else None)
+                    for calc_type, input_data, result, created_at
+                    in islice(csv.reader(f), 1, None)]
+
+    def count_csv():
+        with open(csv_file, newline="", encoding="utf-8") as f:
+            counts = {}
+            for row in islice(csv.reader(f), 1, None):
+                counts[row[0]] = counts.get(row[0], 0) + 1
+            return counts
+
+    def count_columnar():
+        with ColumnarHistory(columnar_dir) as columnar:
+            return columnar.count_by_type()
+
+    def load_columnar():
+        with ColumnarHistory(columnar_dir) as columnar:
+            return list(columnar)
+
+    return [
+        Benchmark("export.csv.load_10k", lambda: load_csv),
+        Benchmark("export.columnar.load_10k", lambda: load_columnar),
+        Benchmark("export.csv.count_by_type_10k", lambda: count_csv),
+        Benchmark("export.columnar.count_by_type_10k", lambda: count_columnar),
+    ]
+
+
+def run_benchmarks(name_filter=None, repeat=DEFAULT_REPEAT, min_time=0.05, verbose=True,
+                   names=None):
+    """Запуск вимірювань; повертає результати у форматі JSON
+
+    names - множина точних назв для повторного вимірювання окремих тестів.
+    """
+    temp_dir = tempfile.mkdtemp(prefix="datetime_bench_")
+    try:
+        benchmarks = (calculator_benchmarks() + holiday_benchmarks()
+                      + utils_benchmarks() + storage_benchmarks(temp_dir)
+                      + export_benchmarks(temp_dir))
+
+        results = {}
+        for benchmark in benchmarks:
+            if name_filter and name_filter not in benchmark.name:
+                continue
+            if names is not None and benchmark.name not in names:
+                continue
+            calibration = calibrate(repeat, min_time / 5)
+            result = measure(benchmark, repeat, min_time)
+            result["relative"] = result["seconds_per_op"] / calibration
+            if benchmark.threshold is not None:
+                result["threshold"] = benchmark.threshold
+            results[benchmark.name] = result
+            if verbose:
+                print(f"{benchmark.name:40s} "
+                      f"{results[benchmark.name]['seconds_per_op'] * 1e6:12.2f} мкс")
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    return {
+        "version": RESULTS_VERSION,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results
+    }
+
+
+def compare_with_baseline(results, baseline, threshold=DEFAULT_THRESHOLD, normalize=True):
+    """Порівняння з базовими результатами; повертає список регресій
+
+    При normalize порівнюється час відносно еталонного навантаження
+    (relative), інакше - абсолютний час одного виклику. Регресія - це
+    сповільнення понад поріг (загальний або більший власний поріг
+    вимірювання) і водночас понад MIN_REGRESSION_SECONDS на виклик.
+    """
+    regressions = []
+    baseline_results = baseline.get("results", {})
+    key = "relative" if normalize else "seconds_per_op"
+
+    for name, result in results["results"].items():
+        if name not in baseline_results:
+            # Такі вимірювання повертає missing_from_baseline
+            result["baseline_ratio"] = None
+            continue
+
+        base = baseline_results[name].get(key)
+        ratio = result[key] / base if base else 1.0
+        result["baseline_ratio"] = ratio
+        # Сповільнення одного виклику в поточному масштабі часу
+        slowdown = result["seconds_per_op"] * (1 - 1 / ratio) if ratio else 0.0
+        limit = max(threshold, result.get("threshold") or 0)
+        if ratio > 1 + limit and slowdown >= MIN_REGRESSION_SECONDS:
+            regressions.append((name, ratio))
+
+    return regressions
+
+
+def missing_from_baseline(results, baseline):
+    """Назви вимірювань, для яких немає базових результатів"""
+    baseline_results = baseline.get("results", {})
+    return sorted(name for name in results["results"] if name not in baseline_results)
+
+
+def main(argv=None):
+    """Точка входу командного рядка"""
+    parser = argparse.ArgumentParser(description="Вимірювання продуктивності")
+    parser.add_argument("--output", help="файл для результатів у форматі JSON")
+    parser.add_argument("--baseline", default=BASELINE_FILE,
+                        help="файл базових результатів")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="допустиме сповільнення (частка, 0.5 = 50%%)")
+    parser.add_argument("--filter", help="лише вимірювання з цим рядком у назві")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT,
+                        help="кількість повторів")
+    parser.add_argument("--retries", type=int, default=2,
+                        help="повторні вимірювання тестів із регресією")
+    parser.add_argument("--no-normalize", action="store_true",
+                        help="порівнювати абсолютний час без нормалізації")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="записати результати як базові")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.filter, args.repeat)
+
+    if args.update_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"Базові результати записано у {args.baseline}")
+
+    regressions = []
+    missing = []
+    if not args.update_baseline and os.path.exists(args.baseline):
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_with_baseline(results, baseline, args.threshold,
+                                            not args.no_normalize)
+
+        # Повторне вимірювання відкидає випадкові сповільнення від шуму;
+        # для кожного тесту залишається найкращий результат
+        for _ in range(args.retries):
+            if not regressions:
+                break
+            rerun = run_benchmarks(repeat=args.repeat, verbose=False,
+                                   names={name for name, _ in regressions})
+            for name, result in rerun["results"].items():
+                if result["relative"] < results["results"][name]["relative"]:
+                    results["results"][name] = result
+            regressions = compare_with_baseline(results, baseline, args.threshold,
+                                                not args.no_normalize)
+
+        missing = missing_from_baseline(results, baseline)
+        stale = sorted(set(baseline.get("results", {})) - set(results["results"]))
+        if stale and not args.filter:
+            print("\nБазові результати для вимірювань, яких більше немає:")
+            for name in stale:
+                print(f"- {name}")
+
+    results["regressions"] = [name for name, _ in regressions]
+    results["missing_baseline"] = missing
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+    if missing:
+        print("\nНемає базових результатів (запустіть з --update-baseline):")
+        for name in missing:
+            print(f"- {name}")
+
+    if regressions:
+        print("\nРегресії продуктивності:")
+        for name, ratio in regressions:
+            print(f"- {name}: у {ratio:.2f} раза повільніше за базове")
+
+    if regressions or missing:
+        return 1
+
+    print("\nРегресій не виявлено.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
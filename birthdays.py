@@ -0,0 +1,182 @@
+"""
+Індекс найближчих днів народження
+
+Дати народження зберігаються як ключі дня року за високосним календарем
+(1 січня - 1, 29 лютого - 60, 31 грудня - 366) у відсортованому списку.
+Запит "у кого день народження в найближчі N днів" розбивається на
+відрізки календарних років (з переходом через кінець року), кожен з
+яких перетворюється на діапазон ключів і знаходиться двійковим пошуком.
+
+Народжені 29 лютого у невисокосні роки святкують 28 лютого
+(feb29_rule='feb28') або 1 березня (feb29_rule='mar1').
+"""
+
+from bisect import bisect_left, bisect_right
+from datetime import date, timedelta
+
+from compact_dates import as_datetime
+
+# Високосний рік для обчислення ключів дня року
+_KEY_YEAR = 2000
+_FEB29_KEY = date(_KEY_YEAR, 2, 29).timetuple().tm_yday
+_FEB29_RULES = ("feb28", "mar1")
+
+
+def _as_date(value):
+    """Дата (рядок РРРР-ММ-ДД, Day, date або datetime) як date"""
+    value = as_datetime(value)
+    return date(value.year, value.month, value.day)
+
+
+def birthday_key(birth_date):
+    """Ключ дня року дати народження за високосним календарем"""
+    return date(_KEY_YEAR, birth_date.month, birth_date.day).timetuple().tm_yday
+
+
+def birthday_in_year(birth_date, year, feb29_rule="feb28"):
+    """Дата дня народження у році year (29 лютого - за правилом feb29_rule)"""
+    if birth_date.month == 2 and birth_date.day == 29 and not _is_leap(year):
+        return date(year, 2, 28) if feb29_rule == "feb28" else date(year, 3, 1)
+    return date(year, birth_date.month, birth_date.day)
+
+
+def next_birthday(birth_date, reference_date, feb29_rule="feb28"):
+    """Найближчий день народження, починаючи з reference_date включно"""
+    birthday = birthday_in_year(birth_date, reference_date.year, feb29_rule)
+    if birthday < reference_date:
+        birthday = birthday_in_year(birth_date, reference_date.year + 1, feb29_rule)
+    return birthday
+
+
+def age_on(birth_date, reference_date, feb29_rule="feb28"):
+    """Повних років на дату reference_date"""
+    age = reference_date.year - birth_date.year
+    if reference_date < birthday_in_year(birth_date, reference_date.year, feb29_rule):
+        age -= 1
+    return age
+
+
+def _is_leap(year):
+    """Чи є рік високосним"""
+    return year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
+
+
+def _key_range(first, last, feb29_rule):
+    """Діапазон ключів для дат first..last одного календарного року"""
+    low = birthday_key(first)
+    high = birthday_key(last)
+    if not _is_leap(first.year):
+        # 28 лютого (або 1 березня) невисокосного року також день народження 29 лютого
+        if feb29_rule == "feb28" and last.month == 2 and last.day == 28:
+            high = _FEB29_KEY
+        if feb29_rule == "mar1" and first.month == 3 and first.day == 1:
+            low = _FEB29_KEY
+    return low, high
+
+
+class BirthdayIndex:
+    """Відсортований за днем року індекс дат народження з пошуком найближчих"""
+
+    def __init__(self, people=(), feb29_rule="feb28"):
+        if feb29_rule not in _FEB29_RULES:
+            raise ValueError(f"Невідоме правило для 29 лютого: {feb29_rule}")
+        self.feb29_rule = feb29_rule
+        self.keys = []
+        self.person_ids = []
+        self.people = {}
+        self.bulk_load(people)
+
+    def __len__(self):
+        return len(self.people)
+
+    def __contains__(self, person_id):
+        return person_id in self.people
+
+    def bulk_load(self, people):
+        """Пакетне додавання: (ідентифікатор, дата народження) або (..., дані)
+
+        Пакет перевіряється повністю до зміни індексу: при повторному
+        ідентифікаторі (в індексі чи в самому пакеті) або невірній даті
+        індекс лишається без змін.
+        """
+        added = {}
+        entries = list(zip(self.keys, self.person_ids))
+        for person in people:
+            person_id, birth_date = person[0], _as_date(person[1])
+            payload = person[2] if len(person) > 2 else None
+            if person_id in self.people or person_id in added:
+                raise ValueError(f"Особа вже є в індексі: {person_id}")
+            added[person_id] = (birth_date, payload)
+            entries.append((birthday_key(birth_date), person_id))
+
+        self.people.update(added)
+        entries.sort(key=lambda entry: entry[0])
+        self.keys = [key for key, _ in entries]
+        self.person_ids = [person_id for _, person_id in entries]
+
+    def add(self, person_id, birth_date, payload=None):
+        """Додавання особи (або заміна дати народження наявної)"""
+        if person_id in self.people:
+            self.remove(person_id)
+
+        birth_date = _as_date(birth_date)
+        key = birthday_key(birth_date)
+        position = bisect_right(self.keys, key)
+        self.keys.insert(position, key)
+        self.person_ids.insert(position, person_id)
+        self.people[person_id] = (birth_date, payload)
+
+    def remove(self, person_id):
+        """Видалення особи з індексу"""
+        birth_date, _ = self.people.pop(person_id)
+        key = birthday_key(birth_date)
+        position = bisect_left(self.keys, key)
+        while self.person_ids[position] != person_id:
+            position += 1
+        del self.keys[position]
+        del self.person_ids[position]
+
+    def upcoming(self, days, reference_date=None):
+        """Дні народження у найближчі days днів (від reference_date включно)
+
+        Повертає список словників, відсортований за кількістю днів до
+        дня народження.
+        """
+        reference_date = _as_date(reference_date) if reference_date is not None \
+            else date.today()
+        if days < 0:
+            raise ValueError(f"Кількість днів не може бути від'ємною: {days}")
+        # За рік з запасом кожна особа має щонайменше один день народження
+        last_date = reference_date + timedelta(days=min(days, 366))
+
+        result = []
+        seen = set()
+        first = reference_date
+        while first <= last_date:
+            last = min(date(first.year, 12, 31), last_date)
+            low, high = _key_range(first, last, self.feb29_rule)
+            for position in range(bisect_left(self.keys, low),
+                                  bisect_right(self.keys, high)):
+                person_id = self.person_ids[position]
+                # Вікно довжиною в рік може містити два дні народження особи;
+                # _entry завжди повертає найближчий з них
+                if person_id not in seen:
+                    seen.add(person_id)
+                    result.append(self._entry(person_id, reference_date))
+            first = last + timedelta(days=1)
+
+        result.sort(key=lambda entry: (entry["days_to_birthday"], str(entry["person_id"])))
+        return result
+
+    def _entry(self, person_id, reference_date):
+        """Опис найближчого дня народження особи"""
+        birth_date, payload = self.people[person_id]
+        birthday = next_birthday(birth_date, reference_date, self.feb29_rule)
+        return {
+            "person_id": person_id,
+            "payload": payload,
+            "birth_date": birth_date.isoformat(),
+            "birthday": birthday.isoformat(),
+            "days_to_birthday": (birthday - reference_date).days,
+            "turning_age": birthday.year - birth_date.year
+        }
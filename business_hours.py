@@ -0,0 +1,354 @@
+"""
+Обчислення робочих годин за графіком роботи
+
+Графік задається для кожного дня тижня (початок-кінець), з перервами
+(обід) та скороченням передсвяткових днів; свята беруться з
+HolidayCalculator (зі знімка календарних таблиць, якщо він актуальний).
+Робочий час між двома мітками часу обчислюється за O(1) плюс двійковий
+пошук у таблиці свят:
+
+- тривалість повних днів - повні тижні * тривалість тижня плюс префіксні
+  суми тривалостей днів тижня;
+- свята та передсвяткові дні - відсортована таблиця коригувань з
+  накопиченими сумами, діапазон якої знаходиться через bisect;
+- неповні перший та останній дні - за інтервалами графіка дня.
+"""
+
+from array import array
+from bisect import bisect_left
+from datetime import date, datetime
+
+from utils import HolidayCalculator, get_config_manager
+
+SECONDS_PER_DAY = 86400
+MAX_ORDINAL = date.max.toordinal()
+
+TIMESTAMP_FORMATS = ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%dT%H:%M:%S",
+                     "%Y-%m-%dT%H:%M", "%Y-%m-%d")
+
+
+def parse_clock(value):
+    """Час доби 'ГГ:ХХ' у секундах від початку доби"""
+    hours, minutes = value.split(":")
+    seconds = int(hours) * 3600 + int(minutes) * 60
+    if not 0 <= seconds <= SECONDS_PER_DAY:
+        raise ValueError(f"Невірний час доби: {value}")
+    return seconds
+
+
+def parse_period(value):
+    """Проміжок 'ГГ:ХХ-ГГ:ХХ' у секундах (початок, кінець)"""
+    start, end = (parse_clock(part.strip()) for part in value.split("-"))
+    if end <= start:
+        raise ValueError(f"Невірний проміжок часу: {value}")
+    return start, end
+
+
+def subtract_breaks(period, breaks):
+    """Робочі інтервали дня: проміжок без перерв"""
+    intervals = [period]
+    for break_start, break_end in sorted(breaks):
+        result = []
+        for start, end in intervals:
+            if break_end <= start or break_start >= end:
+                result.append((start, end))
+                continue
+            if start < break_start:
+                result.append((start, break_start))
+            if break_end < end:
+                result.append((break_end, end))
+        intervals = result
+    return tuple(intervals)
+
+
+def to_datetime(value):
+    """Мітка часу (рядок, date або datetime) як наївний datetime"""
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day)
+
+    for pattern in TIMESTAMP_FORMATS:
+        try:
+            return datetime.strptime(value.strip(), pattern)
+        except ValueError:
+            continue
+    raise ValueError(f"Невірний формат мітки часу: {value}")
+
+
+class BusinessSchedule:
+    """Графік роботи з обчисленням робочого часу між мітками часу"""
+
+    def __init__(self, week=None, breaks=None, pre_holiday_minutes=None,
+                 holiday_calculator=None, zone=None):
+        config = get_config_manager().get('business_hours')
+        week = week if week is not None else config['week']
+        breaks = breaks if breaks is not None else config['breaks']
+        if pre_holiday_minutes is None:
+            pre_holiday_minutes = config['pre_holiday_minutes']
+        if len(week) != 7:
+            raise ValueError("Графік повинен містити 7 днів (Пн-Нд)")
+
+        break_periods = [parse_period(value) for value in breaks]
+        self.day_intervals = tuple(
+            subtract_breaks(parse_period(period), break_periods) if period else ()
+            for period in week)
+        self.day_seconds = tuple(sum(end - start for start, end in intervals)
+                                 for intervals in self.day_intervals)
+        self.week_seconds = sum(self.day_seconds)
+        self.pre_holiday_seconds = pre_holiday_minutes * 60
+        self.holiday_calculator = holiday_calculator or HolidayCalculator()
+        self.zone = zone or config.get('zone')
+
+        # Префіксні суми по двох тижнях, щоб неповний тиждень з будь-якого
+        # дня тижня був різницею двох елементів
+        self._seconds_prefix = [0]
+        self._days_prefix = [0]
+        for weekday in range(14):
+            seconds = self.day_seconds[weekday % 7]
+            self._seconds_prefix.append(self._seconds_prefix[-1] + seconds)
+            self._days_prefix.append(self._days_prefix[-1] + (1 if seconds else 0))
+
+        # Таблиця свят: покриті роки, відсортовані дні з коригуваннями
+        # та накопичені суми знятих секунд і робочих днів
+        self._first_year = None
+        self._last_year = None
+        self._kinds = {}
+        self._adjust_days = []
+        self._adjust_seconds = [0]
+        self._adjust_workdays = [0]
+
+    def _ensure_years(self, first_year, last_year):
+        """Побудова таблиці свят, що покриває роки first_year..last_year"""
+        if self._first_year is not None and \
+                self._first_year <= first_year and last_year <= self._last_year:
+            return
+
+        if self._first_year is not None:
+            first_year = min(first_year, self._first_year)
+            last_year = max(last_year, self._last_year)
+
+        # Свята наступного року потрібні для передсвяткового 31 грудня
+        holidays = {holiday.toordinal(): name for holiday, name in
+                    self.holiday_calculator.holidays_between(
+                        date(first_year, 1, 1), date(min(last_year + 1, 9999), 12, 31))}
+
+        kinds = {}
+        for ordinal, name in holidays.items():
+            kinds[ordinal] = ("holiday", name)
+        for ordinal, name in holidays.items():
+            if ordinal - 1 not in holidays:
+                kinds[ordinal - 1] = ("pre_holiday", name)
+
+        first_ordinal = date(first_year, 1, 1).toordinal()
+        last_ordinal = date(last_year, 12, 31).toordinal()
+        adjust_days = []
+        adjust_seconds = [0]
+        adjust_workdays = [0]
+
+        for ordinal in sorted(kinds):
+            if not first_ordinal <= ordinal <= last_ordinal:
+                continue
+            day_seconds = self.day_seconds[(ordinal - 1) % 7]
+            if not day_seconds:
+                continue
+
+            kind = kinds[ordinal][0]
+            if kind == "holiday":
+                removed, workdays = day_seconds, 1
+            else:
+                removed, workdays = min(self.pre_holiday_seconds, day_seconds), 0
+
+            adjust_days.append(ordinal)
+            adjust_seconds.append(adjust_seconds[-1] + removed)
+            adjust_workdays.append(adjust_workdays[-1] + workdays)
+
+        self._first_year = first_year
+        self._last_year = last_year
+        self._kinds = kinds
+        self._adjust_days = adjust_days
+        self._adjust_seconds = adjust_seconds
+        self._adjust_workdays = adjust_workdays
+
+    def _local(self, value):
+        """Наївний місцевий час (aware значення переводяться у пояс графіка)"""
+        value = to_datetime(value)
+        if value.tzinfo is None:
+            return value
+        if self.zone is None:
+            return value.replace(tzinfo=None)
+
+        from timezones import get_transition_index
+
+        utc_value = (value - value.utcoffset()).replace(tzinfo=None)
+        return get_transition_index(self.zone).from_utc(utc_value).replace(tzinfo=None)
+
+    def day_kind(self, value):
+        """Тип дня: 'holiday', 'pre_holiday', 'workday' або 'weekend' та назва свята"""
+        value = to_datetime(value)
+        self._ensure_years(value.year, value.year)
+        ordinal = value.toordinal()
+
+        kind = self._kinds.get(ordinal)
+        is_working = bool(self.day_seconds[(ordinal - 1) % 7])
+        if kind is not None and (kind[0] == "holiday" or is_working):
+            return kind
+        return ("workday" if is_working else "weekend"), None
+
+    def _worked_until(self, ordinal, second):
+        """Робочі секунди дня від його початку до second"""
+        day_seconds = self.day_seconds[(ordinal - 1) % 7]
+        if not day_seconds or second <= 0:
+            return 0
+
+        kind = self._kinds.get(ordinal)
+        if kind is not None and kind[0] == "holiday":
+            return 0
+
+        worked = 0
+        for start, end in self.day_intervals[(ordinal - 1) % 7]:
+            if second <= start:
+                break
+            worked += (second if second < end else end) - start
+
+        if kind is not None:
+            # Передсвятковий день коротшає з кінця
+            limit = day_seconds - min(self.pre_holiday_seconds, day_seconds)
+            if worked > limit:
+                worked = limit
+        return worked
+
+    def _days_seconds(self, first_ordinal, last_ordinal):
+        """Робочі секунди повних днів first_ordinal..last_ordinal - 1"""
+        weeks, rest = divmod(last_ordinal - first_ordinal, 7)
+        weekday = (first_ordinal - 1) % 7
+        seconds = (weeks * self.week_seconds
+                   + self._seconds_prefix[weekday + rest] - self._seconds_prefix[weekday])
+
+        days = self._adjust_days
+        low = bisect_left(days, first_ordinal)
+        high = bisect_left(days, last_ordinal)
+        return seconds - (self._adjust_seconds[high] - self._adjust_seconds[low])
+
+    def working_seconds(self, start, end):
+        """Робочі секунди між мітками часу (від'ємні, якщо end раніше start)"""
+        start = self._local(start)
+        end = self._local(end)
+        if end < start:
+            return -self.working_seconds(end, start)
+
+        self._ensure_years(start.year, end.year)
+        first = start.toordinal()
+        last = end.toordinal()
+
+        return (self._days_seconds(first, last)
+                - self._worked_until(first, start.hour * 3600 + start.minute * 60 + start.second)
+                + self._worked_until(last, end.hour * 3600 + end.minute * 60 + end.second))
+
+    def working_hours(self, start, end):
+        """Робочі години між мітками часу"""
+        return self.working_seconds(start, end) / 3600
+
+    def _workdays(self, first, last):
+        """Робочі дні (без свят) серед днів first..last - 1 (таблиця свят побудована)"""
+        weeks, rest = divmod(last - first, 7)
+        weekday = (first - 1) % 7
+        days = (weeks * self._days_prefix[7]
+                + self._days_prefix[weekday + rest] - self._days_prefix[weekday])
+
+        low = bisect_left(self._adjust_days, first)
+        high = bisect_left(self._adjust_days, last)
+        return days - (self._adjust_workdays[high] - self._adjust_workdays[low])
+
+    def working_days(self, start_date, end_date):
+        """Кількість робочих днів (без свят) між датами включно"""
+        first = to_datetime(start_date).toordinal()
+        last = to_datetime(end_date).toordinal() + 1
+        if last <= first:
+            return 0
+
+        self._ensure_years(date.fromordinal(first).year, date.fromordinal(last - 1).year)
+        return self._workdays(first, last)
+
+    def add_working_days(self, start_date, days):
+        """Дата через days робочих днів після start_date (свята та вихідні пропускаються)
+
+        Відстань оцінюється за повними тижнями (і подвоюється, якщо свят
+        виявилось більше), після чого найближча дата з потрібною кількістю
+        робочих днів знаходиться двійковим пошуком; кожна перевірка - O(1)
+        плюс bisect у таблиці свят.
+        """
+        ordinal = to_datetime(start_date).toordinal()
+        if days == 0:
+            return date.fromordinal(ordinal)
+        if not self._days_prefix[7]:
+            raise ValueError("Графік не містить робочих днів")
+
+        step = 1 if days > 0 else -1
+        remaining = abs(days)
+
+        def count(distance):
+            """Робочі дні між start_date (не включно) та датою на відстані distance"""
+            if step > 0:
+                return self._workdays(ordinal + 1, ordinal + distance + 1)
+            return self._workdays(ordinal - distance, ordinal)
+
+        distance = (remaining // self._days_prefix[7] + 1) * 7
+        while True:
+            target = ordinal + step * distance
+            if not 1 <= target <= MAX_ORDINAL:
+                raise ValueError(f"Дата поза підтримуваним діапазоном: {days} робочих днів")
+            self._ensure_years(date.fromordinal(min(ordinal, target)).year,
+                               date.fromordinal(max(ordinal, target)).year)
+            if count(distance) >= remaining:
+                break
+            distance *= 2
+
+        low, high = 0, distance
+        while high - low > 1:
+            middle = (low + high) // 2
+            if count(middle) >= remaining:
+                high = middle
+            else:
+                low = middle
+        return date.fromordinal(ordinal + step * high)
+
+    def holidays_between(self, start_date, end_date):
+        """Свята між датами включно: список (дата, назва)"""
+        first = to_datetime(start_date).toordinal()
+        last = to_datetime(end_date).toordinal()
+        if last < first:
+            return []
+
+        self._ensure_years(date.fromordinal(first).year, date.fromordinal(last).year)
+        return sorted((date.fromordinal(ordinal), name)
+                      for ordinal, (kind, name) in self._kinds.items()
+                      if kind == "holiday" and first <= ordinal <= last)
+
+    def working_seconds_batch(self, starts, ends):
+        """Пакетне обчислення робочих секунд для пар міток часу
+
+        Повертає array('q'); для мільйонів заявок дані краще передавати
+        як datetime, щоб уникнути розбору рядків.
+        """
+        result = array("q")
+        append = result.append
+        working_seconds = self.working_seconds
+        for start, end in zip(starts, ends):
+            append(working_seconds(start, end))
+        return result
+
+    def sla_report(self, starts, ends, limit_hours):
+        """Звіт SLA: кількість заявок, порушень, середній та максимальний робочий час"""
+        seconds = self.working_seconds_batch(starts, ends)
+        limit = limit_hours * 3600
+        count = len(seconds)
+        breached = sum(1 for value in seconds if value > limit)
+
+        return {
+            "tickets": count,
+            "breached": breached,
+            "breach_rate": breached / count if count else 0.0,
+            "average_hours": sum(seconds) / count / 3600 if count else 0.0,
+            "max_hours": max(seconds) / 3600 if count else 0.0
+        }
@@ -0,0 +1,308 @@
+"""
+Бінарний знімок попередньо обчислених календарних таблиць
+
+Короткочасні пакетні процеси та запуски з командного рядка не будують
+таблиці свят, дат Великодня, префіксних сум робочих днів та розкладки
+місяців заново, а відображають готовий файл у пам'ять (mmap) і читають
+масиви через memoryview без розбору. Знімок позначений версією правил
+свят (HolidayCalculator.rules_version) і автоматично перебудовується,
+якщо правила або діапазон років змінились. Спільний знімок (get_snapshot)
+читає HolidayCalculator, а через нього BusinessSchedule та
+DateTimeCalculator; калькулятори лише читають готовий файл, а будують його
+пакетні команди (batch.py) та open_snapshot. За замовчуванням файл
+зберігається у каталозі кешу користувача (default_snapshot_path).
+
+Формат файлу (нативний порядок байтів, секції вирівняні на 4 байти):
+    заголовок HEADER_FORMAT;
+    holiday_ids  - 'B' на кожен день: 0 або номер назви свята (з 1);
+    working      - 'i' на кожен день + 1: робочі дні (Пн-Пт без свят)
+                   від першого дня знімка до дня;
+    easter       - 'i' на кожен рік: порядковий номер дня Великодня;
+    months       - 'B' по два на місяць: день тижня 1 числа, кількість днів;
+    names        - назви свят UTF-8, розділені нульовим байтом.
+"""
+
+import calendar
+import mmap
+import os
+import re
+import struct
+import sys
+import tempfile
+import threading
+from array import array
+from datetime import date
+
+from compact_dates import to_day_ordinal
+from utils import HolidayCalculator, get_config_manager
+
+MAGIC = b"DTCS"
+FORMAT_VERSION = 1
+HEADER_FORMAT = "=4sHB12sHHiiI"
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+BYTE_ORDER = 1 if sys.byteorder == "little" else 0
+# Святковий день у таблиці holiday_ids
+HOLIDAY_DAY = re.compile(rb"[^\x00]")
+# Каталог програми у каталозі кешу та ім'я файлу знімка за замовчуванням
+CACHE_DIRECTORY = "datetime_app"
+SNAPSHOT_FILE = "calendar_snapshot.bin"
+
+
+def default_snapshot_path():
+    """Файл знімка у каталозі кешу користувача (XDG_CACHE_HOME, LOCALAPPDATA)"""
+    if os.name == "nt":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser(r"~\AppData\Local")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, CACHE_DIRECTORY, SNAPSHOT_FILE)
+
+
+def _snapshot_settings(path, first_year, last_year):
+    """Шлях та діапазон років знімка з урахуванням розділу конфігурації"""
+    config = get_config_manager().get('calendar_snapshot')
+    return (path or config['path'] or default_snapshot_path(),
+            first_year or config['first_year'],
+            last_year or config['last_year'])
+
+
+def _aligned(offset):
+    """Зсув, вирівняний на 4 байти"""
+    return (offset + 3) & ~3
+
+
+def _layout(days, years, names_length):
+    """Зсуви секцій: holiday_ids, working, easter, months, names та кінець файлу"""
+    holiday_ids = HEADER_SIZE
+    working = _aligned(holiday_ids + days)
+    easter = working + (days + 1) * 4
+    months = easter + years * 4
+    names = months + years * 24
+    return holiday_ids, working, easter, months, names, names + names_length
+
+
+def build_snapshot(path=None, first_year=None, last_year=None, holiday_calculator=None):
+    """Обчислення таблиць та атомарний запис файлу знімка"""
+    path, first_year, last_year = _snapshot_settings(path, first_year, last_year)
+    holiday_calculator = holiday_calculator or HolidayCalculator()
+    if not 1 <= first_year <= last_year <= 9999:
+        raise ValueError(f"Невірний діапазон років знімка: {first_year}-{last_year}")
+
+    first_ordinal = date(first_year, 1, 1).toordinal()
+    days = date(last_year, 12, 31).toordinal() - first_ordinal + 1
+    years = last_year - first_year + 1
+
+    names = []
+    name_ids = {}
+    holiday_ids = bytearray(days)
+    easter = array("i")
+    months = bytearray()
+
+    for year in range(first_year, last_year + 1):
+        for holiday, name in holiday_calculator.get_holidays_in_year(year):
+            if name not in name_ids:
+                names.append(name)
+                name_ids[name] = len(names)
+            index = holiday.toordinal() - first_ordinal
+            if not holiday_ids[index]:
+                holiday_ids[index] = name_ids[name]
+        easter.append(holiday_calculator.calculate_easter(year).toordinal())
+        for month in range(1, 13):
+            months.extend(calendar.monthrange(year, month))
+
+    if len(names) > 255:
+        raise ValueError("Забагато різних назв свят для знімка")
+
+    working = array("i", [0])
+    total = 0
+    for index in range(days):
+        if (first_ordinal + index - 1) % 7 < 5 and not holiday_ids[index]:
+            total += 1
+        working.append(total)
+
+    names_blob = "\0".join(names).encode("utf-8")
+    offsets = _layout(days, years, len(names_blob))
+    rules = holiday_calculator.rules_version().encode("ascii")
+    header = struct.pack(HEADER_FORMAT, MAGIC, FORMAT_VERSION, BYTE_ORDER, rules,
+                         first_year, last_year, first_ordinal, days, len(names_blob))
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_name = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        if hasattr(os, "fchmod"):
+            # mkstemp створює файл з правами 0600; знімок отримує звичайні права
+            umask = os.umask(0)
+            os.umask(umask)
+            os.fchmod(fd, 0o666 & ~umask)
+        with os.fdopen(fd, "wb") as file:
+            file.write(header)
+            file.write(holiday_ids)
+            file.write(bytes(offsets[1] - offsets[0] - days))
+            file.write(working.tobytes())
+            file.write(easter.tobytes())
+            file.write(months)
+            file.write(names_blob)
+        os.replace(temp_name, path)
+    except BaseException:
+        os.unlink(temp_name)
+        raise
+
+
+class CalendarSnapshot:
+    """Таблиці календаря, відображені з файлу знімка"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            if len(self._mmap) < HEADER_SIZE:
+                raise ValueError("Файл знімка пошкоджений")
+            (magic, version, byte_order, rules, self.first_year, self.last_year,
+             self.first_ordinal, self.days, names_length) = struct.unpack_from(
+                HEADER_FORMAT, self._mmap)
+            if magic != MAGIC or version != FORMAT_VERSION or byte_order != BYTE_ORDER:
+                raise ValueError("Непідтримуваний формат знімка")
+
+            years = self.last_year - self.first_year + 1
+            holiday_ids, working, easter, months, names, end = _layout(
+                self.days, years, names_length)
+            if len(self._mmap) != end:
+                raise ValueError("Файл знімка пошкоджений")
+
+            self.rules_version = rules.decode("ascii")
+            view = memoryview(self._mmap)
+            self._view = view
+            self.holiday_ids = view[holiday_ids:holiday_ids + self.days]
+            self.working = view[working:easter].cast("i")
+            self.easter = view[easter:months].cast("i")
+            self.months = view[months:names]
+            self.names = [""] + bytes(view[names:end]).decode("utf-8").split("\0")
+            self.last_ordinal = self.first_ordinal + self.days - 1
+        except BaseException:
+            self.close()
+            raise
+
+    def close(self):
+        """Звільнення відображення файлу"""
+        for name in ("holiday_ids", "working", "easter", "months", "_view"):
+            view = self.__dict__.pop(name, None)
+            if view is not None:
+                view.release()
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def covers(self, first_year, last_year):
+        """Чи містить знімок роки first_year..last_year"""
+        return self.first_year <= first_year and last_year <= self.last_year
+
+    def covers_days(self, first_ordinal, last_ordinal):
+        """Чи містить знімок дні з порядковими номерами first_ordinal..last_ordinal"""
+        return self.first_ordinal <= first_ordinal and last_ordinal <= self.last_ordinal
+
+    def _index(self, value):
+        """Номер дня у знімку"""
+        ordinal = to_day_ordinal(value)
+        if not self.first_ordinal <= ordinal <= self.last_ordinal:
+            raise ValueError(f"Дата поза діапазоном знімка: {date.fromordinal(ordinal)}")
+        return ordinal - self.first_ordinal
+
+    def is_holiday(self, value):
+        """Перевірка дати: (чи свято, назва) як у HolidayCalculator.is_holiday"""
+        name_id = self.holiday_ids[self._index(value)]
+        return (True, self.names[name_id]) if name_id else (False, None)
+
+    def easter_date(self, year):
+        """Дата Великодня року"""
+        return date.fromordinal(self.easter[year - self.first_year])
+
+    def holidays_between(self, start, end):
+        """Свята між датами включно: список (дата, назва) за датою, одна назва на день"""
+        first = self._index(start)
+        last = self._index(end)
+        ids = bytes(self.holiday_ids[first:last + 1])
+        base = self.first_ordinal + first
+        return [(date.fromordinal(base + match.start()), self.names[ids[match.start()]])
+                for match in HOLIDAY_DAY.finditer(ids)]
+
+    def holidays_in_year(self, year):
+        """Свята року: список (дата, назва) за датою, одна назва на день як у is_holiday"""
+        return self.holidays_between(date(year, 1, 1), date(year, 12, 31))
+
+    def working_days(self, start, end):
+        """Робочі дні (Пн-Пт без свят) між датами включно за O(1)"""
+        first = self._index(start)
+        last = self._index(end)
+        if last < first:
+            return 0
+        return self.working[last + 1] - self.working[first]
+
+    def month_layout(self, year, month):
+        """День тижня першого числа (0 - понеділок) та кількість днів місяця"""
+        position = ((year - self.first_year) * 12 + month - 1) * 2
+        if not 0 <= position < len(self.months) or not 1 <= month <= 12:
+            raise ValueError(f"Місяць поза діапазоном знімка: {year}-{month}")
+        return self.months[position], self.months[position + 1]
+
+    def month_calendar(self, year, month):
+        """Тижні місяця як у calendar.monthcalendar"""
+        first_weekday, days = self.month_layout(year, month)
+        cells = [0] * first_weekday + list(range(1, days + 1))
+        cells += [0] * (-len(cells) % 7)
+        return [cells[index:index + 7] for index in range(0, len(cells), 7)]
+
+
+def load_snapshot(path=None, first_year=None, last_year=None, holiday_calculator=None):
+    """Відкриття актуального знімка без запису: None, якщо файл відсутній,
+    пошкоджений або застарів"""
+    path, first_year, last_year = _snapshot_settings(path, first_year, last_year)
+    holiday_calculator = holiday_calculator or HolidayCalculator()
+
+    try:
+        snapshot = CalendarSnapshot(path)
+    except (OSError, ValueError, struct.error):
+        return None
+    if (snapshot.rules_version == holiday_calculator.rules_version()
+            and snapshot.covers(first_year, last_year)):
+        return snapshot
+    snapshot.close()
+    return None
+
+
+def open_snapshot(path=None, first_year=None, last_year=None, holiday_calculator=None):
+    """Відкриття знімка з перебудовою, якщо файл відсутній, пошкоджений або застарів"""
+    path, first_year, last_year = _snapshot_settings(path, first_year, last_year)
+    holiday_calculator = holiday_calculator or HolidayCalculator()
+
+    snapshot = load_snapshot(path, first_year, last_year, holiday_calculator)
+    if snapshot is not None:
+        return snapshot
+
+    build_snapshot(path, first_year, last_year, holiday_calculator)
+    return CalendarSnapshot(path)
+
+
+_snapshot = None
+_snapshot_lock = threading.Lock()
+
+
+def get_snapshot(build=False):
+    """Спільний знімок за розділом конфігурації 'calendar_snapshot'
+
+    Без build лише відкриває актуальний файл (None, якщо його немає або він
+    застарів); з build відсутній або застарілий знімок перебудовується.
+    """
+    global _snapshot
+
+    with _snapshot_lock:
+        if _snapshot is None:
+            _snapshot = open_snapshot() if build else load_snapshot()
+        return _snapshot
@@ -0,0 +1,346 @@
+"""
+Компактний колонковий бінарний формат історії обчислень
+
+Історія зберігається в каталозі з окремим файлом на кожну колонку:
+
+    meta.json            - опис формату, кількість рядків, словник типів
+    created_day.i32      - день створення (порядковий номер дня, 0 - немає)
+    created_time.i64     - мікросекунда від початку доби
+    type_code.u16        - код типу обчислення (індекс у словнику meta.json)
+    input.bin            - рядки UTF-8, кожен з префіксом довжини (varint LEB128)
+    result.bin           - те саме для результатів
+
+Рядки кожної колонки записуються одним блоком; префікс довжини займає
+1 байт для рядків до 127 байтів. Читач відображає файли в пам'ять (mmap)
+і працює з ними через memoryview без копіювання; індекс початків рядків
+будується в пам'яті один раз при першому зверненні до рядкової колонки.
+Час створення з часовим поясом не підтримується (історія зберігає
+місцевий час без поясу).
+"""
+
+from array import array
+from datetime import datetime, timedelta
+from itertools import chain, islice
+import json
+import mmap
+import os
+import sys
+
+FORMAT_NAME = "datetime_app.columnar"
+FORMAT_VERSION = 2
+
+# Файли колонок: назва -> (ім'я файлу, код типу array)
+NUMERIC_COLUMNS = {
+    "created_day": ("created_day.i32", "i"),
+    "created_time": ("created_time.i64", "q"),
+    "type_code": ("type_code.u16", "H")
+}
+STRING_COLUMNS = ("input", "result")
+
+# Найбільша кількість різних типів обчислень для колонки type_code (uint16)
+MAX_TYPES = 1 << 16
+
+# Перевірка розмірів елементів, на які розраховує формат
+assert array("i").itemsize == 4 and array("H").itemsize == 2 \
+    and array("q").itemsize == 8
+
+# Готові однобайтові префікси довжини для коротких рядків
+_SHORT_PREFIXES = [bytes((length,)) for length in range(0x80)]
+
+
+def _split_timestamp(created_at):
+    """Розбиття часу створення на (порядковий день, мікросекунда доби)"""
+    if not created_at:
+        return 0, 0
+
+    if isinstance(created_at, str):
+        created_at = datetime.fromisoformat(created_at)
+
+    if created_at.tzinfo is not None:
+        raise ValueError(f"Час створення з часовим поясом не підтримується: {created_at}")
+
+    return (created_at.toordinal(),
+            ((created_at.hour * 60 + created_at.minute) * 60 + created_at.second)
+            * 1000000 + created_at.microsecond)
+
+
+def _length_prefix(length):
+    """Префікс довжини рядка (varint LEB128)"""
+    if length < 0x80:
+        return _SHORT_PREFIXES[length]
+
+    prefix = bytearray()
+    while length >= 0x80:
+        prefix.append((length & 0x7F) | 0x80)
+        length >>= 7
+    prefix.append(length)
+    return bytes(prefix)
+
+
+def _write_array(file, values):
+    """Запис масиву у файл у порядку байтів little-endian"""
+    if sys.byteorder != "little":
+        values = array(values.typecode, values)
+        values.byteswap()
+    values.tofile(file)
+
+
+def write_columnar_history(rows, directory, chunk_size=65536):
+    """Запис історії у колонковий формат
+
+    rows - ітерабельний об'єкт кортежів (тип, вхідні дані, результат, час),
+    як у get_user_calculations. Дані обробляються порціями по chunk_size.
+    Повертає кількість рядків та розмір записаних файлів формату у байтах.
+    """
+    os.makedirs(directory, exist_ok=True)
+
+    types = {}
+    total_rows = 0
+    files = {}
+    filenames = [filename for filename, _ in NUMERIC_COLUMNS.values()]
+    filenames += [name + ".bin" for name in STRING_COLUMNS]
+
+    try:
+        for name, (filename, _) in NUMERIC_COLUMNS.items():
+            files[name] = open(os.path.join(directory, filename), "wb")
+        for name in STRING_COLUMNS:
+            files[name] = open(os.path.join(directory, name + ".bin"), "wb")
+
+        iterator = iter(rows)
+        while True:
+            chunk = list(islice(iterator, chunk_size))
+            if not chunk:
+                break
+
+            days = array("i")
+            times = array("q")
+            codes = array("H")
+            blobs = {name: [] for name in STRING_COLUMNS}
+
+            for calc_type, input_data, result, created_at in chunk:
+                code = types.get(calc_type)
+                if code is None:
+                    if len(types) >= MAX_TYPES:
+                        raise ValueError(f"Забагато типів обчислень для колонкового "
+                                         f"формату (більше {MAX_TYPES})")
+                    code = types[calc_type] = len(types)
+                codes.append(code)
+
+                day, micro = _split_timestamp(created_at)
+                days.append(day)
+                times.append(micro)
+
+                for name, value in (("input", input_data), ("result", result)):
+                    data = str(value).encode("utf-8")
+                    blobs[name].append(_length_prefix(len(data)))
+                    blobs[name].append(data)
+
+            _write_array(files["created_day"], days)
+            _write_array(files["created_time"], times)
+            _write_array(files["type_code"], codes)
+            for name in STRING_COLUMNS:
+                files[name].write(b"".join(blobs[name]))
+
+            total_rows += len(chunk)
+
+    finally:
+        for file in files.values():
+            file.close()
+
+    meta = {
+        "format": FORMAT_NAME,
+        "version": FORMAT_VERSION,
+        "rows": total_rows,
+        "byteorder": "little",
+        "types": sorted(types, key=types.get),
+        "columns": {name: {"file": filename, "typecode": typecode}
+                    for name, (filename, typecode) in NUMERIC_COLUMNS.items()}
+    }
+    with open(os.path.join(directory, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+
+    total_bytes = sum(os.path.getsize(os.path.join(directory, name))
+                      for name in filenames + ["meta.json"])
+    return {"rows": total_rows, "bytes": total_bytes}
+
+
+def export_history_columnar(db_manager, user_id, directory, chunk_size=65536):
+    """Експорт історії користувача з бази даних у колонковий формат"""
+    chunks = db_manager.iter_user_calculations(user_id, chunk_size)
+    return write_columnar_history(chain.from_iterable(chunks), directory, chunk_size)
+
+
+class ColumnarHistory:
+    """Читач колонкового формату історії з відображенням файлів у пам'ять"""
+
+    def __init__(self, directory):
+        self.directory = directory
+
+        with open(os.path.join(directory, "meta.json"), "r", encoding="utf-8") as f:
+            self.meta = json.load(f)
+
+        if self.meta.get("format") != FORMAT_NAME or \
+                self.meta.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Непідтримуваний формат історії: {directory}")
+
+        self.types = self.meta["types"]
+        self.rows = self.meta["rows"]
+        self._maps = []
+        self._views = []
+        self._columns = {}
+        self._string_index = {}
+
+        for name, (filename, typecode) in NUMERIC_COLUMNS.items():
+            self._columns[name] = self._map(filename, typecode)
+        for name in STRING_COLUMNS:
+            self._columns[name] = self._map(name + ".bin", None)
+
+    def _map(self, filename, typecode):
+        """Відображення файлу колонки в пам'ять як memoryview"""
+        path = os.path.join(self.directory, filename)
+        if os.path.getsize(path) == 0:
+            view = memoryview(b"")
+            return view.cast(typecode) if typecode else view
+
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._maps.append(mapped)
+        view = memoryview(mapped)
+        self._views.append(view)
+
+        if typecode is None:
+            return view
+        if sys.byteorder != "little":
+            # Порядок байтів відрізняється - копіювання неминуче
+            values = array(typecode, view.tobytes())
+            values.byteswap()
+            return memoryview(values)
+
+        view = view.cast(typecode)
+        self._views.append(view)
+        return view
+
+    def __len__(self):
+        return self.rows
+
+    def column(self, name):
+        """Числова колонка (created_day, created_time, type_code) без копіювання"""
+        if name not in NUMERIC_COLUMNS:
+            raise KeyError(f"Невідома колонка: {name}")
+        return self._columns[name]
+
+    def to_numpy(self, name):
+        """Числова колонка як масив NumPy без копіювання (потрібен numpy)"""
+        import numpy
+
+        dtypes = {"i": "<i4", "q": "<i8", "H": "<u2"}
+        view = self.column(name)
+        return numpy.frombuffer(view, dtype=dtypes[view.format])
+
+    def _index(self, name):
+        """Початки та довжини рядків колонки (розбір префіксів при першому зверненні)"""
+        index = self._string_index.get(name)
+        if index is not None:
+            return index
+
+        data = self._columns[name]
+        starts = array("Q")
+        lengths = array("I")
+        position = 0
+        for _ in range(self.rows):
+            length = data[position]
+            position += 1
+            if length >= 0x80:
+                length &= 0x7F
+                shift = 7
+                while True:
+                    byte = data[position]
+                    position += 1
+                    length |= (byte & 0x7F) << shift
+                    if byte < 0x80:
+                        break
+                    shift += 7
+            starts.append(position)
+            lengths.append(length)
+            position += length
+
+        if position != len(data):
+            raise ValueError(f"Пошкоджена рядкова колонка: {name}")
+        index = self._string_index[name] = (starts, lengths)
+        return index
+
+    def string(self, name, index):
+        """Рядок колонки input або result за індексом"""
+        if name not in STRING_COLUMNS:
+            raise KeyError(f"Невідома колонка: {name}")
+        starts, lengths = self._index(name)
+        start = starts[index]
+        return str(self._columns[name][start:start + lengths[index]], "utf-8")
+
+    def created_at(self, index):
+        """Час створення запису або None"""
+        day = self._columns["created_day"][index]
+        if not day:
+            return None
+        return datetime.fromordinal(day) + timedelta(
+            microseconds=self._columns["created_time"][index])
+
+    def row(self, index):
+        """Запис у форматі get_user_calculations: (тип, вхідні дані, результат, час)"""
+        if not 0 <= index < self.rows:
+            raise IndexError(index)
+
+        return (self.types[self._columns["type_code"][index]],
+                self.string("input", index),
+                self.string("result", index),
+                self.created_at(index))
+
+    def __iter__(self):
+        """Послідовне читання записів (без перевірок та викликів row для кожного)"""
+        types = self.types
+        codes = self._columns["type_code"]
+        days = self._columns["created_day"]
+        times = self._columns["created_time"]
+        input_data, result_data = self._columns["input"], self._columns["result"]
+        input_starts, input_lengths = self._index("input")
+        result_starts, result_lengths = self._index("result")
+        day_starts = {}
+
+        for index in range(self.rows):
+            day = days[index]
+            created_at = None
+            if day:
+                day_start = day_starts.get(day)
+                if day_start is None:
+                    day_start = day_starts[day] = datetime.fromordinal(day)
+                created_at = day_start + timedelta(microseconds=times[index])
+
+            start = input_starts[index]
+            input_value = str(input_data[start:start + input_lengths[index]], "utf-8")
+            start = result_starts[index]
+            result_value = str(result_data[start:start + result_lengths[index]], "utf-8")
+            yield types[codes[index]], input_value, result_value, created_at
+
+    def count_by_type(self):
+        """Кількість записів кожного типу (лише за колонкою кодів)"""
+        counts = [0] * len(self.types)
+        for code in self._columns["type_code"]:
+            counts[code] += 1
+        return dict(zip(self.types, counts))
+
+    def close(self):
+        """Звільнення відображених у пам'ять файлів"""
+        self._columns = {}
+        self._string_index = {}
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        for mapped in self._maps:
+            mapped.close()
+        self._maps = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
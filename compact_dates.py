@@ -0,0 +1,258 @@
+"""
+Компактне представлення календарних дат для пакетних обчислень
+
+Day зберігає лише порядковий номер дня (date.toordinal) у слоті, тому
+займає менше пам'яті, ніж datetime, а порівняння, хешування та арифметика
+зводяться до операцій над цілим числом. DayColumn зберігає послідовність
+дат як array('i') (4 байти на дату) і перетворюється з/у рядки ISO
+(РРРР-ММ-ДД) та datetime.date; калькулятори працюють безпосередньо з
+масивом порядкових номерів без створення проміжних об'єктів.
+"""
+
+from array import array
+from datetime import date, datetime
+
+# Порядковий день 1 (0001-01-01) - понеділок
+MONDAY_ORDINAL = 1
+
+
+def _parse_iso(value):
+    """Порядковий номер дня для рядка РРРР-ММ-ДД"""
+    text = value.strip()
+    if len(text) != 10 or text[4] != "-" or text[7] != "-":
+        raise ValueError(f"Невірний формат дати: {value}")
+    try:
+        return date(int(text[:4]), int(text[5:7]), int(text[8:])).toordinal()
+    except ValueError:
+        raise ValueError(f"Невірна дата: {value}")
+
+
+def to_day_ordinal(value):
+    """Порядковий номер дня для Day, рядка РРРР-ММ-ДД, date, datetime або числа"""
+    if isinstance(value, Day):
+        return value.ordinal
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str):
+        return _parse_iso(value)
+    return value.toordinal()
+
+
+def as_datetime(value):
+    """Значення дати (рядок, Day, date або datetime) як datetime"""
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, str):
+        return datetime.strptime(value, "%Y-%m-%d")
+    if isinstance(value, Day):
+        return datetime.fromordinal(value.ordinal)
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day)
+    raise ValueError(f"Непідтримуваний тип дати: {type(value).__name__}")
+
+
+class Day:
+    """Календарна дата як порядковий номер дня"""
+
+    __slots__ = ("ordinal",)
+
+    def __init__(self, ordinal):
+        self.ordinal = ordinal
+
+    @classmethod
+    def from_iso(cls, value):
+        """Дата з рядка РРРР-ММ-ДД"""
+        return cls(_parse_iso(value))
+
+    @classmethod
+    def from_date(cls, value):
+        """Дата з date або datetime (час відкидається)"""
+        return cls(value.toordinal())
+
+    @classmethod
+    def today(cls):
+        """Поточна дата"""
+        return cls(date.today().toordinal())
+
+    def to_date(self):
+        """Перетворення у datetime.date"""
+        return date.fromordinal(self.ordinal)
+
+    def to_datetime(self):
+        """Перетворення у datetime (початок доби)"""
+        return datetime.fromordinal(self.ordinal)
+
+    def toordinal(self):
+        """Порядковий номер дня (сумісність з date)"""
+        return self.ordinal
+
+    def isoformat(self):
+        """Рядок РРРР-ММ-ДД"""
+        return date.fromordinal(self.ordinal).isoformat()
+
+    def strftime(self, pattern):
+        """Форматування як у date.strftime"""
+        return date.fromordinal(self.ordinal).strftime(pattern)
+
+    def weekday(self):
+        """День тижня: 0 - понеділок, 6 - неділя"""
+        return (self.ordinal - MONDAY_ORDINAL) % 7
+
+    @property
+    def year(self):
+        return date.fromordinal(self.ordinal).year
+
+    @property
+    def month(self):
+        return date.fromordinal(self.ordinal).month
+
+    @property
+    def day(self):
+        return date.fromordinal(self.ordinal).day
+
+    def __int__(self):
+        return self.ordinal
+
+    def __hash__(self):
+        return hash(self.ordinal)
+
+    def __eq__(self, other):
+        if isinstance(other, Day):
+            return self.ordinal == other.ordinal
+        return NotImplemented
+
+    def __lt__(self, other):
+        if isinstance(other, Day):
+            return self.ordinal < other.ordinal
+        return NotImplemented
+
+    def __le__(self, other):
+        if isinstance(other, Day):
+            return self.ordinal <= other.ordinal
+        return NotImplemented
+
+    def __gt__(self, other):
+        if isinstance(other, Day):
+            return self.ordinal > other.ordinal
+        return NotImplemented
+
+    def __ge__(self, other):
+        if isinstance(other, Day):
+            return self.ordinal >= other.ordinal
+        return NotImplemented
+
+    def __add__(self, days):
+        if isinstance(days, int):
+            return Day(self.ordinal + days)
+        return NotImplemented
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        # Day - Day дає кількість днів, Day - число - нову дату
+        if isinstance(other, Day):
+            return self.ordinal - other.ordinal
+        if isinstance(other, int):
+            return Day(self.ordinal - other)
+        return NotImplemented
+
+    def __repr__(self):
+        return f"Day({self.isoformat()})"
+
+    def __str__(self):
+        return self.isoformat()
+
+
+class DayColumn:
+    """Стовпець дат на основі array('i') порядкових номерів днів"""
+
+    __slots__ = ("ordinals",)
+
+    def __init__(self, ordinals=()):
+        # Готовий масив array('i') використовується без копіювання
+        if isinstance(ordinals, array) and ordinals.typecode == "i":
+            self.ordinals = ordinals
+        else:
+            self.ordinals = array("i", (to_day_ordinal(value) for value in ordinals))
+
+    @classmethod
+    def from_iso(cls, values):
+        """Стовпець з рядків РРРР-ММ-ДД (кожне унікальне значення розбирається один раз)"""
+        cache = {}
+        ordinals = array("i")
+        append = ordinals.append
+        for value in values:
+            ordinal = cache.get(value)
+            if ordinal is None:
+                ordinal = cache[value] = _parse_iso(value)
+            append(ordinal)
+        return cls(ordinals)
+
+    @classmethod
+    def from_dates(cls, values):
+        """Стовпець з date або datetime"""
+        return cls(array("i", (value.toordinal() for value in values)))
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Стовпець з байтів, записаних tobytes"""
+        ordinals = array("i")
+        ordinals.frombytes(data)
+        return cls(ordinals)
+
+    def tobytes(self):
+        """Байтове представлення масиву порядкових номерів"""
+        return self.ordinals.tobytes()
+
+    def to_dates(self):
+        """Список datetime.date"""
+        fromordinal = date.fromordinal
+        return [fromordinal(ordinal) for ordinal in self.ordinals]
+
+    def iter_iso(self):
+        """Генератор рядків РРРР-ММ-ДД (повторювані дати форматуються один раз)"""
+        cache = {}
+        for ordinal in self.ordinals:
+            text = cache.get(ordinal)
+            if text is None:
+                text = cache[ordinal] = date.fromordinal(ordinal).isoformat()
+            yield text
+
+    def to_iso(self):
+        """Список рядків РРРР-ММ-ДД"""
+        return list(self.iter_iso())
+
+    def weekdays(self):
+        """Дні тижня (0 - понеділок) як array('b')"""
+        return array("b", ((ordinal - MONDAY_ORDINAL) % 7 for ordinal in self.ordinals))
+
+    def append(self, value):
+        """Додавання дати (Day, рядок, date або datetime)"""
+        self.ordinals.append(to_day_ordinal(value))
+
+    def extend(self, values):
+        """Додавання кількох дат"""
+        if isinstance(values, DayColumn):
+            self.ordinals.extend(values.ordinals)
+        else:
+            self.ordinals.extend(to_day_ordinal(value) for value in values)
+
+    def __len__(self):
+        return len(self.ordinals)
+
+    def __iter__(self):
+        for ordinal in self.ordinals:
+            yield Day(ordinal)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return DayColumn(self.ordinals[index])
+        return Day(self.ordinals[index])
+
+    def __eq__(self, other):
+        if isinstance(other, DayColumn):
+            return self.ordinals == other.ordinals
+        return NotImplemented
+
+    def __repr__(self):
+        return f"DayColumn({len(self.ordinals)} дат)"
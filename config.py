@@ -9,7 +9,17 @@ DATABASE_CONFIG = {
     'user': 'root',
     'password': '1111',
     'charset': 'utf8mb4',
-    'collation': 'utf8mb4_unicode_ci'
+    'collation': 'utf8mb4_unicode_ci',
+    # Таймаут підключення (секунди), після якого вмикається файлова база
+    'connection_timeout': 3
+}
+
+# Резервне файлове сховище, якщо MySQL недоступний
+FILE_STORAGE_CONFIG = {
+    # 'json' - FileBackend, 'sharded' - ShardedFileBackend для кількох процесів
+    'backend': 'json',
+    'directory': '.',
+    'shards': 16
 }
 
 # Налаштування інтерфейсу
@@ -61,3 +71,78 @@ HISTORY_CONFIG = {
     'file_prefix': 'calculations_',
     'file_extension': '.json'
 }
+
+# Налаштування секціонування та архівування історії (MySQL)
+PARTITION_CONFIG = {
+    'retention_months': 24,
+    'months_ahead': 3,
+    'archive_mode': 'table',
+    'archive_dir': 'archive'
+}
+
+# Метрики продуктивності (metrics.py); вимкнені метрики не впливають на швидкодію
+METRICS_CONFIG = {
+    'enabled': False,
+    # Файл для node_exporter textfile collector (None - не записувати)
+    'textfile': None,
+    'textfile_interval': 15,
+    # Локальний HTTP endpoint /metrics (None - не запускати)
+    'http_port': None,
+    'http_host': '127.0.0.1',
+    # Інтервал знімків у журнал (секунди, None - не записувати)
+    'log_interval': 300,
+    'log_file': 'metrics.log'
+}
+
+# Часові пояси (timezones.py): пояс за замовчуванням та пояси офісів
+TIMEZONE_CONFIG = {
+    'default_zone': 'Europe/Kyiv',
+    'offices': {
+        'Київ': 'Europe/Kyiv',
+        'Варшава': 'Europe/Warsaw',
+        'Нью-Йорк': 'America/New_York'
+    }
+}
+
+# Спільний кеш результатів обчислень (result_cache.py)
+RESULT_CACHE_CONFIG = {
+    'enabled': True,
+    'max_size': 10000,
+    # Час життя запису (секунди, None - без обмеження)
+    'ttl': 86400,
+    # Файл для збереження кешу між запусками (None - лише в пам'яті)
+    'filename': None
+}
+
+# Фіскальний календар (periods.py)
+FISCAL_CONFIG = {
+    # Місяць початку фіскального року (1 - збігається з календарним)
+    'start_month': 1,
+    # Тижні у періодах кварталу, наприклад (4, 4, 5); None - помісячні періоди
+    'week_pattern': None,
+    # День тижня кінця тижневого року (0 - понеділок, 5 - субота)
+    'end_weekday': 5,
+    # 'last' - останній такий день місяця, 'nearest' - найближчий до кінця місяця
+    'end_rule': 'last'
+}
+
+# Знімок календарних таблиць для швидкого запуску (calendar_snapshot.py)
+CALENDAR_SNAPSHOT_CONFIG = {
+    # None - каталог кешу користувача (calendar_snapshot.default_snapshot_path)
+    'path': None,
+    'first_year': 1900,
+    'last_year': 2100
+}
+
+# Графік роботи (business_hours.py)
+BUSINESS_HOURS_CONFIG = {
+    # Робочий час за днями тижня (Пн-Нд), None - вихідний
+    'week': ['09:00-18:00', '09:00-18:00', '09:00-18:00', '09:00-18:00',
+             '09:00-18:00', None, None],
+    # Перерви (обід), які не входять у робочий час
+    'breaks': ['13:00-14:00'],
+    # Скорочення передсвяткового робочого дня (хвилини)
+    'pre_holiday_minutes': 60,
+    # Пояс для aware міток часу (None - використовується місцевий час мітки)
+    'zone': None
+}
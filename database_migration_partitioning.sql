@@ -0,0 +1,96 @@
+-- Міграція існуючої бази: перехід таблиці calculations на помісячні секції
+-- Виконання: mysql -u root -p datetime_app < database_migration_partitioning.sql
+--
+-- Дані копіюються в нову секційовану таблицю пакетами за id, після чого
+-- таблиці міняються місцями однією операцією RENAME TABLE. Перед останнім
+-- кроком програму слід зупинити, щоб нові записи не з'являлись під час
+-- дочитування хвоста. Стара таблиця лишається як calculations_unpartitioned
+-- і видаляється вручну після перевірки.
+
+USE datetime_app;
+
+-- 1. Нова секційована таблиця (структура як у database_setup.sql та
+--    partitions.CALCULATIONS_COLUMNS; секції після 2026-12 програма додає сама)
+CREATE TABLE IF NOT EXISTS calculations_partitioned (
+    id INT AUTO_INCREMENT NOT NULL,
+    user_id INT NOT NULL,
+    calculation_type VARCHAR(50) NOT NULL,
+    input_data TEXT NOT NULL,
+    result TEXT NOT NULL,
+    created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (id, created_at),
+    KEY idx_user_history (user_id, created_at, id),
+    KEY idx_user_type_history (user_id, calculation_type, created_at)
+)
+PARTITION BY RANGE COLUMNS (created_at) (
+    PARTITION p_old VALUES LESS THAN ('2025-01-01'),
+    PARTITION p202501 VALUES LESS THAN ('2025-02-01'),
+    PARTITION p202502 VALUES LESS THAN ('2025-03-01'),
+    PARTITION p202503 VALUES LESS THAN ('2025-04-01'),
+    PARTITION p202504 VALUES LESS THAN ('2025-05-01'),
+    PARTITION p202505 VALUES LESS THAN ('2025-06-01'),
+    PARTITION p202506 VALUES LESS THAN ('2025-07-01'),
+    PARTITION p202507 VALUES LESS THAN ('2025-08-01'),
+    PARTITION p202508 VALUES LESS THAN ('2025-09-01'),
+    PARTITION p202509 VALUES LESS THAN ('2025-10-01'),
+    PARTITION p202510 VALUES LESS THAN ('2025-11-01'),
+    PARTITION p202511 VALUES LESS THAN ('2025-12-01'),
+    PARTITION p202512 VALUES LESS THAN ('2026-01-01'),
+    PARTITION p202601 VALUES LESS THAN ('2026-02-01'),
+    PARTITION p202602 VALUES LESS THAN ('2026-03-01'),
+    PARTITION p202603 VALUES LESS THAN ('2026-04-01'),
+    PARTITION p202604 VALUES LESS THAN ('2026-05-01'),
+    PARTITION p202605 VALUES LESS THAN ('2026-06-01'),
+    PARTITION p202606 VALUES LESS THAN ('2026-07-01'),
+    PARTITION p202607 VALUES LESS THAN ('2026-08-01'),
+    PARTITION p202608 VALUES LESS THAN ('2026-09-01'),
+    PARTITION p202609 VALUES LESS THAN ('2026-10-01'),
+    PARTITION p202610 VALUES LESS THAN ('2026-11-01'),
+    PARTITION p202611 VALUES LESS THAN ('2026-12-01'),
+    PARTITION p202612 VALUES LESS THAN ('2027-01-01'),
+    PARTITION pmax VALUES LESS THAN (MAXVALUE)
+);
+
+-- 2. Пакетне копіювання даних (короткі транзакції замість одного великого INSERT)
+DROP PROCEDURE IF EXISTS copy_calculations_to_partitioned;
+
+DELIMITER //
+CREATE PROCEDURE copy_calculations_to_partitioned(IN batch_size INT)
+BEGIN
+    DECLARE last_id INT DEFAULT 0;
+    DECLARE max_id INT DEFAULT 0;
+
+    SELECT COALESCE(MAX(id), 0) INTO last_id FROM calculations_partitioned;
+    SELECT COALESCE(MAX(id), 0) INTO max_id FROM calculations;
+
+    WHILE last_id < max_id DO
+        INSERT INTO calculations_partitioned
+            (id, user_id, calculation_type, input_data, result, created_at)
+        SELECT id, COALESCE(user_id, 0), COALESCE(calculation_type, ''),
+               COALESCE(input_data, ''), COALESCE(result, ''),
+               COALESCE(created_at, CURRENT_TIMESTAMP)
+        FROM calculations
+        WHERE id > last_id AND id <= last_id + batch_size;
+
+        SET last_id = last_id + batch_size;
+        COMMIT;
+    END WHILE;
+END //
+DELIMITER ;
+
+CALL copy_calculations_to_partitioned(50000);
+
+-- 3. Дочитування записів, що з'явились під час копіювання (програма зупинена)
+CALL copy_calculations_to_partitioned(50000);
+
+-- 4. Атомарна заміна таблиць
+RENAME TABLE calculations TO calculations_unpartitioned,
+             calculations_partitioned TO calculations;
+
+DROP PROCEDURE copy_calculations_to_partitioned;
+
+-- Перевірка
+SELECT PARTITION_NAME, TABLE_ROWS
+FROM information_schema.PARTITIONS
+WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'calculations'
+ORDER BY PARTITION_ORDINAL_POSITION;
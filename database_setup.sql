@@ -18,20 +18,71 @@ CREATE TABLE IF NOT EXISTS users (
     is_active BOOLEAN DEFAULT TRUE
 );
 
--- Створення таблиці обчислень
+-- Створення таблиці обчислень з помісячним розбиттям на секції за created_at.
+-- Секційовані таблиці MySQL не підтримують зовнішні ключі, а кожен унікальний
+-- ключ повинен містити колонку розбиття, тому первинний ключ - (id, created_at),
+-- а записи видаленого користувача прибирає програма.
+-- Колонки та ключі повинні збігатися з partitions.CALCULATIONS_COLUMNS, за якими
+-- таблицю створює програма. Нові секції додаються при кожному підключенні
+-- програми до MySQL (PartitionManager.ensure_future_partitions), старі
+-- архівуються модулем partitions.py (python batch.py retention).
 CREATE TABLE IF NOT EXISTS calculations (
-    id INT AUTO_INCREMENT PRIMARY KEY,
+    id INT AUTO_INCREMENT NOT NULL,
     user_id INT NOT NULL,
     calculation_type VARCHAR(50) NOT NULL,
     input_data TEXT NOT NULL,
     result TEXT NOT NULL,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+    created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (id, created_at),
+    -- Покриває WHERE user_id та ORDER BY created_at запиту історії
+    KEY idx_user_history (user_id, created_at, id),
+    KEY idx_user_type_history (user_id, calculation_type, created_at)
+)
+PARTITION BY RANGE COLUMNS (created_at) (
+    PARTITION p_old VALUES LESS THAN ('2025-01-01'),
+    PARTITION p202501 VALUES LESS THAN ('2025-02-01'),
+    PARTITION p202502 VALUES LESS THAN ('2025-03-01'),
+    PARTITION p202503 VALUES LESS THAN ('2025-04-01'),
+    PARTITION p202504 VALUES LESS THAN ('2025-05-01'),
+    PARTITION p202505 VALUES LESS THAN ('2025-06-01'),
+    PARTITION p202506 VALUES LESS THAN ('2025-07-01'),
+    PARTITION p202507 VALUES LESS THAN ('2025-08-01'),
+    PARTITION p202508 VALUES LESS THAN ('2025-09-01'),
+    PARTITION p202509 VALUES LESS THAN ('2025-10-01'),
+    PARTITION p202510 VALUES LESS THAN ('2025-11-01'),
+    PARTITION p202511 VALUES LESS THAN ('2025-12-01'),
+    PARTITION p202512 VALUES LESS THAN ('2026-01-01'),
+    PARTITION p202601 VALUES LESS THAN ('2026-02-01'),
+    PARTITION p202602 VALUES LESS THAN ('2026-03-01'),
+    PARTITION p202603 VALUES LESS THAN ('2026-04-01'),
+    PARTITION p202604 VALUES LESS THAN ('2026-05-01'),
+    PARTITION p202605 VALUES LESS THAN ('2026-06-01'),
+    PARTITION p202606 VALUES LESS THAN ('2026-07-01'),
+    PARTITION p202607 VALUES LESS THAN ('2026-08-01'),
+    PARTITION p202608 VALUES LESS THAN ('2026-09-01'),
+    PARTITION p202609 VALUES LESS THAN ('2026-10-01'),
+    PARTITION p202610 VALUES LESS THAN ('2026-11-01'),
+    PARTITION p202611 VALUES LESS THAN ('2026-12-01'),
+    PARTITION p202612 VALUES LESS THAN ('2027-01-01'),
+    PARTITION pmax VALUES LESS THAN (MAXVALUE)
+);
+
+-- Створення таблиці нагадувань планувальника (scheduler.py); ідентифікатори
+-- призначає планувальник, тому без AUTO_INCREMENT. Колонки повинні збігатися
+-- з таблицею, яку створює програма (storage.py)
+CREATE TABLE IF NOT EXISTS reminders (
+    id BIGINT PRIMARY KEY,
+    user_id INT NULL,
+    due DATETIME NOT NULL,
+    kind VARCHAR(50),
+    payload TEXT,
+    repeat_rule VARCHAR(20) NULL,
+    anchor DATE NULL,
+    lead_days INT NOT NULL DEFAULT 0,
+    INDEX idx_reminders_due (due)
 );
 
 -- Створення індексів для оптимізації
-CREATE INDEX idx_user_calculations ON calculations(user_id, created_at);
-CREATE INDEX idx_calculation_type ON calculations(calculation_type);
 CREATE INDEX idx_username ON users(username);
 
 -- Вставка тестового користувача (опціонально)
@@ -44,4 +95,5 @@ SHOW TABLES;
 
 -- Показати структуру таблиць
 DESCRIBE users;
-DESCRIBE calculations;
\ No newline at end of file
+DESCRIBE calculations;
+DESCRIBE reminders;
\ No newline at end of file
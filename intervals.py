@@ -0,0 +1,203 @@
+"""
+Індекс періодів дат (відпустки, договори, лікарняні)
+
+Періоди зберігаються як порядкові номери днів (date.toordinal) включно з
+обома межами. Індекс будується пакетно: періоди сортуються за початком, а
+над відсортованим масивом задається неявне збалансоване дерево (вузол -
+середина діапазону), де для кожного вузла зберігається найпізніший кінець
+у піддереві. Пошук періодів, що перетинаються з діапазоном, відкидає
+піддерева за цим максимумом і працює за O(log n + k).
+
+Об'єднання періодів (merged) дає непересічні діапазони, за якими робочі
+дні рахуються без подвійного врахування формулою count_working_days.
+"""
+
+from bisect import bisect_right
+from datetime import date, datetime
+
+
+def to_ordinal(value):
+    """Порядковий номер дня для рядка РРРР-ММ-ДД, date або datetime"""
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str):
+        value = datetime.strptime(value.strip(), "%Y-%m-%d")
+    return value.toordinal()
+
+
+def count_working_days(first_ordinal, last_ordinal):
+    """Кількість днів Пн-Пт між днями включно за O(1)"""
+    total_days = last_ordinal - first_ordinal + 1
+    if total_days <= 0:
+        return 0
+
+    # Повні тижні дають по 5 робочих днів, залишок (до 6 днів)
+    # перевіряється за днями тижня (порядковий день 1 - понеділок)
+    weeks, rest = divmod(total_days, 7)
+    first_weekday = (first_ordinal - 1) % 7
+    return weeks * 5 + sum(1 for offset in range(rest) if (first_weekday + offset) % 7 < 5)
+
+
+def merge_ranges(ranges):
+    """Об'єднання відсортованих за початком діапазонів (суміжні теж зливаються)"""
+    merged = []
+    for start, end in ranges:
+        if merged and start <= merged[-1][1] + 1:
+            if end > merged[-1][1]:
+                merged[-1][1] = end
+        else:
+            merged.append([start, end])
+    return [tuple(item) for item in merged]
+
+
+class DateRangeIndex:
+    """Індекс періодів дат з пошуком перетинів, об'єднанням та пошуком вільних днів"""
+
+    def __init__(self, periods=()):
+        self._pending = []
+        self.starts = []
+        self.ends = []
+        self.payloads = []
+        self._max_end = []
+        self._merged = None
+        self.bulk_load(periods)
+
+    def __len__(self):
+        return len(self.starts) + len(self._pending)
+
+    def add(self, start, end, payload=None):
+        """Додавання періоду (індекс перебудовується перед наступним запитом)"""
+        first, last = to_ordinal(start), to_ordinal(end)
+        if last < first:
+            raise ValueError(f"Кінець періоду раніше початку: {start} - {end}")
+        self._pending.append((first, last, payload))
+        self._merged = None
+
+    def bulk_load(self, periods):
+        """Пакетне додавання періодів: (початок, кінець) або (початок, кінець, дані)"""
+        for period in periods:
+            self.add(*period)
+
+    def _build(self):
+        """Сортування періодів та обчислення максимумів кінців піддерев"""
+        if not self._pending:
+            return
+
+        items = list(zip(self.starts, self.ends, self.payloads)) + self._pending
+        items.sort(key=lambda item: (item[0], item[1]))
+        self._pending = []
+        self.starts = [item[0] for item in items]
+        self.ends = [item[1] for item in items]
+        self.payloads = [item[2] for item in items]
+        self._max_end = [0] * len(items)
+
+        # Обхід неявного дерева знизу вгору: діапазони [low, high), вузол - середина
+        stack = [(0, len(items), False)]
+        while stack:
+            low, high, ready = stack.pop()
+            if low >= high:
+                continue
+            middle = (low + high) // 2
+            if not ready:
+                stack.append((low, high, True))
+                stack.append((low, middle, False))
+                stack.append((middle + 1, high, False))
+                continue
+
+            max_end = self.ends[middle]
+            if low < middle:
+                max_end = max(max_end, self._max_end[(low + middle) // 2])
+            if middle + 1 < high:
+                max_end = max(max_end, self._max_end[(middle + 1 + high) // 2])
+            self._max_end[middle] = max_end
+
+    def overlapping(self, start, end=None):
+        """Періоди, що перетинаються з діапазоном (або містять день, якщо end не задано)
+
+        Повертає список (початок, кінець, дані) з датами як date.
+        """
+        self._build()
+        first = to_ordinal(start)
+        last = to_ordinal(end) if end is not None else first
+        starts, ends, max_end = self.starts, self.ends, self._max_end
+        result = []
+
+        stack = [(0, len(starts))]
+        while stack:
+            low, high = stack.pop()
+            if low >= high:
+                continue
+            middle = (low + high) // 2
+            # Жоден період піддерева не закінчується після початку запиту
+            if max_end[middle] < first:
+                continue
+            # Права частина (та сам вузол) починається після кінця запиту
+            if starts[middle] > last:
+                stack.append((low, middle))
+                continue
+
+            if ends[middle] >= first:
+                result.append(middle)
+            stack.append((middle + 1, high))
+            stack.append((low, middle))
+
+        result.sort()
+        return [(date.fromordinal(starts[i]), date.fromordinal(ends[i]), self.payloads[i])
+                for i in result]
+
+    def merged(self):
+        """Об'єднані непересічні діапазони порядкових днів [(початок, кінець)]"""
+        self._build()
+        if self._merged is None:
+            self._merged = merge_ranges(zip(self.starts, self.ends))
+        return self._merged
+
+    def merged_between(self, start=None, end=None):
+        """Об'єднані діапазони порядкових днів, обрізані межами start та end"""
+        merged = self.merged()
+        if start is None and end is None:
+            return merged
+
+        first = to_ordinal(start) if start is not None else merged[0][0] if merged else 0
+        last = to_ordinal(end) if end is not None else merged[-1][1] if merged else -1
+        # Перший діапазон, що може містити first
+        position = max(bisect_right(merged, (first, float("inf"))) - 1, 0)
+        clipped = []
+        for range_start, range_end in merged[position:]:
+            if range_start > last:
+                break
+            if range_end < first:
+                continue
+            clipped.append((max(range_start, first), min(range_end, last)))
+        return clipped
+
+    def covered_days(self, start=None, end=None):
+        """Кількість днів, покритих періодами (без подвійного врахування)"""
+        return sum(last - first + 1 for first, last in self.merged_between(start, end))
+
+    def covered_working_days(self, start=None, end=None, schedule=None):
+        """Робочі дні, покриті періодами, без подвійного врахування
+
+        Без графіка рахуються дні Пн-Пт, з графіком (BusinessSchedule) -
+        робочі дні з урахуванням свят.
+        """
+        total = 0
+        for first, last in self.merged_between(start, end):
+            if schedule is None:
+                total += count_working_days(first, last)
+            else:
+                total += schedule.working_days(date.fromordinal(first), date.fromordinal(last))
+        return total
+
+    def gaps(self, start, end):
+        """Вільні (не покриті жодним періодом) діапазони між датами: [(date, date)]"""
+        first, last = to_ordinal(start), to_ordinal(end)
+        free = []
+        cursor = first
+        for range_start, range_end in self.merged_between(first, last):
+            if range_start > cursor:
+                free.append((cursor, range_start - 1))
+            cursor = range_end + 1
+        if cursor <= last:
+            free.append((cursor, last))
+        return [(date.fromordinal(a), date.fromordinal(b)) for a, b in free]
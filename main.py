@@ -10,31 +10,156 @@ import calendar
 import locale
 import mysql.connector
 from mysql.connector import Error
-import hashlib
-import json
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from array import array
+
+from storage import FileBackend, MySQLBackend, ShardedFileBackend
+import metrics
+from timezones import local_date, zoned_add, zoned_difference
+from business_hours import BusinessSchedule
+from recurrence import RecurrenceRule
+from intervals import DateRangeIndex, count_working_days
+from compact_dates import DayColumn, as_datetime
+from periods import FiscalCalendar, PeriodCalculator
+from birthdays import BirthdayIndex, age_on, next_birthday
+from result_cache import CachedCalculator, get_shared_cache, save_shared_cache
+from utils import HolidayCalculator, get_config_manager
 
 
 class DatabaseManager:
-    """Клас для управління базою даних користувачів"""
+    """Клас для управління базою даних користувачів
+
+    Операції виконуються через бекенд сховища (storage.py): MySQL, якщо
+    підключення вдалося, інакше файлова база. Бекенд можна передати явно
+    (наприклад, MemoryBackend для тестів) - тоді підключення до MySQL
+    не виконується.
+    """
+
+    def __init__(self, connect_async=False, connect_timeout=None, backend=None):
+        self.backend = backend
+        self._connect_timeout = connect_timeout
+        self._connect_future = None
+        self._connect_abandoned = False
+        # Відмова від підключення та встановлення пізнього з'єднання не перетинаються
+        self._connect_lock = threading.Lock()
+        self._file_backend = (backend if isinstance(backend, (FileBackend, ShardedFileBackend))
+                              else None)
+
+        if backend is not None:
+            return
 
-    def __init__(self):
-        self.connection = None
+        if connect_async:
+            # Підключення у фоні, щоб не блокувати показ вікна авторизації
+            executor = ThreadPoolExecutor(max_workers=1)
+            self._connect_future = executor.submit(self._connect)
+            executor.shutdown(wait=False)
+        else:
+            self._connect()
+
+    @property
+    def connect_timeout(self):
+        """Таймаут підключення: явний або поточний 'database.connection_timeout'"""
+        if self._connect_timeout is not None:
+            return self._connect_timeout
+        return get_config_manager().get('database.connection_timeout', 3)
+
+    def _connection_config(self):
+        """Параметри підключення MySQL з конфігурації (з урахуванням перезавантаження)"""
+        config = get_config_manager().get('database', {})
+        config['connection_timeout'] = self.connect_timeout
+        return config
+
+    @property
+    def connection(self):
+        """З'єднання MySQL або None, якщо використовується інше сховище"""
+        if isinstance(self.backend, MySQLBackend):
+            return self.backend.connection
+        return None
+
+    @connection.setter
+    def connection(self, connection):
+        """Встановлення з'єднання MySQL (None - перехід на файлову базу)"""
+        if connection is None:
+            self.backend = self.file_backend
+        else:
+            self.backend = MySQLBackend(connection)
+
+    @property
+    def file_backend(self):
+        """Файлове сховище для резервних file_* методів"""
+        if self._file_backend is None:
+            config = get_config_manager().get('file_storage')
+            if config['backend'] == 'sharded':
+                self._file_backend = ShardedFileBackend(config['directory'], config['shards'])
+            else:
+                self._file_backend = FileBackend(config['directory'])
+        return self._file_backend
+
+    def _connect(self):
+        """Підключення до бази даних та створення таблиць"""
         self.create_connection()
         self.create_tables()
 
+    def wait_for_connection(self, timeout=None):
+        """Очікування завершення фонового підключення (якщо воно ще триває)"""
+        future = self._connect_future
+        if future is None:
+            return True
+
+        try:
+            future.result(timeout=timeout)
+        except FutureTimeoutError:
+            return False
+        except Exception as e:
+            print(f"Помилка фонового підключення: {e}")
+            self.use_file_database()
+
+        self._connect_future = None
+        return True
+
+    def abandon_connection(self):
+        """Відмова від фонового підключення, що не завершилось вчасно (перехід на файлову базу)"""
+        with self._connect_lock:
+            if not self.is_connecting():
+                return False
+            self._connect_abandoned = True
+            self._connect_future = None
+            self.use_file_database()
+        return True
+
+    def is_connecting(self):
+        """Перевірка чи триває фонове підключення"""
+        return self._connect_future is not None and not self._connect_future.done()
+
+    def backend_status(self):
+        """Поточний стан сховища: 'connecting' або назва бекенда ('mysql', 'file', ...)"""
+        if self.is_connecting() or self.backend is None:
+            return "connecting"
+        return self.backend.name
+
+    def get_backend(self):
+        """Активний бекенд сховища (з очікуванням фонового підключення)"""
+        self.wait_for_connection()
+        if self.backend is None:
+            self.use_file_database()
+        return self.backend
+
     def create_connection(self):
         """Створення з'єднання з базою даних MySQL"""
         try:
             # Спроба підключення до локальної бази даних
-            self.connection = mysql.connector.connect(
-                host='localhost',
-                database='datetime_app',
-                user='root',
-                password='1111',
-                charset='utf8mb4',
-                collation='utf8mb4_unicode_ci'
-            )
+            connection = mysql.connector.connect(**self._connection_config())
+            with self._connect_lock:
+                abandoned = self._connect_abandoned
+                if not abandoned:
+                    self.connection = connection
+            if abandoned:
+                # Вікно вже перейшло на файлову базу - пізнє з'єднання не використовується
+                connection.close()
+                return
             print("Успішне підключення до MySQL")
         except Error as e:
             print(f"Помилка підключення до MySQL: {e}")
@@ -47,199 +172,149 @@ class DatabaseManager:
 
     def create_tables(self):
         """Створення таблиць в базі даних"""
-        if not self.connection:
-            return
-
-        try:
-            cursor = self.connection.cursor()
-
-            # Створення таблиці користувачів
-            create_users_table = """
-            CREATE TABLE IF NOT EXISTS users (
-                id INT AUTO_INCREMENT PRIMARY KEY,
-                username VARCHAR(50) UNIQUE NOT NULL,
-                password_hash VARCHAR(255) NOT NULL,
-                email VARCHAR(100),
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-            """
-
-            # Створення таблиці історії обчислень
-            create_calculations_table = """
-            CREATE TABLE IF NOT EXISTS calculations (
-                id INT AUTO_INCREMENT PRIMARY KEY,
-                user_id INT,
-                calculation_type VARCHAR(50),
-                input_data TEXT,
-                result TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users(id)
-            )
-            """
-
-            cursor.execute(create_users_table)
-            cursor.execute(create_calculations_table)
-            self.connection.commit()
-            print("Таблиці створено успішно")
-
-        except Error as e:
-            print(f"Помилка створення таблиць: {e}")
+        if isinstance(self.backend, MySQLBackend):
+            self.backend.create_tables()
 
     def register_user(self, username, password, email=""):
         """Реєстрація нового користувача"""
-        if not self.connection:
-            return self.file_register_user(username, password, email)
-
-        try:
-            cursor = self.connection.cursor()
-            password_hash = hashlib.sha256(password.encode()).hexdigest()
-
-            query = "INSERT INTO users (username, password_hash, email) VALUES (%s, %s, %s)"
-            cursor.execute(query, (username, password_hash, email))
-            self.connection.commit()
-            return True
-
-        except Error as e:
-            print(f"Помилка реєстрації: {e}")
-            return False
+        return self.get_backend().register_user(username, password, email)
 
     def login_user(self, username, password):
         """Авторизація користувача"""
-        if not self.connection:
-            return self.file_login_user(username, password)
+        return self.get_backend().login_user(username, password)
 
-        try:
-            cursor = self.connection.cursor()
-            password_hash = hashlib.sha256(password.encode()).hexdigest()
+    def save_calculation(self, user_id, calc_type, input_data, result):
+        """Збереження результату обчислення"""
+        return self.get_backend().save_calculation(user_id, calc_type, input_data, result)
 
-            query = "SELECT id, username FROM users WHERE username = %s AND password_hash = %s"
-            cursor.execute(query, (username, password_hash))
-            result = cursor.fetchone()
+    def save_calculations_batch(self, user_id, rows):
+        """Збереження пакета обчислень однією транзакцією
 
-            if result:
-                return {"id": result[0], "username": result[1]}
-            return None
+        rows - послідовність кортежів (тип, вхідні дані, результат, час),
+        де час може бути None (тоді використовується поточний).
+        """
+        return self.get_backend().save_calculations_batch(user_id, rows)
 
-        except Error as e:
-            print(f"Помилка авторизації: {e}")
-            return None
+    def load_calculations_infile(self, user_id, filename):
+        """Швидке завантаження CSV у MySQL через LOAD DATA LOCAL INFILE
 
-    def save_calculation(self, user_id, calc_type, input_data, result):
-        """Збереження результату обчислення"""
+        Файл повинен мати формат export_calculations_to_csv (заголовок,
+        колонки тип/вхідні дані/результат/дата). Рядки не валідуються.
+        Повертає кількість завантажених рядків або None у разі помилки.
+        """
+        self.wait_for_connection()
         if not self.connection:
-            return self.file_save_calculation(user_id, calc_type, input_data, result)
+            return None
 
+        connection = None
         try:
-            cursor = self.connection.cursor()
-            query = """INSERT INTO calculations (user_id, calculation_type, input_data, result) 
-                      VALUES (%s, %s, %s, %s)"""
-            cursor.execute(query, (user_id, calc_type,
-                           str(input_data), str(result)))
-            self.connection.commit()
+            # LOCAL INFILE дозволяється лише для окремого з'єднання імпорту
+            connection = mysql.connector.connect(**self._connection_config(),
+                                                 allow_local_infile=True)
+            cursor = connection.cursor()
+
+            query = """LOAD DATA LOCAL INFILE %s INTO TABLE calculations
+                      CHARACTER SET utf8mb4
+                      FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '"' ESCAPED BY ''
+                      LINES TERMINATED BY '\\r\\n' IGNORE 1 LINES
+                      (calculation_type, input_data, result, @created_at)
+                      SET user_id = %s,
+                          created_at = COALESCE(NULLIF(@created_at, ''), CURRENT_TIMESTAMP)"""
+            cursor.execute(query, (os.path.abspath(filename), user_id))
+            connection.commit()
+            return cursor.rowcount
 
         except Error as e:
-            print(f"Помилка збереження обчислення: {e}")
+            print(f"Помилка завантаження файлу: {e}")
+            return None
+
+        finally:
+            if connection is not None:
+                connection.close()
 
     def get_user_calculations(self, user_id):
         """Отримання історії обчислень користувача"""
-        if not self.connection:
-            return self.file_get_calculations(user_id)
+        return self.get_backend().get_user_calculations(user_id)
 
-        try:
-            cursor = self.connection.cursor()
-            query = """SELECT calculation_type, input_data, result, created_at 
-                      FROM calculations WHERE user_id = %s ORDER BY created_at DESC LIMIT 10"""
-            cursor.execute(query, (user_id,))
-            return cursor.fetchall()
+    def get_calculations_page(self, user_id, offset=0, limit=50,
+                              sort_by="created_at", descending=True,
+                              calc_type=None):
+        """Отримання сторінки історії з сортуванням та фільтром на боці бази
 
-        except Error as e:
-            print(f"Помилка отримання історії: {e}")
-            return []
+        Повертає список кортежів (id, тип, вхідні дані, результат, час).
+        """
+        return self.get_backend().get_calculations_page(
+            user_id, offset, limit, sort_by, descending, calc_type)
 
-    # Файлові методи як резервні
-    def file_register_user(self, username, password, email=""):
-        """Реєстрація користувача у файлі"""
-        users_file = "users.json"
-        users = {}
+    def count_user_calculations(self, user_id, calc_type=None):
+        """Кількість записів в історії користувача"""
+        return self.get_backend().count_user_calculations(user_id, calc_type)
 
-        if os.path.exists(users_file):
-            with open(users_file, 'r', encoding='utf-8') as f:
-                users = json.load(f)
+    def get_calculation_types(self, user_id):
+        """Список типів обчислень користувача (для фільтра історії)"""
+        return self.get_backend().get_calculation_types(user_id)
 
-        if username in users:
-            return False
+    def iter_user_calculations(self, user_id, chunk_size=1000):
+        """Потокове читання всієї історії користувача порціями
 
-        password_hash = hashlib.sha256(password.encode()).hexdigest()
-        users[username] = {
-            "password_hash": password_hash,
-            "email": email,
-            "id": len(users) + 1
-        }
+        Генератор повертає списки до chunk_size кортежів (тип, вхідні дані,
+        результат, час) у хронологічному порядку. Для MySQL використовується
+        небуферизований курсор, тому в пам'яті одночасно лише одна порція.
+        """
+        return self.get_backend().iter_user_calculations(user_id, chunk_size)
 
-        with open(users_file, 'w', encoding='utf-8') as f:
-            json.dump(users, f, ensure_ascii=False, indent=2)
+    def save_reminders(self, reminders):
+        """Вставка або оновлення нагадувань планувальника (scheduler.py)"""
+        return self.get_backend().save_reminders(reminders)
 
-        return True
-
-    def file_login_user(self, username, password):
-        """Авторизація користувача з файлу"""
-        users_file = "users.json"
-
-        if not os.path.exists(users_file):
-            return None
+    def delete_reminders(self, reminder_ids):
+        """Видалення нагадувань планувальника"""
+        return self.get_backend().delete_reminders(reminder_ids)
 
-        with open(users_file, 'r', encoding='utf-8') as f:
-            users = json.load(f)
+    def load_reminders(self):
+        """Усі збережені нагадування планувальника"""
+        return self.get_backend().load_reminders()
 
-        if username not in users:
-            return None
-
-        password_hash = hashlib.sha256(password.encode()).hexdigest()
-        if users[username]["password_hash"] == password_hash:
-            return {"id": users[username]["id"], "username": username}
+    # Файлові методи як резервні
+    def file_register_user(self, username, password, email=""):
+        """Реєстрація користувача у файлі"""
+        return self.file_backend.register_user(username, password, email)
 
-        return None
+    def file_login_user(self, username, password):
+        """Авторизація користувача з файлу"""
+        return self.file_backend.login_user(username, password)
 
     def file_save_calculation(self, user_id, calc_type, input_data, result):
         """Збереження обчислення у файл"""
-        calc_file = f"calculations_{user_id}.json"
-        calculations = []
-
-        if os.path.exists(calc_file):
-            with open(calc_file, 'r', encoding='utf-8') as f:
-                calculations = json.load(f)
-
-        calculations.append({
-            "type": calc_type,
-            "input": str(input_data),
-            "result": str(result),
-            "timestamp": datetime.now().isoformat()
-        })
-
-        # Зберігаємо тільки останні 10 обчислень
-        calculations = calculations[-10:]
+        self.file_backend.save_calculation(user_id, calc_type, input_data, result)
 
-        with open(calc_file, 'w', encoding='utf-8') as f:
-            json.dump(calculations, f, ensure_ascii=False, indent=2)
+    def file_save_calculations_batch(self, user_id, rows):
+        """Пакетне збереження обчислень у файл"""
+        return self.file_backend.save_calculations_batch(user_id, rows)
 
     def file_get_calculations(self, user_id):
         """Отримання історії обчислень з файлу"""
-        calc_file = f"calculations_{user_id}.json"
+        return self.file_backend.get_user_calculations(user_id)
 
-        if not os.path.exists(calc_file):
-            return []
-
-        with open(calc_file, 'r', encoding='utf-8') as f:
-            calculations = json.load(f)
+    def file_get_calculations_page(self, user_id, offset=0, limit=50,
+                                   sort_by="created_at", descending=True,
+                                   calc_type=None):
+        """Отримання сторінки історії з файлу"""
+        return self.file_backend.get_calculations_page(
+            user_id, offset, limit, sort_by, descending, calc_type)
 
-        return [(calc["type"], calc["input"], calc["result"], calc["timestamp"])
-                for calc in reversed(calculations)]
+    def file_iter_calculations(self, user_id, chunk_size=1000):
+        """Потокове читання історії з файлу порціями"""
+        return self.file_backend.iter_user_calculations(user_id, chunk_size)
 
 
 class DateTimeCalculator:
     """Основний клас для обчислень з датами та часом"""
 
     def __init__(self):
+        self._periods = None
+        self.holiday_calculator = HolidayCalculator()
+
         # Встановлення української локалі
         try:
             locale.setlocale(locale.LC_TIME, 'uk_UA.UTF-8')
@@ -252,10 +327,8 @@ class DateTimeCalculator:
     def calculate_date_difference(self, date1, date2):
         """Обчислення різниці між датами"""
         try:
-            if isinstance(date1, str):
-                date1 = datetime.strptime(date1, "%Y-%m-%d")
-            if isinstance(date2, str):
-                date2 = datetime.strptime(date2, "%Y-%m-%d")
+            date1 = as_datetime(date1)
+            date2 = as_datetime(date2)
 
             difference = abs((date2 - date1).days)
 
@@ -281,8 +354,7 @@ class DateTimeCalculator:
     def get_day_of_week(self, date):
         """Визначення дня тижня"""
         try:
-            if isinstance(date, str):
-                date = datetime.strptime(date, "%Y-%m-%d")
+            date = as_datetime(date)
 
             days_uk = [
                 "Понеділок", "Вівторок", "Середа", "Четвер",
@@ -304,8 +376,7 @@ class DateTimeCalculator:
     def add_days_to_date(self, date, days):
         """Додавання днів до дати"""
         try:
-            if isinstance(date, str):
-                date = datetime.strptime(date, "%Y-%m-%d")
+            date = as_datetime(date)
 
             new_date = date + timedelta(days=days)
 
@@ -318,36 +389,38 @@ class DateTimeCalculator:
         except Exception as e:
             raise ValueError(f"Помилка додавання днів: {e}")
 
-    def get_age(self, birth_date):
-        """Обчислення віку"""
+    def get_age(self, birth_date, reference_date=None):
+        """Обчислення віку (на поточну дату або на reference_date)"""
         try:
-            if isinstance(birth_date, str):
-                birth_date = datetime.strptime(birth_date, "%Y-%m-%d")
-
-            today = datetime.now()
-            age = today.year - birth_date.year
-
-            # Перевірка, чи був день народження в цьому році
-            if today.month < birth_date.month or \
-               (today.month == birth_date.month and today.day < birth_date.day):
-                age -= 1
+            birth_date = as_datetime(birth_date)
 
-            # Обчислення точного віку
-            next_birthday = birth_date.replace(year=today.year)
-            if next_birthday < today:
-                next_birthday = next_birthday.replace(year=today.year + 1)
+            today = datetime.now() if reference_date is None else as_datetime(reference_date)
 
-            days_to_birthday = (next_birthday - today).days
+            # Дні рахуються за календарними датами; 29 лютого у невисокосний
+            # рік - день народження 28 лютого
+            birthday = next_birthday(birth_date.date(), today.date())
 
             return {
-                "age_years": age,
-                "days_to_birthday": days_to_birthday,
+                "age_years": age_on(birth_date.date(), today.date()),
+                "days_to_birthday": (birthday - today.date()).days,
                 "total_days_lived": (today - birth_date).days
             }
 
         except Exception as e:
             raise ValueError(f"Помилка обчислення віку: {e}")
 
+    def get_upcoming_birthdays(self, people, days, reference_date=None):
+        """Дні народження у найближчі days днів для багатьох осіб
+
+        people - BirthdayIndex або послідовність (ідентифікатор, дата
+        народження[, дані]); результат відсортований за днями до дня народження.
+        """
+        try:
+            index = people if isinstance(people, BirthdayIndex) else BirthdayIndex(people)
+            return index.upcoming(days, reference_date)
+        except Exception as e:
+            raise ValueError(f"Помилка пошуку днів народження: {e}")
+
     def get_calendar_month(self, year, month):
         """Отримання календаря місяця"""
         try:
@@ -364,35 +437,140 @@ class DateTimeCalculator:
         except Exception as e:
             raise ValueError(f"Помилка створення календаря: {e}")
 
+    def get_iso_weeks(self, dates):
+        """Пакетне визначення ISO-року та тижня: масиви years та weeks"""
+        try:
+            years, weeks = self._period_calculator().iso_weeks(dates)
+            return {"years": years, "weeks": weeks}
+        except Exception as e:
+            raise ValueError(f"Помилка визначення ISO-тижнів: {e}")
+
+    def get_quarters(self, dates):
+        """Пакетне визначення року та кварталу: масиви years та quarters"""
+        try:
+            years, quarters = self._period_calculator().quarters(dates)
+            return {"years": years, "quarters": quarters}
+        except Exception as e:
+            raise ValueError(f"Помилка визначення кварталів: {e}")
+
+    def get_fiscal_periods(self, dates, fiscal_calendar=None):
+        """Пакетне визначення фіскального року та періоду: масиви years та periods"""
+        try:
+            if fiscal_calendar is None:
+                calculator = self._period_calculator()
+            else:
+                calculator = PeriodCalculator(fiscal_calendar)
+            years, periods = calculator.fiscal_periods(dates)
+            return {"years": years, "periods": periods}
+        except Exception as e:
+            raise ValueError(f"Помилка визначення фіскальних періодів: {e}")
+
+    def _period_calculator(self):
+        """Спільні таблиці меж періодів (будуються при першому використанні)"""
+        if self._periods is None:
+            self._periods = PeriodCalculator(FiscalCalendar())
+        return self._periods
+
     def is_leap_year(self, year):
         """Перевірка чи є рік високосним"""
         return calendar.isleap(year)
 
-    def get_working_days(self, start_date, end_date):
-        """Обчислення робочих днів між датами"""
-        try:
-            if isinstance(start_date, str):
-                start_date = datetime.strptime(start_date, "%Y-%m-%d")
-            if isinstance(end_date, str):
-                end_date = datetime.strptime(end_date, "%Y-%m-%d")
-
-            working_days = 0
-            current_date = start_date
+    def get_working_days(self, start_date, end_date, exclude_holidays=False):
+        """Обчислення робочих днів між датами
 
-            while current_date <= end_date:
-                if current_date.weekday() < 5:  # Понеділок-П'ятниця
-                    working_days += 1
-                current_date += timedelta(days=1)
+        З exclude_holidays результат додатково містить business_days -
+        робочі дні без свят.
+        """
+        try:
+            start_date = as_datetime(start_date)
+            end_date = as_datetime(end_date)
 
             total_days = (end_date - start_date).days + 1
+            working_days = count_working_days(start_date.toordinal(), end_date.toordinal())
             weekend_days = total_days - working_days
 
-            return {
+            result = {
                 "working_days": working_days,
                 "weekend_days": weekend_days,
                 "total_days": total_days
             }
+            if exclude_holidays:
+                result["business_days"] = self.holiday_calculator.working_days(start_date,
+                                                                               end_date)
+            return result
+
+        except Exception as e:
+            raise ValueError(f"Помилка обчислення робочих днів: {e}")
+
+    def get_working_days_batch(self, start_dates, end_dates, exclude_holidays=False):
+        """Пакетне обчислення робочих днів (Пн-Пт) для пар дат
+
+        Стовпці DayColumn обробляються напряму за масивами порядкових
+        номерів; результат - array('i') кількостей робочих днів. З
+        exclude_holidays свята не враховуються (префіксні суми знімка календаря).
+        """
+        try:
+            if not isinstance(start_dates, DayColumn):
+                start_dates = DayColumn(start_dates)
+            if not isinstance(end_dates, DayColumn):
+                end_dates = DayColumn(end_dates)
+
+            count = self.holiday_calculator.working_days if exclude_holidays else count_working_days
+            return array("i", map(count, start_dates.ordinals, end_dates.ordinals))
+
+        except Exception as e:
+            raise ValueError(f"Помилка обчислення робочих днів: {e}")
+
+    def get_covered_working_days(self, periods, start_date=None, end_date=None):
+        """Робочі дні, покриті періодами (відпустки, лікарняні), без подвійного врахування"""
+        try:
+            index = periods if isinstance(periods, DateRangeIndex) else DateRangeIndex(periods)
+
+            return {
+                "working_days": index.covered_working_days(start_date, end_date),
+                "covered_days": index.covered_days(start_date, end_date),
+                "merged_periods": len(index.merged_between(start_date, end_date))
+            }
+
+        except Exception as e:
+            raise ValueError(f"Помилка обчислення покритих робочих днів: {e}")
+
+    def get_free_periods(self, periods, start_date, end_date):
+        """Вільні від періодів проміжки між датами"""
+        try:
+            index = periods if isinstance(periods, DateRangeIndex) else DateRangeIndex(periods)
+            return [(first.strftime("%Y-%m-%d"), last.strftime("%Y-%m-%d"))
+                    for first, last in index.gaps(start_date, end_date)]
+
+        except Exception as e:
+            raise ValueError(f"Помилка пошуку вільних проміжків: {e}")
 
+    def calculate_datetime_difference(self, start, end, start_zone=None, end_zone=None):
+        """Різниця між мітками часу з урахуванням часових поясів"""
+        try:
+            return zoned_difference(start, end, start_zone, end_zone)
+        except Exception as e:
+            raise ValueError(f"Помилка обчислення різниці часу: {e}")
+
+    def add_to_datetime(self, value, zone=None, days=0, hours=0, minutes=0):
+        """Додавання днів (за місцевим календарем) та годин до мітки часу в поясі"""
+        try:
+            result = zoned_add(value, zone, days=days, hours=hours, minutes=minutes)
+
+            return {
+                "new_datetime": result.strftime("%Y-%m-%d %H:%M:%S"),
+                "zone": result.tzname(),
+                "utc_offset": result.strftime("%z"),
+                "day_of_week": self.get_day_of_week(result.replace(tzinfo=None))["day_name"]
+            }
+
+        except Exception as e:
+            raise ValueError(f"Помилка додавання часу: {e}")
+
+    def get_working_days_in_zone(self, start, end, zone=None):
+        """Робочі дні між мітками часу за місцевими датами поясу"""
+        try:
+            return self.get_working_days(local_date(start, zone), local_date(end, zone))
         except Exception as e:
             raise ValueError(f"Помилка обчислення робочих днів: {e}")
 
@@ -404,6 +582,8 @@ class LoginWindow:
         self.db_manager = db_manager
         self.on_success_callback = on_success_callback
         self.current_user = None
+        self._pending_action = None
+        self._wait_started = None
 
         self.window = tk.Tk()
         self.window.title("Авторизація - Програма роботи з датами")
@@ -486,6 +666,26 @@ class LoginWindow:
 
         self.window.bind('<Return>', lambda event: self.login())
 
+        # Стан підключення до бази даних
+        self.status_label = tk.Label(
+            self.window, text="", font=("Arial", 9), fg="#607D8B")
+        self.status_label.pack(side=tk.BOTTOM, pady=5)
+        self.update_backend_status()
+
+    def update_backend_status(self):
+        """Оновлення індикатора стану бази даних"""
+        status = self.db_manager.backend_status()
+        texts = {
+            "connecting": "База даних: підключення...",
+            "mysql": "База даних: MySQL",
+            "file": "База даних: файлова (MySQL недоступний)",
+            "sharded": "База даних: файлова з сегментами (MySQL недоступний)"
+        }
+        self.status_label.config(text=texts.get(status, f"База даних: {status}"))
+
+        if status == "connecting":
+            self.window.after(200, self.update_backend_status)
+
     def login(self):
         """Авторизація користувача"""
         username = self.username_entry.get().strip()
@@ -495,6 +695,10 @@ class LoginWindow:
             messagebox.showerror("Помилка", "Заповніть всі поля!")
             return
 
+        self.wait_for_backend(lambda: self.finish_login(username, password))
+
+    def finish_login(self, username, password):
+        """Перевірка облікових даних після підключення до бази даних"""
         user = self.db_manager.login_user(username, password)
         if user:
             self.current_user = user
@@ -521,7 +725,11 @@ class LoginWindow:
         email = simpledialog.askstring(
             "Email", "Введіть email (необов'язково):", initialvalue="")
 
-        if self.db_manager.register_user(username, password, email or ""):
+        self.wait_for_backend(lambda: self.finish_register(username, password, email or ""))
+
+    def finish_register(self, username, password, email):
+        """Збереження нового користувача після підключення до бази даних"""
+        if self.db_manager.register_user(username, password, email):
             messagebox.showinfo("Успіх", "Користувач зареєстрований успішно!")
             self.username_entry.delete(0, tk.END)
             self.password_entry.delete(0, tk.END)
@@ -529,6 +737,36 @@ class LoginWindow:
             messagebox.showerror(
                 "Помилка", "Користувач з таким ім'ям вже існує!")
 
+    def wait_for_backend(self, action):
+        """Виконання action після підключення до бази даних без блокування вікна
+
+        Стан підключення перевіряється через after(); якщо підключення не
+        завершилось за connect_timeout (з запасом на створення таблиць),
+        використовується файлова база даних.
+        """
+        waiting = self._pending_action is not None
+        self._pending_action = action
+        if not waiting:
+            self._wait_started = time.monotonic()
+            self.poll_backend()
+
+    def poll_backend(self):
+        """Перевірка фонового підключення та виконання відкладеної дії"""
+        if self.db_manager.is_connecting():
+            elapsed = time.monotonic() - self._wait_started
+            if elapsed < self.db_manager.connect_timeout + 2:
+                self.status_label.config(text="База даних: очікування підключення...")
+                self.window.config(cursor="watch")
+                self.window.after(100, self.poll_backend)
+                return
+            self.db_manager.abandon_connection()
+
+        self.db_manager.wait_for_connection(timeout=0)
+        self.window.config(cursor="")
+        self.update_backend_status()
+        action, self._pending_action = self._pending_action, None
+        action()
+
     def guest_mode(self):
         """Гостьовий режим"""
         guest_user = {"id": 0, "username": "Гість"}
@@ -542,6 +780,231 @@ class LoginWindow:
         return self.current_user
 
 
+class HistoryView:
+    """Віртуалізований перегляд історії обчислень на основі ttk.Treeview
+
+    Записи підвантажуються сторінками під час прокручування, у віджеті
+    зберігається не більше max_rows рядків, сортування та фільтрація
+    виконуються запитом до бази даних.
+    """
+
+    COLUMNS = (
+        ("calculation_type", "Тип", 140),
+        ("input_data", "Вхідні дані", 220),
+        ("result", "Результат", 200),
+        ("created_at", "Час", 160)
+    )
+    ALL_TYPES = "Всі типи"
+
+    def __init__(self, parent, db_manager, user_id, page_size=50, max_rows=500):
+        self.db_manager = db_manager
+        self.user_id = user_id
+        self.page_size = page_size
+        self.max_rows = max(max_rows, page_size * 2)
+
+        self.sort_by = "created_at"
+        self.descending = True
+        self.calc_type = None
+
+        # Позиція першого рядка віджета у відсортованому наборі даних
+        self.offset = 0
+        self.total = 0
+        self._load_scheduled = False
+
+        self.frame = tk.Frame(parent)
+        self.create_widgets()
+
+    def create_widgets(self):
+        """Створення таблиці, фільтра та смуги прокручування"""
+        filter_frame = tk.Frame(self.frame)
+        filter_frame.pack(fill=tk.X, pady=5)
+
+        tk.Label(filter_frame, text="Тип обчислення:",
+                 font=("Arial", 10)).pack(side=tk.LEFT, padx=5)
+        self.filter_var = tk.StringVar(value=self.ALL_TYPES)
+        self.filter_box = ttk.Combobox(filter_frame, textvariable=self.filter_var,
+                                       state="readonly", width=25)
+        self.filter_box.pack(side=tk.LEFT, padx=5)
+        self.filter_box.bind("<<ComboboxSelected>>", self.on_filter_change)
+
+        self.count_label = tk.Label(filter_frame, text="", font=("Arial", 9))
+        self.count_label.pack(side=tk.RIGHT, padx=5)
+
+        table_frame = tk.Frame(self.frame)
+        table_frame.pack(fill=tk.BOTH, expand=True)
+
+        self.tree = ttk.Treeview(table_frame, show="headings",
+                                 columns=[name for name, _, _ in self.COLUMNS])
+        for name, heading, width in self.COLUMNS:
+            self.tree.heading(name, text=heading,
+                              command=lambda column=name: self.sort_by_column(column))
+            self.tree.column(name, width=width, anchor="w")
+
+        self.scrollbar = ttk.Scrollbar(table_frame, orient=tk.VERTICAL,
+                                       command=self.tree.yview)
+        self.tree.configure(yscrollcommand=self.on_scroll)
+
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self.update_headings()
+
+    def pack(self, **kwargs):
+        """Розміщення перегляду в батьківському віджеті"""
+        self.frame.pack(**kwargs)
+
+    def update_headings(self):
+        """Позначення колонки сортування в заголовках"""
+        arrow = " ▼" if self.descending else " ▲"
+        for name, heading, _ in self.COLUMNS:
+            text = heading + arrow if name == self.sort_by else heading
+            self.tree.heading(name, text=text)
+
+    def update_filter_values(self):
+        """Оновлення списку типів у фільтрі"""
+        types = self.db_manager.get_calculation_types(self.user_id)
+        self.filter_box["values"] = [self.ALL_TYPES] + list(types)
+
+    def update_count(self):
+        """Оновлення кількості записів"""
+        self.total = self.db_manager.count_user_calculations(
+            self.user_id, self.calc_type)
+        self.count_label.config(text=f"Записів: {self.total}")
+
+    def fetch(self, offset, limit):
+        """Запит сторінки історії з поточними сортуванням та фільтром"""
+        if limit <= 0:
+            return []
+        return self.db_manager.get_calculations_page(
+            self.user_id, offset, limit, self.sort_by, self.descending,
+            self.calc_type)
+
+    @staticmethod
+    def row_values(row):
+        """Значення колонок таблиці для запису історії"""
+        return tuple(str(value) for value in row[1:])
+
+    def reset(self):
+        """Перезавантаження перегляду після зміни сортування або фільтра"""
+        self.tree.delete(*self.tree.get_children())
+        self.offset = 0
+        self.update_count()
+        self.load_next_page()
+
+    def refresh(self):
+        """Оновлення поточного вікна записів без перебудови віджета"""
+        self.update_filter_values()
+        self.update_count()
+
+        loaded = len(self.tree.get_children())
+        rows = self.fetch(self.offset, max(loaded, self.page_size))
+        fresh_ids = set()
+
+        for index, row in enumerate(rows):
+            iid = str(row[0])
+            fresh_ids.add(iid)
+            values = self.row_values(row)
+
+            if self.tree.exists(iid):
+                if tuple(self.tree.item(iid, "values")) != values:
+                    self.tree.item(iid, values=values)
+                if self.tree.index(iid) != index:
+                    self.tree.move(iid, "", index)
+            else:
+                self.tree.insert("", index, iid=iid, values=values)
+
+        stale = [iid for iid in self.tree.get_children() if iid not in fresh_ids]
+        if stale:
+            self.tree.delete(*stale)
+
+    def load_next_page(self):
+        """Підвантаження наступної сторінки в кінець таблиці"""
+        children = self.tree.get_children()
+        end = self.offset + len(children)
+        if children and end >= self.total:
+            return
+
+        for row in self.fetch(end, self.page_size):
+            iid = str(row[0])
+            if not self.tree.exists(iid):
+                self.tree.insert("", tk.END, iid=iid, values=self.row_values(row))
+
+        # Видалення рядків згори, щоб утримувати обмежену кількість
+        children = self.tree.get_children()
+        excess = len(children) - self.max_rows
+        if excess > 0:
+            anchor = self.tree.identify_row(1)
+            self.tree.delete(*children[:excess])
+            self.offset += excess
+            if anchor and self.tree.exists(anchor):
+                self.tree.see(anchor)
+
+    def load_previous_page(self):
+        """Підвантаження попередньої сторінки на початок таблиці"""
+        if self.offset <= 0:
+            return
+
+        start = max(0, self.offset - self.page_size)
+        rows = self.fetch(start, self.offset - start)
+        anchor = self.tree.identify_row(1)
+
+        for index, row in enumerate(rows):
+            iid = str(row[0])
+            if not self.tree.exists(iid):
+                self.tree.insert("", index, iid=iid, values=self.row_values(row))
+        self.offset = start
+
+        # Видалення рядків знизу
+        children = self.tree.get_children()
+        excess = len(children) - self.max_rows
+        if excess > 0:
+            self.tree.delete(*children[-excess:])
+
+        if anchor and self.tree.exists(anchor):
+            self.tree.see(anchor)
+
+    def on_scroll(self, first, last):
+        """Обробка прокручування: підвантаження сторінок біля країв"""
+        self.scrollbar.set(first, last)
+        if self._load_scheduled:
+            return
+
+        first, last = float(first), float(last)
+        if last >= 0.9:
+            loader = self.load_next_page
+        elif first <= 0.1 and self.offset > 0:
+            loader = self.load_previous_page
+        else:
+            return
+
+        self._load_scheduled = True
+        self.tree.after_idle(self.run_scheduled_load, loader)
+
+    def run_scheduled_load(self, loader):
+        """Виконання відкладеного підвантаження сторінки"""
+        try:
+            loader()
+        finally:
+            self._load_scheduled = False
+
+    def sort_by_column(self, column):
+        """Зміна сортування за колонкою (повторне натискання змінює напрямок)"""
+        if self.sort_by == column:
+            self.descending = not self.descending
+        else:
+            self.sort_by = column
+            self.descending = column == "created_at"
+
+        self.update_headings()
+        self.reset()
+
+    def on_filter_change(self, event=None):
+        """Зміна фільтра за типом обчислення"""
+        selected = self.filter_var.get()
+        self.calc_type = None if selected == self.ALL_TYPES else selected
+        self.reset()
+
+
 class DateTimeApp:
     """Головний клас програми з графічним інтерфейсом"""
 
@@ -549,6 +1012,9 @@ class DateTimeApp:
         self.user = user
         self.db_manager = db_manager
         self.calculator = DateTimeCalculator()
+        if get_config_manager().get('result_cache.enabled', True):
+            self.calculator = CachedCalculator(self.calculator, get_shared_cache())
+        self.business_schedule = BusinessSchedule()
 
         self.root = tk.Tk()
         self.root.title(f"Програма роботи з датами - {user['username']}")
@@ -732,10 +1198,26 @@ class DateTimeApp:
         self.month_entry.grid(row=0, column=3, pady=5, padx=10)
         self.month_entry.insert(0, str(datetime.now().month))
 
+        # Правило повторення подій (RRULE), події позначаються у календарі
+        tk.Label(input_frame, text="Повторення (RRULE):", font=("Arial", 10)
+                 ).grid(row=1, column=0, sticky="w", pady=5)
+        self.rrule_entry = tk.Entry(input_frame, width=30, font=("Arial", 10))
+        self.rrule_entry.grid(row=1, column=1, columnspan=3, pady=5, padx=10, sticky="w")
+
+        tk.Label(input_frame, text="Початок (РРРР-ММ-ДД):", font=("Arial", 10)
+                 ).grid(row=2, column=0, sticky="w", pady=5)
+        self.rrule_start_entry = tk.Entry(input_frame, width=15, font=("Arial", 10))
+        self.rrule_start_entry.grid(row=2, column=1, pady=5, padx=10, sticky="w")
+        self.rrule_start_entry.insert(0, datetime.now().strftime("%Y-%m-%d"))
+
+        self.rrule_holidays_var = tk.BooleanVar(value=True)
+        tk.Checkbutton(input_frame, text="Без свят", variable=self.rrule_holidays_var,
+                       font=("Arial", 10)).grid(row=2, column=2, columnspan=2, sticky="w")
+
         calc_btn = tk.Button(input_frame, text="Показати календар",
                              command=self.show_calendar,
                              bg="#607D8B", fg="white", font=("Arial", 10, "bold"))
-        calc_btn.grid(row=1, column=0, columnspan=4, pady=15)
+        calc_btn.grid(row=3, column=0, columnspan=4, pady=15)
 
         self.calendar_result = tk.Text(
             frame, height=12, width=70, font=("Courier", 10))
@@ -791,12 +1273,20 @@ class DateTimeApp:
                                 bg="#3F51B5", fg="white", font=("Arial", 10, "bold"))
         refresh_btn.pack(pady=10)
 
-        self.history_text = tk.Text(
-            frame, height=20, width=80, font=("Arial", 9))
-        self.history_text.pack(pady=10, fill=tk.BOTH, expand=True)
+        if self.user['id'] == 0:  # Гостьовий режим
+            self.history_view = None
+            refresh_btn.config(state=tk.DISABLED)
+            tk.Label(frame, text="Історія недоступна в гостьовому режимі.\n"
+                                 "Увійдіть в систему для збереження історії обчислень.",
+                     font=("Arial", 10)).pack(pady=10)
+            return
+
+        self.history_view = HistoryView(frame, self.db_manager, self.user['id'])
+        self.history_view.pack(pady=10, fill=tk.BOTH, expand=True)
 
-        # Завантаження історії при створенні
-        self.load_history()
+        # Завантаження першої сторінки історії при створенні
+        self.history_view.update_filter_values()
+        self.history_view.reset()
 
     def calculate_difference(self):
         """Обчислення різниці між датами"""
@@ -911,6 +1401,18 @@ class DateTimeApp:
 
             result = self.calculator.get_calendar_month(year, month)
 
+            # Дні місяця з подіями правила повторення (якщо воно задане)
+            rule_text = self.rrule_entry.get().strip()
+            rule = None
+            event_days = set()
+            if rule_text:
+                rule = RecurrenceRule.from_string(
+                    rule_text, self.rrule_start_entry.get().strip(),
+                    exclude_holidays=self.rrule_holidays_var.get())
+                month_end = datetime(year, month, result['days_in_month'], 23, 59, 59)
+                event_days = {event.day for event in
+                              rule.occurrences(datetime(year, month, 1), month_end)}
+
             months_uk = [
                 "", "Січень", "Лютий", "Березень", "Квітень", "Травень", "Червень",
                 "Липень", "Серпень", "Вересень", "Жовтень", "Листопад", "Грудень"
@@ -927,10 +1429,13 @@ class DateTimeApp:
                     if day == 0:
                         week_str += "    "
                     else:
-                        week_str += f"{day:2d}  "
+                        marker = "*" if day in event_days else " "
+                        week_str += f"{day:2d}{marker} "
                 output += week_str + "\n"
 
             output += f"\nДнів у місяці: {result['days_in_month']}\n"
+            if rule is not None:
+                output += f"Подій ({rule.describe()}): {len(event_days)}, позначені *\n"
             output += f"Високосний рік: {'Так' if self.calculator.is_leap_year(year) else 'Ні'}\n"
 
             self.calendar_result.delete(1.0, tk.END)
@@ -960,10 +1465,14 @@ class DateTimeApp:
                 result['working_days'] / result['total_days']) * 100
             output += f"Відсоток робочих днів: {work_percentage:.1f}%\n"
 
-            if result['working_days'] > 0:
-                work_hours = result['working_days'] * \
-                    8  # 8-годинний робочий день
-                output += f"Робочих годин (8 год/день): {work_hours}\n"
+            # Робочі години за графіком (перерви, свята, передсвяткові дні)
+            end_of_period = datetime.strptime(end_date, "%Y-%m-%d") + timedelta(days=1)
+            holidays = self.business_schedule.holidays_between(start_date, end_date)
+            work_hours = self.business_schedule.working_hours(start_date, end_of_period)
+            output += f"Святкових днів: {len(holidays)}\n"
+            output += (f"Робочих днів з урахуванням свят: "
+                       f"{self.business_schedule.working_days(start_date, end_date)}\n")
+            output += f"Робочих годин за графіком: {work_hours:g}\n"
 
             self.work_result.delete(1.0, tk.END)
             self.work_result.insert(1.0, output)
@@ -981,32 +1490,9 @@ class DateTimeApp:
                 self.user['id'], calc_type, input_data, result)
 
     def load_history(self):
-        """Завантаження історії обчислень"""
-        if self.user['id'] == 0:  # Гостьовий режим
-            self.history_text.delete(1.0, tk.END)
-            self.history_text.insert(1.0, "Історія недоступна в гостьовому режимі.\n"
-                                          "Увійдіть в систему для збереження історії обчислень.")
-            return
-
-        calculations = self.db_manager.get_user_calculations(self.user['id'])
-
-        self.history_text.delete(1.0, tk.END)
-
-        if not calculations:
-            self.history_text.insert(1.0, "Історія обчислень порожня.")
-            return
-
-        output = f"Історія обчислень користувача {self.user['username']}:\n"
-        output += "=" * 60 + "\n\n"
-
-        for i, (calc_type, input_data, result, timestamp) in enumerate(calculations, 1):
-            output += f"{i}. {calc_type}\n"
-            output += f"   Вхідні дані: {input_data}\n"
-            output += f"   Результат: {result}\n"
-            output += f"   Час: {timestamp}\n"
-            output += "-" * 40 + "\n"
-
-        self.history_text.insert(1.0, output)
+        """Оновлення історії обчислень"""
+        if self.history_view is not None:
+            self.history_view.refresh()
 
     def run(self):
         """Запуск програми"""
@@ -1017,8 +1503,15 @@ def main():
     """Головна функція програми"""
     print("Запуск програми роботи з датами та часом...")
 
-    # Ініціалізація бази даних
-    db_manager = DatabaseManager()
+    # Метрики продуктивності (лише якщо увімкнені в розділі 'metrics')
+    metrics_services = metrics.start_from_config()
+
+    # Зміни config.json застосовуються без перезапуску
+    config_manager = get_config_manager()
+    config_manager.start_watching()
+
+    # Ініціалізація бази даних у фоні, щоб вікно авторизації з'явилось одразу
+    db_manager = DatabaseManager(connect_async=True)
 
     def on_login_success(user):
         """Callback після успішної авторизації"""
@@ -1029,6 +1522,9 @@ def main():
     login_window = LoginWindow(db_manager, on_login_success)
     user = login_window.run()
 
+    save_shared_cache()
+    config_manager.stop_watching()
+    metrics.stop_services(metrics_services)
     print("Програма завершена.")
 
 
@@ -0,0 +1,389 @@
+"""
+Метрики продуктивності: кількість викликів, гістограми тривалості, помилки
+
+Збір метрик вмикається явно (enable_metrics або 'metrics.enabled' у конфігурації).
+Поки метрики вимкнені, класи програми не змінюються, тому накладних витрат
+немає. При увімкненні публічні методи DateTimeCalculator та DatabaseManager
+обгортаються функціями заміру часу, а кеші підключаються як збирачі, що
+зчитуються лише під час експорту.
+
+Метрики експортуються у текстовому форматі Prometheus - у файл (для
+textfile collector) або через локальний HTTP endpoint /metrics, а також
+періодичним знімком у журнал.
+"""
+
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import functools
+import inspect
+import os
+import threading
+import time
+
+from utils import get_config_manager
+
+METRIC_PREFIX = "datetime_app"
+
+# Межі кошиків гістограми тривалості (секунди)
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+                   0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class Histogram:
+    """Гістограма тривалості викликів одного методу"""
+
+    __slots__ = ("buckets", "counts", "total", "count", "errors")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+        self.errors = 0
+
+    def observe(self, seconds, failed=False):
+        """Додавання одного виміру"""
+        self.counts[bisect_left(self.buckets, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+        if failed:
+            self.errors += 1
+
+
+class MetricsRegistry:
+    """Сховище метрик викликів та збирачів кешів"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._caches = {}
+
+    def observe(self, component, method, backend, seconds, failed=False):
+        """Реєстрація виклику методу (backend - мітка сховища або None)"""
+        key = (component, method, backend)
+        with self._lock:
+            histogram = self._calls.get(key)
+            if histogram is None:
+                histogram = self._calls[key] = Histogram(self.buckets)
+            histogram.observe(seconds, failed)
+
+    def register_cache(self, name, info_func):
+        """Підключення кешу: info_func повертає об'єкт з hits, misses, currsize
+
+        Підходить cache_info функцій з functools.lru_cache.
+        """
+        self._caches[name] = info_func
+
+    def unregister_cache(self, name):
+        """Відключення кешу"""
+        self._caches.pop(name, None)
+
+    def reset(self):
+        """Очищення накопичених вимірів"""
+        with self._lock:
+            self._calls = {}
+
+    def calls(self):
+        """Копія вимірів: {(компонент, метод, сховище): Histogram}"""
+        with self._lock:
+            result = {}
+            for key, histogram in self._calls.items():
+                copy = Histogram(histogram.buckets)
+                copy.counts = list(histogram.counts)
+                copy.total = histogram.total
+                copy.count = histogram.count
+                copy.errors = histogram.errors
+                result[key] = copy
+            return result
+
+    def cache_stats(self):
+        """Стан кешів: {назва: {hits, misses, size}}"""
+        stats = {}
+        for name, info_func in list(self._caches.items()):
+            try:
+                info = info_func()
+            except Exception as e:
+                print(f"Помилка читання кешу {name}: {e}")
+                continue
+            stats[name] = {"hits": info.hits, "misses": info.misses,
+                           "size": info.currsize}
+        return stats
+
+    def render_prometheus(self):
+        """Метрики у текстовому форматі Prometheus"""
+        calls = sorted(self.calls().items(), key=lambda item: tuple(map(str, item[0])))
+        lines = []
+
+        name = f"{METRIC_PREFIX}_calls_total"
+        lines.append(f"# HELP {name} Кількість викликів методів")
+        lines.append(f"# TYPE {name} counter")
+        for key, histogram in calls:
+            lines.append(f"{name}{_labels(key)} {histogram.count}")
+
+        name = f"{METRIC_PREFIX}_errors_total"
+        lines.append(f"# HELP {name} Кількість викликів, що завершились винятком")
+        lines.append(f"# TYPE {name} counter")
+        for key, histogram in calls:
+            lines.append(f"{name}{_labels(key)} {histogram.errors}")
+
+        name = f"{METRIC_PREFIX}_call_duration_seconds"
+        lines.append(f"# HELP {name} Тривалість викликів методів")
+        lines.append(f"# TYPE {name} histogram")
+        for key, histogram in calls:
+            cumulative = 0
+            for bound, count in zip(histogram.buckets, histogram.counts):
+                cumulative += count
+                lines.append(f"{name}_bucket{_labels(key, le=repr(float(bound)))} {cumulative}")
+            lines.append(f"{name}_bucket{_labels(key, le='+Inf')} {histogram.count}")
+            lines.append(f"{name}_sum{_labels(key)} {histogram.total!r}")
+            lines.append(f"{name}_count{_labels(key)} {histogram.count}")
+
+        caches = sorted(self.cache_stats().items())
+        for field, kind, help_text in (("hits", "counter", "Влучання в кеш"),
+                                       ("misses", "counter", "Промахи кешу"),
+                                       ("size", "gauge", "Кількість записів у кеші")):
+            name = f"{METRIC_PREFIX}_cache_{field}" + ("_total" if kind == "counter" else "")
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for cache_name, stats in caches:
+                lines.append(f'{name}{{cache="{_escape(cache_name)}"}} {stats[field]}')
+
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, filename):
+        """Атомарний запис метрик у файл (для node_exporter textfile collector)"""
+        temp_name = f"{filename}.tmp"
+        try:
+            with open(temp_name, 'w', encoding='utf-8') as f:
+                f.write(self.render_prometheus())
+            os.replace(temp_name, filename)
+            return True
+        except OSError as e:
+            print(f"Помилка запису метрик: {e}")
+            return False
+
+    def format_snapshot(self):
+        """Короткий знімок метрик для журналу (рядок на метод та кеш)"""
+        lines = []
+        for (component, method, backend), histogram in sorted(
+                self.calls().items(), key=lambda item: tuple(map(str, item[0]))):
+            label = f"{component}.{method}" + (f"[{backend}]" if backend else "")
+            average = histogram.total / histogram.count * 1000 if histogram.count else 0
+            lines.append(f"{label}: викликів {histogram.count}, помилок {histogram.errors}, "
+                         f"середній час {average:.3f} мс")
+
+        for cache_name, stats in sorted(self.cache_stats().items()):
+            requests = stats["hits"] + stats["misses"]
+            ratio = stats["hits"] / requests * 100 if requests else 0
+            lines.append(f"кеш {cache_name}: влучань {ratio:.1f}%, записів {stats['size']}")
+
+        return lines
+
+
+def _escape(value):
+    """Екранування значення мітки Prometheus"""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(key, **extra):
+    """Мітки Prometheus для ключа (компонент, метод, сховище)"""
+    component, method, backend = key
+    pairs = [("component", component), ("method", method)]
+    if backend:
+        pairs.append(("backend", backend))
+    pairs.extend(extra.items())
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+# Реєстр за замовчуванням та оригінальні методи обгорнутих класів
+registry = MetricsRegistry()
+_originals = {}
+
+
+def _timed(func, component, method, label_func, metrics):
+    """Обгортка методу з заміром часу та підрахунком винятків"""
+    perf_counter = time.perf_counter
+
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        started = perf_counter()
+        failed = True
+        try:
+            result = func(self, *args, **kwargs)
+            failed = False
+            return result
+        finally:
+            backend = label_func(self) if label_func else None
+            metrics.observe(component, method, backend, perf_counter() - started, failed)
+
+    wrapper.__metrics_original__ = func
+    return wrapper
+
+
+def instrument_class(cls, component, label_func=None, exclude=(), metrics=None):
+    """Обгортання публічних методів класу для збору метрик
+
+    label_func(self) повертає мітку сховища для виклику (або None).
+    """
+    metrics = metrics or registry
+    originals = _originals.setdefault(cls, {})
+
+    for name, attr in list(vars(cls).items()):
+        if name.startswith("_") or name in exclude or name in originals:
+            continue
+        if not inspect.isfunction(attr):
+            continue
+        originals[name] = attr
+        setattr(cls, name, _timed(attr, component, name, label_func, metrics))
+
+
+def uninstrument_class(cls):
+    """Відновлення оригінальних методів класу"""
+    for name, func in _originals.pop(cls, {}).items():
+        setattr(cls, name, func)
+
+
+def _database_label(db_manager):
+    """Мітка сховища для DatabaseManager"""
+    backend = db_manager.backend
+    return backend.name if backend is not None else "connecting"
+
+
+def enable_metrics(metrics=None):
+    """Увімкнення збору метрик для калькулятора, бази даних та кешів"""
+    from main import DateTimeCalculator, DatabaseManager
+    from utils import _format_duration_cached
+
+    metrics = metrics or registry
+    instrument_class(DateTimeCalculator, "calculator", metrics=metrics)
+    instrument_class(DatabaseManager, "database", _database_label,
+                     exclude=("backend_status", "is_connecting", "get_backend"),
+                     metrics=metrics)
+    metrics.register_cache("format_duration", _format_duration_cached.cache_info)
+    return metrics
+
+
+def disable_metrics():
+    """Вимкнення збору метрик (відновлення оригінальних методів)"""
+    for cls in list(_originals):
+        uninstrument_class(cls)
+
+
+def metrics_enabled():
+    """Перевірка чи увімкнено збір метрик"""
+    return bool(_originals)
+
+
+class PeriodicTask:
+    """Фонове виконання функції з інтервалом (потік-демон)"""
+
+    def __init__(self, interval, func, name="metrics"):
+        self.interval = interval
+        self.func = func
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.func()
+            except Exception as e:
+                print(f"Помилка фонового завдання метрик: {e}")
+
+    def stop(self):
+        """Зупинка з останнім виконанням функції"""
+        self._stop.set()
+        self._thread.join()
+        try:
+            self.func()
+        except Exception as e:
+            print(f"Помилка фонового завдання метрик: {e}")
+
+
+def start_textfile_export(filename, interval=15, metrics=None):
+    """Періодичний запис метрик у файл"""
+    metrics = metrics or registry
+    return PeriodicTask(interval, lambda: metrics.write_prometheus(filename),
+                        name="metrics-textfile")
+
+
+def start_log_snapshots(logger, interval=300, metrics=None):
+    """Періодичний запис знімка метрик у журнал (utils.Logger)"""
+    metrics = metrics or registry
+
+    def write_snapshot():
+        for line in metrics.format_snapshot():
+            logger.log("INFO", f"metrics {line}")
+
+    return PeriodicTask(interval, write_snapshot, name="metrics-log")
+
+
+def start_http_server(port=9464, host="127.0.0.1", metrics=None):
+    """Локальний HTTP endpoint /metrics у фоновому потоці
+
+    Повертає сервер; зупинка - server.shutdown().
+    """
+    metrics = metrics or registry
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] not in ("/", "/metrics"):
+                self.send_error(404)
+                return
+            body = metrics.render_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
+
+
+def start_from_config(config=None, logger=None):
+    """Увімкнення метрик та експорту згідно з розділом конфігурації 'metrics'
+
+    Повертає список запущених завдань/серверів або None, якщо метрики вимкнені.
+    """
+    config = config or get_config_manager().get('metrics')
+    if not config.get('enabled'):
+        return None
+
+    enable_metrics()
+    services = []
+
+    if config.get('textfile'):
+        services.append(start_textfile_export(config['textfile'],
+                                              config.get('textfile_interval', 15)))
+
+    if config.get('http_port'):
+        try:
+            services.append(start_http_server(config['http_port'],
+                                              config.get('http_host', '127.0.0.1')))
+        except OSError as e:
+            print(f"Помилка запуску HTTP сервера метрик: {e}")
+
+    if config.get('log_interval'):
+        if logger is None:
+            from utils import Logger
+            logger = Logger(config.get('log_file', 'metrics.log'), echo=False)
+        services.append(start_log_snapshots(logger, config['log_interval']))
+
+    return services
+
+
+def stop_services(services):
+    """Зупинка завдань та серверів, запущених start_from_config"""
+    for service in services or ():
+        if isinstance(service, PeriodicTask):
+            service.stop()
+        else:
+            service.shutdown()
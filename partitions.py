@@ -0,0 +1,295 @@
+"""
+Керування помісячними секціями таблиці calculations (MySQL)
+
+Таблиця розбита на секції за created_at. Визначення таблиці задає
+calculations_table_sql: за ним програма створює таблицю, а
+database_setup.sql та database_migration_partitioning.sql містять ту саму
+структуру (перевіряється тестами). Модуль додає секції наперед (також
+автоматично при кожному підключенні програми до MySQL) і переносить старі
+секції в архівні таблиці або експортує їх у CSV, після чого секція
+видаляється з робочої таблиці.
+"""
+
+from datetime import date, datetime
+import csv
+import gzip
+import os
+
+from mysql.connector import Error
+
+from utils import get_config_manager
+
+# Секція для всіх майбутніх записів, яку розділяє REORGANIZE PARTITION
+CATCHALL_PARTITION = "pmax"
+
+# Секція для записів, старіших за першу помісячну секцію
+OLDEST_PARTITION = "p_old"
+
+# Колонки та ключі таблиці calculations. Секційовані таблиці MySQL не
+# підтримують зовнішні ключі, а кожен унікальний ключ повинен містити
+# колонку розбиття, тому первинний ключ - (id, created_at).
+CALCULATIONS_COLUMNS = (
+    "id INT AUTO_INCREMENT NOT NULL",
+    "user_id INT NOT NULL",
+    "calculation_type VARCHAR(50) NOT NULL",
+    "input_data TEXT NOT NULL",
+    "result TEXT NOT NULL",
+    "created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP",
+    "PRIMARY KEY (id, created_at)",
+    # Покриває WHERE user_id та ORDER BY created_at запиту історії
+    "KEY idx_user_history (user_id, created_at, id)",
+    "KEY idx_user_type_history (user_id, calculation_type, created_at)"
+)
+
+
+def month_start(value):
+    """Перший день місяця для дати"""
+    return date(value.year, value.month, 1)
+
+
+def add_months(value, months):
+    """Перший день місяця, зсунутого на months від місяця дати"""
+    index = value.year * 12 + value.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month):
+    """Назва помісячної секції (p202401)"""
+    return f"p{month.year}{month.month:02d}"
+
+
+def _monthly_partitions(first_month, last_month):
+    """Визначення помісячних секцій first_month..last_month та секції pmax"""
+    parts = []
+    month = month_start(first_month)
+
+    while month <= last_month:
+        upper = add_months(month, 1)
+        parts.append(f"PARTITION {partition_name(month)} "
+                     f"VALUES LESS THAN ('{upper.isoformat()}')")
+        month = upper
+
+    if parts:
+        parts.append(f"PARTITION {CATCHALL_PARTITION} VALUES LESS THAN (MAXVALUE)")
+    return parts
+
+
+def build_reorganize_sql(table, first_month, last_month):
+    """SQL для додавання помісячних секцій first_month..last_month перед pmax
+
+    Повертає None, якщо додавати нічого.
+    """
+    parts = _monthly_partitions(first_month, last_month)
+    if not parts:
+        return None
+
+    return (f"ALTER TABLE {table} REORGANIZE PARTITION {CATCHALL_PARTITION} INTO (\n    "
+            + ",\n    ".join(parts) + "\n)")
+
+
+def calculations_table_sql(table="calculations", first_month=None, last_month=None,
+                           today=None):
+    """CREATE TABLE для секційованої таблиці обчислень
+
+    Секції: p_old до first_month (за замовчуванням поточний місяць),
+    помісячні до last_month (months_ahead місяців наперед) та pmax.
+    """
+    today = today or datetime.now().date()
+    first_month = month_start(first_month or today)
+    if last_month is None:
+        last_month = add_months(today, get_config_manager().get('partitions.months_ahead'))
+    if last_month < first_month:
+        last_month = first_month
+
+    parts = [f"PARTITION {OLDEST_PARTITION} VALUES LESS THAN ('{first_month.isoformat()}')"]
+    parts += _monthly_partitions(first_month, last_month)
+    return (f"CREATE TABLE IF NOT EXISTS {table} (\n    "
+            + ",\n    ".join(CALCULATIONS_COLUMNS)
+            + "\n)\nPARTITION BY RANGE COLUMNS (created_at) (\n    "
+            + ",\n    ".join(parts) + "\n)")
+
+
+def parse_partition_bound(description):
+    """Верхня межа секції з information_schema ('2024-02-01' або MAXVALUE)"""
+    if not description or description.upper() == "MAXVALUE":
+        return None
+    return date.fromisoformat(description.strip("'\"")[:10])
+
+
+class PartitionManager:
+    """Керування секціями та архівуванням історії обчислень
+
+    Працює з DatabaseManager або напряму з з'єднанням MySQL (connection),
+    як під час створення таблиць при підключенні.
+    """
+
+    def __init__(self, db_manager=None, table="calculations", connection=None):
+        self.db_manager = db_manager
+        self.table = table
+        self._own_connection = connection
+
+    def _connection(self):
+        """З'єднання MySQL або None для файлової бази"""
+        if self._own_connection is not None:
+            return self._own_connection
+        self.db_manager.wait_for_connection()
+        return self.db_manager.connection
+
+    def _cursor(self):
+        """Курсор робочого з'єднання MySQL або None для файлової бази"""
+        connection = self._connection()
+        if not connection:
+            print("Секціонування доступне лише для MySQL")
+            return None
+        return connection.cursor()
+
+    def list_partitions(self):
+        """Список секцій таблиці: назва, верхня межа (date або None), рядків"""
+        cursor = self._cursor()
+        if cursor is None:
+            return []
+
+        try:
+            query = """SELECT PARTITION_NAME, PARTITION_DESCRIPTION, TABLE_ROWS
+                      FROM information_schema.PARTITIONS
+                      WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+                        AND PARTITION_NAME IS NOT NULL
+                      ORDER BY PARTITION_ORDINAL_POSITION"""
+            cursor.execute(query, (self.table,))
+            return [{"name": name, "upper_bound": parse_partition_bound(bound),
+                     "rows": rows}
+                    for name, bound, rows in cursor.fetchall()]
+
+        except Error as e:
+            print(f"Помилка отримання секцій: {e}")
+            return []
+
+    def ensure_future_partitions(self, months_ahead=None, today=None):
+        """Додавання секцій на months_ahead місяців наперед
+
+        Повертає назви доданих секцій.
+        """
+        if months_ahead is None:
+            months_ahead = get_config_manager().get('partitions.months_ahead')
+        today = today or datetime.now().date()
+
+        bounds = [p["upper_bound"] for p in self.list_partitions() if p["upper_bound"]]
+        if not bounds:
+            return []
+
+        # Остання межа - перший місяць, для якого секції ще немає
+        first_missing = max(bounds)
+        last_needed = add_months(today, months_ahead)
+        sql = build_reorganize_sql(self.table, first_missing, last_needed)
+        if sql is None:
+            return []
+
+        try:
+            cursor = self._cursor()
+            cursor.execute(sql)
+        except Error as e:
+            print(f"Помилка додавання секцій: {e}")
+            return []
+
+        added = []
+        month = first_missing
+        while month <= last_needed:
+            added.append(partition_name(month))
+            month = add_months(month, 1)
+        return added
+
+    def archive_partitions(self, before, mode=None, archive_dir=None):
+        """Архівування секцій, усі записи яких старші за місяць дати before
+
+        mode='table' - секція обмінюється з порожньою архівною таблицею
+        calculations_archive_РРРРММ (EXCHANGE PARTITION, без копіювання),
+        mode='export' - записи експортуються в archive_dir у .csv.gz.
+        Після цього секція видаляється. Повертає назви архівованих секцій.
+        """
+        mode = mode or get_config_manager().get('partitions.archive_mode')
+        archive_dir = archive_dir or get_config_manager().get('partitions.archive_dir')
+        if mode not in ("table", "export"):
+            raise ValueError(f"Невідомий режим архівування: {mode}")
+
+        cutoff = month_start(before)
+        archived = []
+
+        for partition in self.list_partitions():
+            bound = partition["upper_bound"]
+            if bound is None or bound > cutoff:
+                continue
+
+            name = partition["name"]
+            try:
+                if mode == "table":
+                    self._exchange_partition(name)
+                else:
+                    self._export_partition(name, archive_dir)
+
+                cursor = self._cursor()
+                cursor.execute(f"ALTER TABLE {self.table} DROP PARTITION {name}")
+                archived.append(name)
+
+            except (Error, OSError) as e:
+                print(f"Помилка архівування секції {name}: {e}")
+                break
+
+        return archived
+
+    def _exchange_partition(self, name):
+        """Перенесення секції в окрему архівну таблицю"""
+        archive_table = f"{self.table}_archive_{name.lstrip('p_')}"
+        cursor = self._cursor()
+
+        cursor.execute(f"CREATE TABLE {archive_table} LIKE {self.table}")
+        cursor.execute(f"ALTER TABLE {archive_table} REMOVE PARTITIONING")
+        cursor.execute(f"ALTER TABLE {self.table} EXCHANGE PARTITION {name} "
+                       f"WITH TABLE {archive_table}")
+
+    def _export_partition(self, name, archive_dir, chunk_size=10000):
+        """Потоковий експорт записів секції в стиснений CSV файл"""
+        os.makedirs(archive_dir, exist_ok=True)
+        filename = os.path.join(archive_dir, f"{self.table}_{name}.csv.gz")
+
+        connection = self._connection()
+        cursor = connection.cursor(buffered=False)
+        try:
+            cursor.execute(f"""SELECT user_id, calculation_type, input_data, result, created_at
+                              FROM {self.table} PARTITION ({name}) ORDER BY created_at, id""")
+
+            with gzip.open(filename, 'wt', newline='', encoding='utf-8') as csvfile:
+                writer = csv.writer(csvfile)
+                writer.writerow(['Користувач', 'Тип обчислення', 'Вхідні дані',
+                                 'Результат', 'Дата'])
+                while True:
+                    rows = cursor.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    writer.writerows(rows)
+        finally:
+            try:
+                connection.consume_results()
+            except Error:
+                pass
+            cursor.close()
+
+        return filename
+
+    def apply_retention(self, retention_months=None, mode=None, today=None):
+        """Повний цикл обслуговування: архівування старих та додавання нових секцій"""
+        if retention_months is None:
+            retention_months = get_config_manager().get('partitions.retention_months')
+        today = today or datetime.now().date()
+
+        cutoff = add_months(today, -retention_months)
+        return {
+            "archived": self.archive_partitions(cutoff, mode),
+            "added": self.ensure_future_partitions(today=today)
+        }
+
+
+if __name__ == "__main__":
+    # Запуск обслуговування секцій (наприклад, щомісячно з планувальника)
+    from main import DatabaseManager
+
+    print(PartitionManager(DatabaseManager()).apply_retention())
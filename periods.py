@@ -0,0 +1,211 @@
+"""
+Пакетне визначення ISO-тижнів, кварталів та фіскальних періодів
+
+Для кожного виду періоду один раз будується таблиця меж: відсортовані
+порядкові номери днів початку періодів (тижнів ISO, кварталів, фіскальних
+місяців або періодів 4-4-5) з міткою (рік, номер). Дата відноситься до
+періоду двійковим пошуком у таблиці, а для послідовних дат з того самого
+періоду пошук не виконується зовсім, тому звіти з угрупованням великої
+кількості подій не викликають isocalendar() для кожної дати.
+
+Результати повертаються як масиви array: роки ('i') та номери ('b').
+"""
+
+from array import array
+from bisect import bisect_right
+from datetime import date
+
+from compact_dates import DayColumn
+from utils import get_config_manager
+
+# Роки, для яких будуються таблиці (фіскальний рік може починатися
+# у попередньому календарному році); періоди, межі яких виходять за
+# MAX_YEAR, не будуються
+MIN_YEAR = 2
+MAX_YEAR = 9999
+
+
+def _ordinals(dates):
+    """Масив порядкових номерів днів (DayColumn використовується без копіювання)"""
+    if isinstance(dates, DayColumn):
+        return dates.ordinals
+    return DayColumn(dates).ordinals
+
+
+def iso_year_start(year):
+    """Порядковий номер понеділка першого ISO-тижня року (тиждень з 4 січня)"""
+    ordinal = date(year, 1, 4).toordinal()
+    return ordinal - (ordinal - 1) % 7
+
+
+def iso_week_periods(year):
+    """Межі ISO-тижнів року: [(початок, рік, тиждень)]"""
+    start = iso_year_start(year)
+    # 28 грудня завжди належить останньому ISO-тижню року
+    weeks = date(year, 12, 28).isocalendar()[1]
+    return [(start + 7 * week, year, week + 1) for week in range(weeks)]
+
+
+def quarter_periods(year):
+    """Межі кварталів календарного року: [(початок, рік, квартал)]"""
+    return [(date(year, month, 1).toordinal(), year, quarter)
+            for quarter, month in enumerate((1, 4, 7, 10), 1)]
+
+
+class FiscalCalendar:
+    """Фіскальний календар: помісячний або тижневий (4-4-5, 4-5-4, 5-4-4)
+
+    Фіскальний рік називається за календарним роком, у якому він
+    закінчується. Тижневий рік закінчується в останній (end_rule='last')
+    або найближчий до кінця місяця (end_rule='nearest') день тижня
+    end_weekday місяця перед start_month; додатковий тиждень 53-тижневого
+    року входить в останній період.
+    """
+
+    def __init__(self, start_month=None, week_pattern=None, end_weekday=None,
+                 end_rule=None):
+        config = get_config_manager().get('fiscal')
+        self.start_month = start_month or config['start_month']
+        self.week_pattern = tuple(week_pattern if week_pattern is not None
+                                  else config['week_pattern'] or ())
+        self.end_weekday = end_weekday if end_weekday is not None else config['end_weekday']
+        self.end_rule = end_rule or config['end_rule']
+
+        if not 1 <= self.start_month <= 12:
+            raise ValueError(f"Невірний місяць початку фіскального року: {self.start_month}")
+        if self.week_pattern and sum(self.week_pattern) != 13:
+            raise ValueError("Тижневий шаблон кварталу повинен містити 13 тижнів")
+        if self.end_rule not in ("last", "nearest"):
+            raise ValueError(f"Невідоме правило кінця року: {self.end_rule}")
+
+    def _month_start(self, year, shift):
+        """Порядковий номер першого дня місяця start_month + shift фіскального року year"""
+        month_index = self.start_month - 1 + shift
+        first_year = year - 1 if self.start_month > 1 else year
+        return date(first_year + month_index // 12, month_index % 12 + 1, 1).toordinal()
+
+    def year_end(self, year):
+        """Порядковий номер останнього дня тижневого фіскального року year"""
+        # Останній день місяця перед початком наступного фіскального року
+        month_end = self._month_start(year, 12) - 1
+        back = ((month_end - 1) % 7 - self.end_weekday) % 7
+        if self.end_rule == "nearest" and back > 3:
+            return month_end + 7 - back
+        return month_end - back
+
+    def periods(self, year):
+        """Межі фіскальних періодів року: [(початок, рік, період)]"""
+        if not self.week_pattern:
+            return [(self._month_start(year, shift), year, shift + 1) for shift in range(12)]
+
+        start = self.year_end(year - 1) + 1
+        result = []
+        for number, weeks in enumerate(self.week_pattern * 4, 1):
+            result.append((start, year, number))
+            start += weeks * 7
+        return result
+
+
+class BoundaryTable:
+    """Таблиця меж періодів з пакетним пошуком періоду для дат"""
+
+    def __init__(self, builder):
+        self.builder = builder
+        self.first_year = None
+        self.last_year = None
+        self.starts = []
+        self.years = []
+        self.numbers = []
+
+    def _build(self, year):
+        """Межі періодів року; рік, межі якого виходять за MAX_YEAR, пропускається"""
+        if year > MAX_YEAR:
+            return []
+        try:
+            return self.builder(year)
+        except (ValueError, OverflowError):
+            if year < MAX_YEAR:
+                raise
+            return []
+
+    def _ensure(self, first_year, last_year):
+        """Побудова таблиці для років first_year..last_year (з запасом у рік)"""
+        first_year = max(first_year - 1, MIN_YEAR)
+        last_year = min(last_year + 1, MAX_YEAR)
+        if self.first_year is not None and \
+                self.first_year <= first_year and last_year <= self.last_year:
+            return
+        if self.first_year is not None:
+            first_year = min(first_year, self.first_year)
+            last_year = max(last_year, self.last_year)
+
+        periods = []
+        for year in range(first_year, last_year + 2):
+            periods.extend(self._build(year))
+        periods.sort()
+
+        # Періоди наступного після last_year року задають лише кінець таблиці;
+        # якщо їх не побудувати (після MAX_YEAR), кінець останнього періоду
+        # невідомий, тому таблиця закінчується на його початку
+        following = [start for start, year, _ in periods if year > last_year]
+        end = min(following) if following else periods[-1][0]
+        periods = [period for period in periods if period[0] < end]
+
+        self.starts = [start for start, _, _ in periods] + [end]
+        self.years = [year for _, year, _ in periods]
+        self.numbers = [number for _, _, number in periods]
+        self.first_year = first_year
+        self.last_year = last_year
+
+    def lookup(self, dates):
+        """Рік та номер періоду для кожної дати: (array('i'), array('b'))"""
+        ordinals = _ordinals(dates)
+        years = array("i")
+        numbers = array("b")
+        if not ordinals:
+            return years, numbers
+
+        self._ensure(date.fromordinal(min(ordinals)).year,
+                     date.fromordinal(max(ordinals)).year)
+        starts = self.starts
+        period_years = self.years
+        period_numbers = self.numbers
+        append_year = years.append
+        append_number = numbers.append
+        low = high = 0
+        year = number = 0
+
+        for ordinal in ordinals:
+            if not low <= ordinal < high:
+                index = bisect_right(starts, ordinal) - 1
+                if index < 0 or index >= len(period_years):
+                    raise ValueError(f"Дата поза підтримуваним діапазоном: "
+                                     f"{date.fromordinal(ordinal)}")
+                low, high = starts[index], starts[index + 1]
+                year, number = period_years[index], period_numbers[index]
+            append_year(year)
+            append_number(number)
+
+        return years, numbers
+
+
+class PeriodCalculator:
+    """Пакетне визначення ISO-тижнів, кварталів та фіскальних періодів"""
+
+    def __init__(self, fiscal_calendar=None):
+        self.fiscal_calendar = fiscal_calendar or FiscalCalendar()
+        self._iso_weeks = BoundaryTable(iso_week_periods)
+        self._quarters = BoundaryTable(quarter_periods)
+        self._fiscal = BoundaryTable(self.fiscal_calendar.periods)
+
+    def iso_weeks(self, dates):
+        """ISO-рік та номер тижня для кожної дати"""
+        return self._iso_weeks.lookup(dates)
+
+    def quarters(self, dates):
+        """Календарний рік та квартал для кожної дати"""
+        return self._quarters.lookup(dates)
+
+    def fiscal_periods(self, dates):
+        """Фіскальний рік та період для кожної дати"""
+        return self._fiscal.lookup(dates)
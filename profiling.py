@@ -0,0 +1,248 @@
+"""
+Профілювання пакетних запусків (cProfile + tracemalloc)
+
+Profiler обгортає запуск у cProfile та tracemalloc і записує у каталог:
+
+    hot_functions.txt   - функції, відсортовані за сумарним часом (cumulative)
+    scoped_functions.txt - лише методи DateTimeCalculator, DatabaseManager
+                           та бекендів сховища
+    allocations.txt     - місця найбільших виділень пам'яті
+    operations.json     - кількість, час та пік пам'яті для кожного типу операції
+    profile.pstats      - сирі дані cProfile для snakeviz/pstats
+
+Типи операцій - це методи DateTimeCalculator та DatabaseManager (на час
+профілювання вони обгортаються, після - відновлюються) та операції, явно
+позначені через Profiler.operation (наприклад, команда batch.py).
+"""
+
+from contextlib import contextmanager
+import cProfile
+import functools
+import inspect
+import io
+import json
+import os
+import pstats
+import time
+import tracemalloc
+
+HOT_FUNCTIONS_LIMIT = 50
+ALLOCATIONS_LIMIT = 25
+TRACEMALLOC_FRAMES = 10
+
+# Скидання піку tracemalloc (Python 3.9+); на Python 3.8 пік операції
+# визначається за загальним піком без скидання
+_reset_peak = getattr(tracemalloc, "reset_peak", None)
+
+
+class Profiler:
+    """Профілювання часу та пам'яті з розбивкою за типами операцій"""
+
+    def __init__(self, output_dir, classes=None):
+        self.output_dir = output_dir
+        self.classes = classes
+        self.operations = {}
+        self._profile = None
+        self._originals = {}
+        # Стек операцій: [пам'ять на початку, пік до вкладених операцій,
+        # загальний пік tracemalloc на початку]
+        self._stack = []
+
+    def _default_classes(self):
+        """Класи, методи яких профілюються як окремі операції"""
+        from main import DateTimeCalculator, DatabaseManager
+
+        return {DateTimeCalculator: "calculator", DatabaseManager: "database"}
+
+    def _record(self, name, seconds, peak):
+        """Облік одного виклику операції"""
+        stats = self.operations.get(name)
+        if stats is None:
+            stats = self.operations[name] = {"calls": 0, "seconds": 0.0, "peak_bytes": 0}
+        stats["calls"] += 1
+        stats["seconds"] += seconds
+        stats["peak_bytes"] = max(stats["peak_bytes"], peak)
+
+    @staticmethod
+    def _observed_peak(frame):
+        """Пік пам'яті операції frame на поточний момент
+
+        Якщо загальний пік не зріс від початку операції (без reset_peak на
+        Python 3.8), пік операції оцінюється поточним рівнем пам'яті.
+        """
+        current, peak = tracemalloc.get_traced_memory()
+        if peak > frame[2]:
+            return max(frame[1], peak)
+        return max(frame[1], current)
+
+    @contextmanager
+    def operation(self, name):
+        """Вимірювання операції: час та пік пам'яті понад рівень на початку
+
+        Для вкладених операцій tracemalloc.reset_peak скидає загальний пік,
+        тому пік, досягнутий до входу у вкладену операцію, зберігається
+        у стеку і враховується при виході із зовнішньої.
+        """
+        if self._stack:
+            self._stack[-1][1] = self._observed_peak(self._stack[-1])
+        current, peak = tracemalloc.get_traced_memory()
+        if _reset_peak is not None:
+            _reset_peak()
+            peak = current
+        frame = [current, current, peak]
+        self._stack.append(frame)
+
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - started
+            self._stack.pop()
+            frame_peak = self._observed_peak(frame)
+            if self._stack:
+                self._stack[-1][1] = max(self._stack[-1][1], frame_peak)
+            self._record(name, seconds, frame_peak - frame[0])
+
+    def _wrap(self, func, name):
+        """Обгортка методу для обліку операції"""
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with self.operation(name):
+                return func(*args, **kwargs)
+        return wrapper
+
+    def _instrument(self):
+        """Обгортання публічних методів класів на час профілювання"""
+        classes = self.classes if self.classes is not None else self._default_classes()
+        for cls, component in classes.items():
+            originals = self._originals.setdefault(cls, {})
+            for name, attr in list(vars(cls).items()):
+                # Генератори виконуються поза викликом, їх облікує споживач
+                if name.startswith("_") or not inspect.isfunction(attr) \
+                        or inspect.isgeneratorfunction(attr):
+                    continue
+                originals[name] = attr
+                setattr(cls, name, self._wrap(attr, f"{component}.{name}"))
+
+    def _restore(self):
+        """Відновлення оригінальних методів"""
+        for cls, originals in self._originals.items():
+            for name, func in originals.items():
+                setattr(cls, name, func)
+        self._originals = {}
+
+    def start(self):
+        """Початок профілювання"""
+        self._instrument()
+        # tracemalloc, запущений до профілювання, не зупиняється в stop()
+        self._started_tracing = not tracemalloc.is_tracing()
+        if self._started_tracing:
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+        self._profile = cProfile.Profile()
+        self._profile.enable()
+
+    def stop(self):
+        """Завершення профілювання та запис звітів; повертає шлях до каталогу"""
+        self._profile.disable()
+        snapshot = tracemalloc.take_snapshot()
+        if self._started_tracing:
+            tracemalloc.stop()
+        scoped_keys = self._scoped_keys()
+        self._restore()
+
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+            self._profile.dump_stats(os.path.join(self.output_dir, "profile.pstats"))
+            self._write(os.path.join(self.output_dir, "hot_functions.txt"),
+                        self.hot_functions_report())
+            self._write(os.path.join(self.output_dir, "scoped_functions.txt"),
+                        self.scoped_report(scoped_keys))
+            self._write(os.path.join(self.output_dir, "allocations.txt"),
+                        self.allocations_report(snapshot))
+            with open(os.path.join(self.output_dir, "operations.json"), 'w',
+                      encoding='utf-8') as f:
+                json.dump(self.operations, f, ensure_ascii=False, indent=2, sort_keys=True)
+        except OSError as e:
+            print(f"Помилка запису звітів профілювання: {e}")
+
+        return self.output_dir
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.stop()
+
+    @staticmethod
+    def _write(filename, text):
+        """Запис текстового звіту"""
+        with open(filename, 'w', encoding='utf-8') as f:
+            f.write(text)
+
+    def _stats(self):
+        """Статистика cProfile"""
+        stream = io.StringIO()
+        return pstats.Stats(self._profile, stream=stream), stream
+
+    def hot_functions_report(self, limit=HOT_FUNCTIONS_LIMIT):
+        """Функції, відсортовані за сумарним та власним часом"""
+        stats, stream = self._stats()
+        stats.sort_stats("cumulative").print_stats(limit)
+        stream.write("\n")
+        stats.sort_stats("tottime").print_stats(limit)
+        return stream.getvalue()
+
+    def _scoped_keys(self):
+        """Ключі pstats (файл, рядок, назва) для методів профільованих класів
+
+        Враховуються оригінальні методи та методи бекендів сховища.
+        """
+        from storage import StorageBackend
+
+        functions = []
+        for cls, originals in self._originals.items():
+            functions.extend(originals.values())
+            functions.extend(attr for attr in vars(cls).values()
+                             if inspect.isgeneratorfunction(attr))
+
+        backends = [StorageBackend]
+        while backends:
+            cls = backends.pop()
+            backends.extend(cls.__subclasses__())
+            functions.extend(attr for attr in vars(cls).values() if inspect.isfunction(attr))
+
+        keys = {}
+        for func in functions:
+            code = func.__code__
+            keys[(code.co_filename, code.co_firstlineno, code.co_name)] = func.__qualname__
+        return keys
+
+    def scoped_report(self, scoped_keys):
+        """Таблиця методів калькулятора, бази даних та сховища"""
+        stats, _ = self._stats()
+        rows = []
+        for key, (_, calls, tottime, cumtime, _) in stats.stats.items():
+            if key in scoped_keys:
+                rows.append((cumtime, tottime, calls, scoped_keys[key]))
+
+        rows.sort(reverse=True)
+        lines = [f"{'викликів':>10} {'власний, с':>12} {'сумарний, с':>12}  метод"]
+        for cumtime, tottime, calls, name in rows:
+            lines.append(f"{calls:>10} {tottime:>12.6f} {cumtime:>12.6f}  {name}")
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def allocations_report(snapshot, limit=ALLOCATIONS_LIMIT):
+        """Місця найбільших виділень пам'яті, що залишились на кінець запуску"""
+        snapshot = snapshot.filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        ))
+        lines = []
+        for index, stat in enumerate(snapshot.statistics("traceback")[:limit], 1):
+            lines.append(f"#{index}: {stat.size / 1024:.1f} КіБ, блоків {stat.count}")
+            for line in stat.traceback.format(limit=TRACEMALLOC_FRAMES, most_recent_first=True):
+                lines.append(f"    {line}")
+        return "\n".join(lines) + "\n"
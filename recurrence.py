@@ -0,0 +1,328 @@
+"""
+Правила повторення подій (сумісні з RRULE, RFC 5545) на основі dateutil
+
+RecurrenceRule описує щоденні, щотижневі, щомісячні та щорічні правила з
+BYDAY, BYMONTHDAY, BYMONTH, BYSETPOS, COUNT та UNTIL і може виключати
+свята HolidayCalculator. Події видаються генератором, без побудови списку.
+
+Для щоденних та щотижневих правил (з BYDAY без номерів) події утворюють
+періодичну послідовність днів, тому кількість подій у діапазоні та n-на
+подія обчислюються арифметично (повні періоди + bisect у межах періоду),
+а свята враховуються як поправка. Для решти правил використовується
+лінивий перебір подій dateutil.
+"""
+
+from bisect import bisect_left
+from datetime import datetime, timedelta
+from math import gcd
+
+from dateutil import rrule as du_rrule
+
+from utils import HolidayCalculator
+
+FREQUENCIES = {
+    "YEARLY": du_rrule.YEARLY,
+    "MONTHLY": du_rrule.MONTHLY,
+    "WEEKLY": du_rrule.WEEKLY,
+    "DAILY": du_rrule.DAILY
+}
+
+WEEKDAYS = {"MO": du_rrule.MO, "TU": du_rrule.TU, "WE": du_rrule.WE, "TH": du_rrule.TH,
+            "FR": du_rrule.FR, "SA": du_rrule.SA, "SU": du_rrule.SU}
+
+# Назви днів тижня для відображення правил
+WEEKDAYS_UK = ["Пн", "Вт", "Ср", "Чт", "Пт", "Сб", "Нд"]
+
+
+def _parse_int_list(value):
+    """Список цілих чисел через кому"""
+    return [int(item) for item in value.split(",") if item]
+
+
+def _parse_until(value):
+    """Значення UNTIL (РРРРММДД або РРРРММДДTГГХХСС[Z])"""
+    value = value.rstrip("Z")
+    pattern = "%Y%m%dT%H%M%S" if "T" in value else "%Y%m%d"
+    until = datetime.strptime(value, pattern)
+    if "T" not in value:
+        until = until.replace(hour=23, minute=59, second=59)
+    return until
+
+
+def _parse_byday(value):
+    """BYDAY: MO, 1MO, -1FR ..."""
+    weekdays = []
+    for item in value.split(","):
+        item = item.strip().upper()
+        code, number = item[-2:], item[:-2]
+        if code not in WEEKDAYS:
+            raise ValueError(f"Невідомий день тижня: {item}")
+        weekdays.append(WEEKDAYS[code](int(number)) if number else WEEKDAYS[code])
+    return weekdays
+
+
+def parse_rrule(text):
+    """Розбір рядка RRULE у параметри RecurrenceRule"""
+    text = text.strip()
+    if text.upper().startswith("RRULE:"):
+        text = text[6:]
+
+    params = {}
+    for part in text.split(";"):
+        if not part.strip():
+            continue
+        if "=" not in part:
+            raise ValueError(f"Невірна частина правила: {part}")
+        key, value = part.split("=", 1)
+        key = key.strip().upper()
+        value = value.strip()
+
+        if key == "FREQ":
+            if value.upper() not in FREQUENCIES:
+                raise ValueError(f"Непідтримувана частота: {value}")
+            params["freq"] = value.upper()
+        elif key in ("INTERVAL", "COUNT"):
+            params[key.lower()] = int(value)
+        elif key == "UNTIL":
+            params["until"] = _parse_until(value)
+        elif key == "BYDAY":
+            params["byweekday"] = _parse_byday(value)
+        elif key in ("BYMONTHDAY", "BYMONTH", "BYSETPOS", "BYYEARDAY", "BYWEEKNO"):
+            params[key.lower()] = _parse_int_list(value)
+        elif key == "WKST":
+            params["wkst"] = _parse_byday(value)[0]
+        else:
+            raise ValueError(f"Непідтримуваний параметр правила: {key}")
+
+    if "freq" not in params:
+        raise ValueError("У правилі відсутній FREQ")
+    return params
+
+
+class RecurrenceRule:
+    """Правило повторення з лінивою генерацією подій"""
+
+    def __init__(self, freq, dtstart, interval=1, count=None, until=None,
+                 byweekday=None, bymonthday=None, bymonth=None, bysetpos=None,
+                 byyearday=None, byweekno=None, wkst=None,
+                 exclude_holidays=False, holiday_calculator=None):
+        if isinstance(dtstart, str):
+            dtstart = datetime.strptime(dtstart, "%Y-%m-%d")
+        if isinstance(until, str):
+            until = datetime.strptime(until, "%Y-%m-%d").replace(hour=23, minute=59, second=59)
+        dtstart = dtstart.replace(microsecond=0)
+        if interval < 1:
+            raise ValueError("Інтервал повинен бути додатним")
+        if count is not None and until is not None:
+            raise ValueError("COUNT та UNTIL не можна задавати одночасно")
+
+        self.freq = freq
+        self.dtstart = dtstart
+        self.interval = interval
+        self.count = count
+        self.until = until
+        self.byweekday = byweekday
+        self.exclude_holidays = exclude_holidays
+        self.holiday_calculator = holiday_calculator or HolidayCalculator()
+        self._holiday_years = {}
+
+        self.rule = du_rrule.rrule(
+            FREQUENCIES[freq], dtstart=dtstart, interval=interval, count=count,
+            until=until, byweekday=byweekday, bymonthday=bymonthday, bymonth=bymonth,
+            bysetpos=bysetpos, byyearday=byyearday, byweekno=byweekno,
+            wkst=wkst, cache=False)
+
+        extra_rules = (bymonthday, bymonth, bysetpos, byyearday, byweekno)
+        plain_weekdays = byweekday is None or all(
+            getattr(day, "n", None) is None for day in byweekday)
+        self._periodic = (freq in ("DAILY", "WEEKLY") and plain_weekdays
+                          and not any(extra_rules))
+        if self._periodic:
+            self._build_period(wkst)
+
+    @classmethod
+    def from_string(cls, text, dtstart, exclude_holidays=False, holiday_calculator=None):
+        """Правило з рядка RRULE, наприклад 'FREQ=WEEKLY;BYDAY=MO,WE;COUNT=10'"""
+        params = parse_rrule(text)
+        return cls(dtstart=dtstart, exclude_holidays=exclude_holidays,
+                   holiday_calculator=holiday_calculator, **params)
+
+    def _build_period(self, wkst):
+        """Період послідовності днів: якір, довжина та зсуви подій у періоді"""
+        start = self.dtstart.toordinal()
+        weekdays = None
+        if self.byweekday is not None:
+            weekdays = {getattr(day, "weekday", day) for day in self.byweekday}
+
+        if self.freq == "WEEKLY":
+            week_start = getattr(wkst, "weekday", wkst) or 0
+            weekdays = weekdays or {self.dtstart.weekday()}
+            self._anchor = start - (self.dtstart.weekday() - week_start) % 7
+            self._period = 7 * self.interval
+            self._offsets = sorted((day - week_start) % 7 for day in weekdays)
+        else:
+            self._anchor = start
+            if weekdays is None:
+                self._period = self.interval
+                self._offsets = [0]
+            else:
+                self._period = self.interval * 7 // gcd(self.interval, 7)
+                self._offsets = [offset for offset in range(0, self._period, self.interval)
+                                 if (start + offset - 1) % 7 in weekdays]
+
+        self._offset_set = set(self._offsets)
+        # Подій до dtstart у першому періоді (не входять у правило)
+        self._skip = self._index_before(start)
+
+    def _index_before(self, ordinal):
+        """Кількість днів послідовності (від якоря) раніше за ordinal"""
+        if ordinal <= self._anchor:
+            return 0
+        periods, rest = divmod(ordinal - self._anchor, self._period)
+        return periods * len(self._offsets) + bisect_left(self._offsets, rest)
+
+    def _first_ordinal(self, value):
+        """Перший день, подія якого (у час dtstart) не раніше value"""
+        ordinal = value.toordinal()
+        if value.time() > self.dtstart.time():
+            ordinal += 1
+        return ordinal
+
+    def _bounds(self):
+        """Межі індексів подій правила: [перший, після останнього)"""
+        low = self._skip
+        high = None
+        if self.count is not None:
+            high = low + self.count
+        if self.until is not None:
+            high = self._index_before(self._first_ordinal(self.until + timedelta(seconds=1)))
+        return low, high
+
+    def _occurrence_index(self, ordinal):
+        """Індекс події на дату (або None, якщо дата не входить у правило)"""
+        if ordinal < self._anchor or \
+                (ordinal - self._anchor) % self._period not in self._offset_set:
+            return None
+        index = self._index_before(ordinal)
+        low, high = self._bounds()
+        if index < low or (high is not None and index >= high):
+            return None
+        return index
+
+    def _at_index(self, index):
+        """Подія за індексом послідовності"""
+        periods, position = divmod(index, len(self._offsets))
+        ordinal = self._anchor + periods * self._period + self._offsets[position]
+        return datetime.combine(datetime.fromordinal(ordinal).date(), self.dtstart.time())
+
+    def _holidays(self, year):
+        """Порядкові номери свят року (з кешем)"""
+        holidays = self._holiday_years.get(year)
+        if holidays is None:
+            holidays = self._holiday_years[year] = {
+                holiday.toordinal() for holiday, _ in
+                self.holiday_calculator.get_holidays_in_year(year)}
+        return holidays
+
+    def is_excluded(self, value):
+        """Перевірка чи подія виключена як свято"""
+        return self.exclude_holidays and value.toordinal() in self._holidays(value.year)
+
+    def _holiday_indexes(self, first_ordinal, last_ordinal):
+        """Індекси подій, що припадають на свята між датами (включно)"""
+        if not self.exclude_holidays or last_ordinal < first_ordinal:
+            return []
+
+        first_year = datetime.fromordinal(max(first_ordinal, 1)).year
+        last_year = datetime.fromordinal(last_ordinal).year
+        indexes = []
+        for year in range(first_year, last_year + 1):
+            for ordinal in self._holidays(year):
+                if first_ordinal <= ordinal <= last_ordinal:
+                    index = self._occurrence_index(ordinal)
+                    if index is not None:
+                        indexes.append(index)
+        return sorted(indexes)
+
+    def occurrences(self, start=None, end=None):
+        """Генератор подій між start та end (включно), без свят, якщо задано"""
+        if isinstance(start, str):
+            start = datetime.strptime(start, "%Y-%m-%d")
+        if isinstance(end, str):
+            end = datetime.strptime(end, "%Y-%m-%d").replace(hour=23, minute=59, second=59)
+
+        iterator = self.rule.xafter(start, inc=True) if start else iter(self.rule)
+        for value in iterator:
+            if end is not None and value > end:
+                return
+            if not self.is_excluded(value):
+                yield value
+
+    def __iter__(self):
+        return self.occurrences()
+
+    def count_between(self, start, end):
+        """Кількість подій між start та end (включно)"""
+        if isinstance(start, str):
+            start = datetime.strptime(start, "%Y-%m-%d")
+        if isinstance(end, str):
+            end = datetime.strptime(end, "%Y-%m-%d").replace(hour=23, minute=59, second=59)
+
+        if not self._periodic:
+            return sum(1 for _ in self.occurrences(start, end))
+
+        low, high = self._bounds()
+        first = max(self._index_before(self._first_ordinal(start)), low)
+        last = self._index_before(self._first_ordinal(end + timedelta(seconds=1)))
+        if high is not None:
+            last = min(last, high)
+        if last <= first:
+            return 0
+
+        first_ordinal = self._at_index(first).toordinal()
+        last_ordinal = self._at_index(last - 1).toordinal()
+        return last - first - len(self._holiday_indexes(first_ordinal, last_ordinal))
+
+    def nth(self, n):
+        """n-на подія правила (з 1) або None, якщо подій менше"""
+        if n < 1:
+            raise ValueError("Номер події повинен бути не менше 1")
+
+        if not self._periodic:
+            for number, value in enumerate(self.occurrences(), 1):
+                if number == n:
+                    return value
+            return None
+
+        if not self._offsets:
+            return None
+
+        low, high = self._bounds()
+        skipped = 0
+        while True:
+            index = low + n - 1 + skipped
+            if high is not None and index >= high:
+                return None
+            holidays = self._holiday_indexes(self._at_index(low).toordinal(),
+                                             self._at_index(index).toordinal())
+            if len(holidays) == skipped:
+                return self._at_index(index)
+            skipped = len(holidays)
+
+    def describe(self):
+        """Короткий опис правила українською"""
+        names = {"DAILY": "щодня", "WEEKLY": "щотижня", "MONTHLY": "щомісяця",
+                 "YEARLY": "щороку"}
+        text = names[self.freq]
+        if self.interval > 1:
+            text += f" (кожен {self.interval}-й період)"
+        if self.byweekday:
+            text += ": " + ", ".join(WEEKDAYS_UK[getattr(day, "weekday", day)]
+                                     for day in self.byweekday)
+        if self.count is not None:
+            text += f", {self.count} разів"
+        if self.until is not None:
+            text += f", до {self.until.strftime('%Y-%m-%d')}"
+        if self.exclude_holidays:
+            text += ", без свят"
+        return text
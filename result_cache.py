@@ -0,0 +1,328 @@
+"""
+Спільний кеш результатів обчислень з датами
+
+Ключ кешу - операція, канонізовані аргументи (за сигнатурою методу,
+тож позиційні та іменовані аргументи дають той самий ключ) та версія
+правил календаря (HolidayCalculator.rules_version), тому однакові запити
+різних користувачів ('2024-01-05' та date(2024, 1, 5) тощо) потрапляють в
+один запис, а зміна правил свят робить старі записи недосяжними. Рядки
+канонізуються розбором дати тим самим способом, що й у калькуляторі;
+рядки, які не є датою, входять у ключ без змін. Записи витісняються за
+LRU та TTL; кеш може зберігатися у файл між запусками. Операції, що
+залежать від поточного часу (get_age), кешуються лише з зафіксованою
+датою reference_date, а залежні від локалі (назва місяця) - з локаллю
+LC_TIME у ключі.
+"""
+
+import inspect
+import json
+import locale
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from datetime import date, datetime
+
+from compact_dates import Day, as_datetime
+from utils import HolidayCalculator, get_config_manager
+import metrics
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+FILE_FORMAT_VERSION = 1
+
+# Операції калькулятора, результат яких залежить лише від аргументів
+CACHEABLE_OPERATIONS = frozenset({
+    "calculate_date_difference",
+    "get_day_of_week",
+    "add_days_to_date",
+    "get_working_days",
+    "get_calendar_month"
+})
+
+# Операції, що кешуються лише з параметром reference_date
+REFERENCE_DATE_OPERATIONS = frozenset({"get_age"})
+
+# Операції, результат яких залежить від локалі (назви місяців)
+LOCALE_DEPENDENT_OPERATIONS = frozenset({"get_calendar_month"})
+
+
+def _time_locale():
+    """Поточна локаль LC_TIME (для ключів залежних від локалі операцій)"""
+    return locale.setlocale(locale.LC_TIME)
+
+
+def _copy_result(value):
+    """Копія змінних контейнерів результату (dict, list); решта значень незмінні"""
+    if isinstance(value, dict):
+        return {key: _copy_result(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_copy_result(item) for item in value]
+    return value
+
+
+def canonical_value(value):
+    """Канонічне JSON-сумісне представлення аргументу (TypeError - не кешується)"""
+    if isinstance(value, bool) or value is None:
+        return value
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str):
+        # Дата канонізується так само, як її розбирає калькулятор; рядок,
+        # який калькулятор не прийме (наприклад, з пробілами), лишається окремим ключем
+        try:
+            return canonical_value(as_datetime(value))
+        except ValueError:
+            return value
+    if isinstance(value, Day):
+        return value.isoformat()
+    if isinstance(value, datetime):
+        if value.tzinfo is None and value.time() == datetime.min.time():
+            return value.date().isoformat()
+        return value.isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f"Аргумент не підтримує кешування: {type(value).__name__}")
+
+
+class ResultCache:
+    """Потокобезпечний LRU/TTL кеш з необов'язковим збереженням у файл"""
+
+    def __init__(self, max_size=10000, ttl=None, filename=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.filename = filename
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        if filename and os.path.exists(filename):
+            self.load()
+
+    def get(self, key):
+        """Значення за ключем або None (прострочений запис видаляється)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] is not None and entry[1] <= time.time():
+                del self._entries[key]
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        """Збереження значення з витісненням найдавніше використаних записів"""
+        expires_at = time.time() + self.ttl if self.ttl else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def configure(self, max_size=None, ttl=False):
+        """Зміна розміру (з витісненням зайвих записів) та часу життя нових записів"""
+        with self._lock:
+            if max_size is not None:
+                self.max_size = max_size
+            if ttl is not False:
+                self.ttl = ttl
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def follow_config(self, config_manager, section="result_cache"):
+        """Застосування змін max_size та ttl з ConfigManager без перезапуску"""
+        def on_change(path, old_value, new_value):
+            key = path[len(section) + 1:]
+            if key == "max_size" and new_value:
+                self.configure(max_size=new_value)
+            elif key == "ttl":
+                self.configure(ttl=new_value)
+
+        return config_manager.subscribe(section, on_change)
+
+    def clear(self):
+        """Видалення всіх записів"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def cache_info(self):
+        """Статистика у форматі functools.lru_cache (для metrics.registry)"""
+        return CacheInfo(self.hits, self.misses, self.max_size, len(self._entries))
+
+    def stats(self):
+        """Статистика кешу з часткою влучень"""
+        requests = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+            "hit_ratio": self.hits / requests if requests else 0.0
+        }
+
+    def save(self, filename=None):
+        """Збереження непрострочених записів у файл (атомарна заміна)"""
+        filename = filename or self.filename
+        if not filename:
+            return False
+
+        now = time.time()
+        with self._lock:
+            entries = [[key, value, expires_at]
+                       for key, (value, expires_at) in self._entries.items()
+                       if expires_at is None or expires_at > now]
+
+        try:
+            directory = os.path.dirname(os.path.abspath(filename))
+            fd, temp_name = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as file:
+                    json.dump({"version": FILE_FORMAT_VERSION, "entries": entries},
+                              file, ensure_ascii=False)
+                os.replace(temp_name, filename)
+            except BaseException:
+                os.unlink(temp_name)
+                raise
+            return True
+        except (OSError, TypeError, ValueError) as e:
+            print(f"Помилка збереження кешу результатів: {e}")
+            return False
+
+    def load(self, filename=None):
+        """Завантаження записів з файлу (прострочені пропускаються)"""
+        filename = filename or self.filename
+        try:
+            with open(filename, 'r', encoding='utf-8') as file:
+                data = json.load(file)
+            if data.get("version") != FILE_FORMAT_VERSION:
+                return 0
+
+            now = time.time()
+            with self._lock:
+                for key, value, expires_at in data["entries"]:
+                    if expires_at is None or expires_at > now:
+                        self._entries[key] = (value, expires_at)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+            return len(self._entries)
+
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"Помилка завантаження кешу результатів: {e}")
+            return 0
+
+
+class CachedCalculator:
+    """Калькулятор дат з кешем результатів перед DateTimeCalculator
+
+    Некешовані методи викликаються напряму; змінні контейнери результатів
+    (dict, list) повертаються копіями, щоб зміни у викликача не псували кеш.
+    """
+
+    def __init__(self, calculator=None, cache=None, holiday_calculator=None):
+        if calculator is None:
+            from main import DateTimeCalculator
+            calculator = DateTimeCalculator()
+        if holiday_calculator is None:
+            holiday_calculator = HolidayCalculator()
+
+        self.calculator = calculator
+        self.cache = cache if cache is not None else ResultCache()
+        self.holiday_calculator = holiday_calculator
+        self.calendar_version = holiday_calculator.rules_version()
+        self._signatures = {}
+
+    def refresh_calendar_version(self):
+        """Оновлення версії календаря після зміни правил свят"""
+        self.calendar_version = self.holiday_calculator.rules_version()
+        return self.calendar_version
+
+    def _bind(self, operation, method, args, kwargs):
+        """Аргументи виклику за іменами параметрів (з типовими значеннями) або None"""
+        signature = self._signatures.get(operation)
+        if signature is None:
+            signature = self._signatures[operation] = inspect.signature(method)
+        try:
+            bound = signature.bind(*args, **kwargs)
+        except TypeError:
+            return None
+        bound.apply_defaults()
+        return bound.arguments
+
+    def _key(self, operation, arguments):
+        """Ключ кешу або None, якщо аргументи не канонізуються"""
+        try:
+            named = [[name, canonical_value(value)] for name, value in arguments.items()]
+        except TypeError:
+            return None
+        time_locale = _time_locale() if operation in LOCALE_DEPENDENT_OPERATIONS else None
+        return json.dumps([operation, named, self.calendar_version, time_locale],
+                          ensure_ascii=False)
+
+    def _call(self, operation, args, kwargs):
+        """Виклик операції через кеш"""
+        method = getattr(self.calculator, operation)
+        arguments = self._bind(operation, method, args, kwargs)
+        key = None
+        if arguments is not None and not (operation in REFERENCE_DATE_OPERATIONS
+                                          and arguments.get("reference_date") is None):
+            key = self._key(operation, arguments)
+        if key is None:
+            return method(*args, **kwargs)
+
+        result = self.cache.get(key)
+        if result is None:
+            result = method(*args, **kwargs)
+            self.cache.put(key, result)
+        return _copy_result(result)
+
+    def __getattr__(self, name):
+        if name in CACHEABLE_OPERATIONS or name in REFERENCE_DATE_OPERATIONS:
+            return lambda *args, **kwargs: self._call(name, args, kwargs)
+
+        return getattr(self.calculator, name)
+
+
+_shared_cache = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_cache(config=None):
+    """Спільний для всіх користувачів кеш за розділом 'result_cache' конфігурації
+
+    Без явного config кеш стежить за змінами розділу у спільному
+    ConfigManager. Кеш реєструється у metrics.registry як 'result_cache'.
+    """
+    global _shared_cache
+
+    with _shared_lock:
+        if _shared_cache is None:
+            config_manager = None
+            if config is None:
+                config_manager = get_config_manager()
+                config = config_manager.get("result_cache", {})
+            _shared_cache = ResultCache(config.get('max_size', 10000), config.get('ttl'),
+                                        config.get('filename'))
+            if config_manager is not None:
+                _shared_cache.follow_config(config_manager)
+            metrics.registry.register_cache("result_cache", _shared_cache.cache_info)
+        return _shared_cache
+
+
+def save_shared_cache():
+    """Збереження спільного кешу у файл (якщо він створений та має файл)"""
+    if _shared_cache is not None:
+        return _shared_cache.save()
+    return False
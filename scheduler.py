@@ -0,0 +1,400 @@
+"""
+Планувальник нагадувань за датами (дні народження, терміни, свята)
+
+Нагадування зберігаються у мінімальній купі (heapq) за часом спрацювання,
+тому найближче нагадування знаходиться за O(1), а додавання та вибірка -
+за O(log n); скасовані нагадування видаляються з купи ліниво. Фоновий
+потік спить до найближчого часу спрацювання (або до появи ранішого
+нагадування) і передає нагадування, що настали, у зворотний виклик
+пакетами. Стан зберігається у сховищі (DatabaseManager або бекенд із
+save_reminders/delete_reminders/load_reminders), тож після перезапуску
+планувальник продовжує роботу без повного перегляду записів щохвилини.
+"""
+
+import heapq
+import threading
+from datetime import date, datetime, time, timedelta
+from itertools import count
+
+from birthdays import BirthdayIndex, birthday_in_year
+from compact_dates import as_datetime
+
+DUE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Правила повторення нагадувань
+REPEAT_RULES = (None, "daily", "weekly", "yearly")
+
+
+class Reminder:
+    """Нагадування: час спрацювання, тип, дані та правило повторення"""
+
+    __slots__ = ("id", "due", "kind", "payload", "user_id", "repeat", "anchor", "lead_days")
+
+    def __init__(self, reminder_id, due, kind, payload=None, user_id=None,
+                 repeat=None, anchor=None, lead_days=0):
+        if repeat not in REPEAT_RULES:
+            raise ValueError(f"Невідоме правило повторення: {repeat}")
+        self.id = reminder_id
+        self.due = due
+        self.kind = kind
+        self.payload = payload
+        self.user_id = user_id
+        self.repeat = repeat
+        # Дата події щорічного нагадування (наприклад, дата народження) та
+        # кількість днів, за які нагадування спрацьовує до події
+        self.anchor = anchor
+        self.lead_days = lead_days
+
+    def next_due(self):
+        """Наступний час спрацювання повторюваного нагадування (None - без повторення)"""
+        if self.repeat == "daily":
+            return self.due + timedelta(days=1)
+        if self.repeat == "weekly":
+            return self.due + timedelta(days=7)
+        if self.repeat == "yearly":
+            event = self.due.date() + timedelta(days=self.lead_days)
+            day = birthday_in_year(self.anchor or event, event.year + 1)
+            return datetime.combine(day - timedelta(days=self.lead_days), self.due.time())
+        return None
+
+    def to_record(self):
+        """Запис для сховища"""
+        return {
+            "id": self.id,
+            "user_id": self.user_id,
+            "due": self.due.strftime(DUE_FORMAT),
+            "kind": self.kind,
+            "payload": self.payload,
+            "repeat": self.repeat,
+            "anchor": self.anchor.isoformat() if self.anchor else None,
+            "lead_days": self.lead_days
+        }
+
+    @classmethod
+    def from_record(cls, record):
+        """Нагадування із запису сховища"""
+        anchor = record.get("anchor")
+        return cls(record["id"], datetime.strptime(record["due"], DUE_FORMAT),
+                   record.get("kind"), record.get("payload"), record.get("user_id"),
+                   record.get("repeat"),
+                   date.fromisoformat(anchor) if anchor else None,
+                   record.get("lead_days") or 0)
+
+    def __repr__(self):
+        return f"Reminder({self.id}, {self.due:%Y-%m-%d %H:%M}, {self.kind})"
+
+
+class ReminderScheduler:
+    """Планувальник нагадувань на основі мінімальної купи
+
+    callback(список Reminder) викликається для кожного пакета до
+    batch_size нагадувань, що настали. Якщо зворотний виклик завершився
+    помилкою, пакет повторюється через retry_seconds. Нагадування,
+    скасовані під час обробки пакета, не повторюються і не повертаються в купу.
+    """
+
+    def __init__(self, store=None, callback=None, batch_size=100, retry_seconds=60,
+                 clock=datetime.now):
+        self.store = store
+        self.callback = callback
+        self.batch_size = batch_size
+        self.retry_seconds = retry_seconds
+        self.clock = clock
+        self._heap = []
+        self._reminders = {}
+        # Нагадування пакета, що обробляється, та скасовані під час обробки
+        self._in_flight = {}
+        self._cancelled = set()
+        self._sequence = count()
+        self._next_id = 1
+        self._condition = threading.Condition()
+        self._thread = None
+        self._stopping = False
+
+        if store is not None:
+            self._load()
+
+    def __len__(self):
+        return len(self._reminders)
+
+    def _load(self):
+        """Відновлення нагадувань зі сховища"""
+        reminders = [Reminder.from_record(record) for record in self.store.load_reminders()]
+        with self._condition:
+            for reminder in reminders:
+                self._push(reminder)
+            self._next_id = max(self._reminders, default=0) + 1
+
+    def _push(self, reminder):
+        """Додавання нагадування в купу (виконується під блокуванням)"""
+        self._reminders[reminder.id] = reminder
+        heapq.heappush(self._heap, (reminder.due, next(self._sequence), reminder.id, reminder))
+
+    def _save(self, reminders):
+        """Збереження нагадувань у сховищі"""
+        if self.store is not None and reminders:
+            self.store.save_reminders([reminder.to_record() for reminder in reminders])
+
+    def schedule(self, due, kind, payload=None, user_id=None, repeat=None):
+        """Додавання нагадування; due - дата або час (рядок, date, datetime)"""
+        return self.schedule_many([(due, kind, payload, user_id, repeat)])[0]
+
+    def schedule_many(self, items):
+        """Пакетне додавання: (час, тип[, дані[, користувач[, повторення]]])
+
+        Нагадування зберігаються у сховищі одним викликом.
+        """
+        reminders = []
+        for item in items:
+            due = as_datetime(item[0])
+            repeat = item[4] if len(item) > 4 else None
+            reminders.append(Reminder(
+                None, due, item[1], item[2] if len(item) > 2 else None,
+                item[3] if len(item) > 3 else None, repeat,
+                due.date() if repeat == "yearly" else None))
+        return self._add(reminders)
+
+    def _add(self, reminders):
+        """Призначення ідентифікаторів, додавання в купу та збереження нагадувань"""
+        with self._condition:
+            previous_head = self._heap[0][0] if self._heap else None
+            for reminder in reminders:
+                reminder.id = self._next_id
+                self._next_id += 1
+                self._push(reminder)
+
+            # Фоновий потік прокидається, лише якщо найближчий час змінився
+            if reminders and (previous_head is None or self._heap[0][0] < previous_head):
+                self._condition.notify()
+
+        self._save(reminders)
+        return reminders
+
+    def cancel(self, reminder_id):
+        """Скасування нагадування (запис у купі видаляється ліниво)"""
+        with self._condition:
+            reminder = self._reminders.pop(reminder_id, None)
+            if reminder is None and reminder_id in self._in_flight \
+                    and reminder_id not in self._cancelled:
+                self._cancelled.add(reminder_id)
+                reminder = self._in_flight[reminder_id]
+        if reminder is None:
+            return False
+        if self.store is not None:
+            self.store.delete_reminders([reminder_id])
+        return True
+
+    def _drop_cancelled(self):
+        """Видалення скасованих записів з вершини купи"""
+        heap = self._heap
+        while heap and self._reminders.get(heap[0][2]) is not heap[0][3]:
+            heapq.heappop(heap)
+
+    def next_due(self):
+        """Час найближчого нагадування або None"""
+        with self._condition:
+            self._drop_cancelled()
+            return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now=None, limit=None, in_flight=False):
+        """Вибірка нагадувань, час яких настав (без виклику callback)
+
+        З in_flight нагадування позначаються як такі, що обробляються: їх
+        можна скасувати до завершення обробки (_settle).
+        """
+        now = now or self.clock()
+        due = []
+        with self._condition:
+            heap = self._heap
+            while heap and (limit is None or len(due) < limit):
+                self._drop_cancelled()
+                if not heap or heap[0][0] > now:
+                    break
+                reminder = heapq.heappop(heap)[3]
+                del self._reminders[reminder.id]
+                if in_flight:
+                    self._in_flight[reminder.id] = reminder
+                due.append(reminder)
+        return due
+
+    def _settle(self, batch, requeue):
+        """Завершення обробки пакета (виконується під блокуванням)
+
+        Нагадування з ідентифікаторами requeue, не скасовані під час
+        обробки, повертаються в купу. Повертає нескасовані нагадування пакета.
+        """
+        active = []
+        for reminder in batch:
+            del self._in_flight[reminder.id]
+            if reminder.id in self._cancelled:
+                self._cancelled.discard(reminder.id)
+            else:
+                active.append(reminder)
+                if reminder.id in requeue:
+                    self._push(reminder)
+        return active
+
+    def run_pending(self, now=None):
+        """Спрацювання нагадувань, що настали: пакети у callback, повторення, збереження
+
+        Повертає кількість оброблених нагадувань.
+        """
+        now = now or self.clock()
+        processed = 0
+
+        while True:
+            batch = self.pop_due(now, self.batch_size, in_flight=True)
+            if not batch:
+                return processed
+
+            try:
+                if self.callback is not None:
+                    self.callback(batch)
+            except Exception as e:
+                print(f"Помилка обробки нагадувань: {e}")
+                retry = now + timedelta(seconds=self.retry_seconds)
+                for reminder in batch:
+                    reminder.due = retry
+                with self._condition:
+                    retried = self._settle(batch, {reminder.id for reminder in batch})
+                self._save(retried)
+                return processed
+
+            processed += len(batch)
+            repeated = []
+            for reminder in batch:
+                next_due = reminder.next_due()
+                # Пропущені під час простою повторення не накопичуються
+                while next_due is not None and next_due <= now:
+                    reminder.due = next_due
+                    next_due = reminder.next_due()
+                if next_due is not None:
+                    reminder.due = next_due
+                    repeated.append(reminder)
+
+            repeated_ids = {reminder.id for reminder in repeated}
+            with self._condition:
+                active = self._settle(batch, repeated_ids)
+            repeated = [reminder for reminder in active if reminder.id in repeated_ids]
+            finished = [reminder.id for reminder in active if reminder.id not in repeated_ids]
+            self._save(repeated)
+            if self.store is not None and finished:
+                self.store.delete_reminders(finished)
+
+    def start(self, max_sleep=60.0):
+        """Запуск фонового потоку спрацювання нагадувань"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        self._stopping = False
+
+        def loop():
+            while True:
+                self.run_pending()
+                with self._condition:
+                    if self._stopping:
+                        return
+                    head = self.next_due()
+                    timeout = max_sleep
+                    if head is not None:
+                        timeout = min(max((head - self.clock()).total_seconds(), 0), max_sleep)
+                    self._condition.wait(timeout)
+                    if self._stopping:
+                        return
+
+        self._thread = threading.Thread(target=loop, name="ReminderScheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Зупинка фонового потоку"""
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    # Джерела нагадувань
+
+    def schedule_birthdays(self, people, at=time(9, 0), days_before=0,
+                           reference_date=None):
+        """Щорічні нагадування про дні народження (BirthdayIndex або (id, дата[, дані]))
+
+        Нагадування спрацьовує о at за days_before днів до дня народження.
+        На кожну особу припадає одне нагадування (за типом та ідентифікатором):
+        таке саме наявне лишається, інше (змінена дата, час чи days_before)
+        замінюється. Повертає нагадування всіх осіб.
+        """
+        index = people if isinstance(people, BirthdayIndex) else BirthdayIndex(people)
+        reference = as_datetime(reference_date or self.clock()).date()
+        with self._condition:
+            existing = {}
+            for reminder in list(self._reminders.values()) + list(self._in_flight.values()):
+                if reminder.kind == "birthday" and reminder.id not in self._cancelled:
+                    existing.setdefault(reminder.payload, []).append(reminder)
+
+        kept = []
+        reminders = []
+        for entry in index.upcoming(366, reference + timedelta(days=days_before)):
+            due = datetime.combine(date.fromisoformat(entry["birthday"])
+                                   - timedelta(days=days_before), at)
+            reminder = Reminder(None, due, "birthday", str(entry["person_id"]),
+                                repeat="yearly",
+                                anchor=date.fromisoformat(entry["birth_date"]),
+                                lead_days=days_before)
+            same = None
+            for old in existing.pop(reminder.payload, []):
+                if same is None and (old.due, old.anchor, old.lead_days) == \
+                        (reminder.due, reminder.anchor, reminder.lead_days):
+                    same = old
+                else:
+                    self.cancel(old.id)
+            if same is not None:
+                kept.append(same)
+            else:
+                reminders.append(reminder)
+        return kept + self._add(reminders)
+
+    def schedule_deadline(self, start_date, working_days, kind="deadline", payload=None,
+                          user_id=None, at=time(9, 0), schedule=None):
+        """Нагадування про термін через working_days робочих днів (з урахуванням свят)"""
+        if schedule is None:
+            from business_hours import BusinessSchedule
+            schedule = BusinessSchedule()
+        due = datetime.combine(schedule.add_working_days(start_date, working_days), at)
+        return self.schedule(due, kind, payload, user_id)
+
+    def schedule_holidays(self, year, holiday_calculator=None, at=time(9, 0), days_before=1):
+        """Нагадування про свята року (HolidayCalculator) за days_before днів
+
+        На кожне свято припадає одне нагадування (за датою та назвою свята):
+        таке саме наявне лишається, інше (змінений час чи days_before)
+        замінюється, тож повторний виклик не створює дублікатів. Повертає
+        нагадування всіх свят року.
+        """
+        if holiday_calculator is None:
+            from utils import HolidayCalculator
+            holiday_calculator = HolidayCalculator()
+        with self._condition:
+            existing = {}
+            for reminder in list(self._reminders.values()) + list(self._in_flight.values()):
+                if reminder.kind == "holiday" and reminder.id not in self._cancelled:
+                    holiday = reminder.due.date() + timedelta(days=reminder.lead_days)
+                    existing.setdefault((holiday, reminder.payload), []).append(reminder)
+
+        kept = []
+        reminders = []
+        for holiday, name in holiday_calculator.get_holidays_in_year(year):
+            due = datetime.combine(holiday - timedelta(days=days_before), at)
+            reminder = Reminder(None, due, "holiday", name, lead_days=days_before)
+            same = None
+            for old in existing.pop((holiday, name), []):
+                if same is None and (old.due, old.lead_days) == (reminder.due, reminder.lead_days):
+                    same = old
+                else:
+                    self.cancel(old.id)
+            if same is not None:
+                kept.append(same)
+            else:
+                reminders.append(reminder)
+        return kept + self._add(reminders)
@@ -0,0 +1,996 @@
+"""
+Сховища даних користувачів та історії обчислень
+
+DatabaseManager працює через один з бекендів з однаковим інтерфейсом:
+MySQLBackend (основний), FileBackend (JSON файли як резервний варіант),
+ShardedFileBackend (файли з блокуваннями для кількох процесів на спільному
+диску) та MemoryBackend (у пам'яті - для тестів і вимірювань без диска та
+мережі).
+"""
+
+from contextlib import contextmanager
+from datetime import datetime
+from itertools import count
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+import zlib
+
+try:
+    import fcntl
+except ImportError:
+    # Без fcntl (Windows) блокування діють лише в межах процесу
+    fcntl = None
+
+from mysql.connector import Error
+
+from partitions import PartitionManager, calculations_table_sql
+
+# Колонки історії, за якими дозволене сортування (назва -> колонка SQL)
+HISTORY_SORT_COLUMNS = {
+    "calculation_type": "calculation_type",
+    "input_data": "input_data",
+    "result": "result",
+    "created_at": "created_at"
+}
+
+# Відповідність колонок історії полям записів файлового та пам'ятного сховищ
+RECORD_FIELDS = {
+    "calculation_type": "type",
+    "input_data": "input",
+    "result": "result",
+    "created_at": "timestamp"
+}
+
+# Кількість останніх записів, що повертає get_user_calculations
+HISTORY_LIMIT = 10
+
+# Поля записів нагадувань (scheduler.py); due - 'РРРР-ММ-ДД ГГ:ХХ:СС'
+REMINDER_FIELDS = ("id", "user_id", "due", "kind", "payload", "repeat", "anchor",
+                   "lead_days")
+
+
+def hash_password(password):
+    """Хеш пароля для зберігання"""
+    return hashlib.sha256(password.encode()).hexdigest()
+
+
+def check_sort_column(sort_by):
+    """Перевірка колонки сортування історії"""
+    if sort_by not in HISTORY_SORT_COLUMNS:
+        raise ValueError(f"Невідома колонка сортування: {sort_by}")
+
+
+def _page_from_records(records, offset, limit, sort_by, descending, calc_type):
+    """Сторінка історії зі списку записів-словників"""
+    if calc_type:
+        records = [record for record in records if record["type"] == calc_type]
+
+    key = RECORD_FIELDS[sort_by]
+    records = sorted(records, key=lambda record: (record[key], record["id"]),
+                     reverse=descending)
+
+    return [(record["id"], record["type"], record["input"], record["result"],
+             record["timestamp"])
+            for record in records[offset:offset + limit]]
+
+
+def _chunks_from_records(records, chunk_size):
+    """Порції записів у форматі (тип, вхідні дані, результат, час)"""
+    for start in range(0, len(records), chunk_size):
+        yield [(record["type"], record["input"], record["result"], record["timestamp"])
+               for record in records[start:start + chunk_size]]
+
+
+class StorageBackend:
+    """Базовий інтерфейс сховища
+
+    Усі методи приймають та повертають дані у форматі DatabaseManager:
+    історія - кортежі (тип, вхідні дані, результат, час), сторінки історії
+    додатково містять id запису першим елементом.
+    """
+
+    name = "base"
+    # Кількість записів історії, що зберігаються на користувача (None - усі)
+    history_limit = None
+
+    def register_user(self, username, password, email=""):
+        """Реєстрація нового користувача"""
+        raise NotImplementedError
+
+    def login_user(self, username, password):
+        """Авторизація користувача"""
+        raise NotImplementedError
+
+    def save_calculation(self, user_id, calc_type, input_data, result):
+        """Збереження результату обчислення"""
+        raise NotImplementedError
+
+    def save_calculations_batch(self, user_id, rows):
+        """Збереження пакета обчислень; rows - (тип, вхідні дані, результат, час)"""
+        raise NotImplementedError
+
+    def get_user_calculations(self, user_id):
+        """Останні обчислення користувача (спочатку нові)"""
+        raise NotImplementedError
+
+    def get_calculations_page(self, user_id, offset=0, limit=50,
+                              sort_by="created_at", descending=True,
+                              calc_type=None):
+        """Сторінка історії з сортуванням та фільтром"""
+        raise NotImplementedError
+
+    def count_user_calculations(self, user_id, calc_type=None):
+        """Кількість записів в історії користувача"""
+        raise NotImplementedError
+
+    def get_calculation_types(self, user_id):
+        """Список типів обчислень користувача"""
+        raise NotImplementedError
+
+    def iter_user_calculations(self, user_id, chunk_size=1000):
+        """Потокове читання всієї історії порціями у хронологічному порядку"""
+        raise NotImplementedError
+
+    def save_reminders(self, reminders):
+        """Вставка або оновлення нагадувань (словники з полями REMINDER_FIELDS)"""
+        raise NotImplementedError
+
+    def delete_reminders(self, reminder_ids):
+        """Видалення нагадувань за ідентифікаторами"""
+        raise NotImplementedError
+
+    def load_reminders(self):
+        """Усі збережені нагадування (словники з полями REMINDER_FIELDS)"""
+        raise NotImplementedError
+
+
+def _read_reminders_file(path):
+    """Нагадування з файлу JSON {id: запис} (порожній словник, якщо файлу немає)"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def _update_reminders_file(path, reminders=(), deleted_ids=()):
+    """Зміна файлу нагадувань з атомарною заміною"""
+    records = _read_reminders_file(path)
+    for reminder in reminders:
+        records[str(reminder["id"])] = {field: reminder.get(field) for field in REMINDER_FIELDS}
+    for reminder_id in deleted_ids:
+        records.pop(str(reminder_id), None)
+    atomic_write_json(path, records)
+
+
+class MySQLBackend(StorageBackend):
+    """Сховище в базі даних MySQL"""
+
+    name = "mysql"
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def create_tables(self):
+        """Створення таблиць в базі даних"""
+        try:
+            cursor = self.connection.cursor()
+
+            # Створення таблиці користувачів
+            create_users_table = """
+            CREATE TABLE IF NOT EXISTS users (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                username VARCHAR(50) UNIQUE NOT NULL,
+                password_hash VARCHAR(255) NOT NULL,
+                email VARCHAR(100),
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+            """
+
+            # Секційована таблиця історії обчислень (та сама, що в database_setup.sql)
+            create_calculations_table = calculations_table_sql()
+
+            # Створення таблиці нагадувань (scheduler.py)
+            create_reminders_table = """
+            CREATE TABLE IF NOT EXISTS reminders (
+                id BIGINT PRIMARY KEY,
+                user_id INT NULL,
+                due DATETIME NOT NULL,
+                kind VARCHAR(50),
+                payload TEXT,
+                repeat_rule VARCHAR(20) NULL,
+                anchor DATE NULL,
+                lead_days INT NOT NULL DEFAULT 0,
+                INDEX idx_reminders_due (due)
+            )
+            """
+
+            cursor.execute(create_users_table)
+            cursor.execute(create_calculations_table)
+            cursor.execute(create_reminders_table)
+            self.connection.commit()
+            print("Таблиці створено успішно")
+
+        except Error as e:
+            print(f"Помилка створення таблиць: {e}")
+            return
+
+        # Секції наперед, щоб нові записи не потрапляли в pmax
+        PartitionManager(connection=self.connection).ensure_future_partitions()
+
+    def register_user(self, username, password, email=""):
+        """Реєстрація нового користувача"""
+        try:
+            cursor = self.connection.cursor()
+            query = "INSERT INTO users (username, password_hash, email) VALUES (%s, %s, %s)"
+            cursor.execute(query, (username, hash_password(password), email))
+            self.connection.commit()
+            return True
+
+        except Error as e:
+            print(f"Помилка реєстрації: {e}")
+            return False
+
+    def login_user(self, username, password):
+        """Авторизація користувача"""
+        try:
+            cursor = self.connection.cursor()
+            query = "SELECT id, username FROM users WHERE username = %s AND password_hash = %s"
+            cursor.execute(query, (username, hash_password(password)))
+            result = cursor.fetchone()
+
+            if result:
+                return {"id": result[0], "username": result[1]}
+            return None
+
+        except Error as e:
+            print(f"Помилка авторизації: {e}")
+            return None
+
+    def save_calculation(self, user_id, calc_type, input_data, result):
+        """Збереження результату обчислення"""
+        try:
+            cursor = self.connection.cursor()
+            query = """INSERT INTO calculations (user_id, calculation_type, input_data, result)
+                      VALUES (%s, %s, %s, %s)"""
+            cursor.execute(query, (user_id, calc_type,
+                           str(input_data), str(result)))
+            self.connection.commit()
+
+        except Error as e:
+            print(f"Помилка збереження обчислення: {e}")
+
+    def save_calculations_batch(self, user_id, rows):
+        """Збереження пакета обчислень однією транзакцією"""
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        params = [(user_id, calc_type, str(input_data), str(result), created_at or now)
+                  for calc_type, input_data, result, created_at in rows]
+
+        try:
+            cursor = self.connection.cursor()
+            query = """INSERT INTO calculations
+                      (user_id, calculation_type, input_data, result, created_at)
+                      VALUES (%s, %s, %s, %s, %s)"""
+            cursor.executemany(query, params)
+            self.connection.commit()
+            return True
+
+        except Error as e:
+            print(f"Помилка пакетного збереження: {e}")
+            self.connection.rollback()
+            return False
+
+    def get_user_calculations(self, user_id):
+        """Отримання історії обчислень користувача"""
+        try:
+            cursor = self.connection.cursor()
+            query = f"""SELECT calculation_type, input_data, result, created_at
+                      FROM calculations WHERE user_id = %s ORDER BY created_at DESC LIMIT {HISTORY_LIMIT}"""
+            cursor.execute(query, (user_id,))
+            return cursor.fetchall()
+
+        except Error as e:
+            print(f"Помилка отримання історії: {e}")
+            return []
+
+    def get_calculations_page(self, user_id, offset=0, limit=50,
+                              sort_by="created_at", descending=True,
+                              calc_type=None):
+        """Сторінка історії з сортуванням та фільтром на боці бази"""
+        check_sort_column(sort_by)
+
+        try:
+            cursor = self.connection.cursor()
+            direction = "DESC" if descending else "ASC"
+            where = "user_id = %s"
+            params = [user_id]
+            if calc_type:
+                where += " AND calculation_type = %s"
+                params.append(calc_type)
+
+            query = f"""SELECT id, calculation_type, input_data, result, created_at
+                      FROM calculations WHERE {where}
+                      ORDER BY {HISTORY_SORT_COLUMNS[sort_by]} {direction}, id {direction}
+                      LIMIT %s OFFSET %s"""
+            cursor.execute(query, (*params, limit, offset))
+            return cursor.fetchall()
+
+        except Error as e:
+            print(f"Помилка отримання сторінки історії: {e}")
+            return []
+
+    def count_user_calculations(self, user_id, calc_type=None):
+        """Кількість записів в історії користувача"""
+        try:
+            cursor = self.connection.cursor()
+            query = "SELECT COUNT(*) FROM calculations WHERE user_id = %s"
+            params = [user_id]
+            if calc_type:
+                query += " AND calculation_type = %s"
+                params.append(calc_type)
+            cursor.execute(query, params)
+            return cursor.fetchone()[0]
+
+        except Error as e:
+            print(f"Помилка підрахунку історії: {e}")
+            return 0
+
+    def get_calculation_types(self, user_id):
+        """Список типів обчислень користувача"""
+        try:
+            cursor = self.connection.cursor()
+            query = """SELECT DISTINCT calculation_type FROM calculations
+                      WHERE user_id = %s ORDER BY calculation_type"""
+            cursor.execute(query, (user_id,))
+            return [row[0] for row in cursor.fetchall()]
+
+        except Error as e:
+            print(f"Помилка отримання типів обчислень: {e}")
+            return []
+
+    def iter_user_calculations(self, user_id, chunk_size=1000):
+        """Потокове читання історії небуферизованим курсором"""
+        cursor = None
+        exhausted = False
+        try:
+            cursor = self.connection.cursor(buffered=False)
+            query = """SELECT calculation_type, input_data, result, created_at
+                      FROM calculations WHERE user_id = %s ORDER BY created_at, id"""
+            cursor.execute(query, (user_id,))
+
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    exhausted = True
+                    break
+                yield rows
+
+        except Error as e:
+            print(f"Помилка читання історії: {e}")
+
+        finally:
+            # Непрочитані рядки блокують з'єднання для наступних запитів
+            if cursor is not None and not exhausted:
+                try:
+                    self.connection.consume_results()
+                except Error:
+                    pass
+            if cursor is not None:
+                cursor.close()
+
+    def save_reminders(self, reminders):
+        """Вставка або оновлення нагадувань однією транзакцією"""
+        params = [(reminder["id"], reminder.get("user_id"), reminder["due"],
+                   reminder.get("kind"), reminder.get("payload"),
+                   reminder.get("repeat"), reminder.get("anchor"),
+                   reminder.get("lead_days") or 0)
+                  for reminder in reminders]
+        if not params:
+            return True
+
+        try:
+            cursor = self.connection.cursor()
+            query = """INSERT INTO reminders
+                      (id, user_id, due, kind, payload, repeat_rule, anchor, lead_days)
+                      VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+                      ON DUPLICATE KEY UPDATE user_id = VALUES(user_id), due = VALUES(due),
+                          kind = VALUES(kind), payload = VALUES(payload),
+                          repeat_rule = VALUES(repeat_rule), anchor = VALUES(anchor),
+                          lead_days = VALUES(lead_days)"""
+            cursor.executemany(query, params)
+            self.connection.commit()
+            return True
+
+        except Error as e:
+            print(f"Помилка збереження нагадувань: {e}")
+            self.connection.rollback()
+            return False
+
+    def delete_reminders(self, reminder_ids):
+        """Видалення нагадувань за ідентифікаторами"""
+        params = [(reminder_id,) for reminder_id in reminder_ids]
+        if not params:
+            return True
+
+        try:
+            cursor = self.connection.cursor()
+            cursor.executemany("DELETE FROM reminders WHERE id = %s", params)
+            self.connection.commit()
+            return True
+
+        except Error as e:
+            print(f"Помилка видалення нагадувань: {e}")
+            self.connection.rollback()
+            return False
+
+    def load_reminders(self):
+        """Усі збережені нагадування"""
+        try:
+            cursor = self.connection.cursor()
+            cursor.execute("""SELECT id, user_id, due, kind, payload, repeat_rule, anchor,
+                                     lead_days
+                              FROM reminders ORDER BY due, id""")
+            reminders = []
+            for row in cursor.fetchall():
+                reminder = dict(zip(REMINDER_FIELDS, row))
+                reminder["due"] = reminder["due"].strftime("%Y-%m-%d %H:%M:%S")
+                if reminder["anchor"] is not None:
+                    reminder["anchor"] = reminder["anchor"].isoformat()
+                reminders.append(reminder)
+            return reminders
+
+        except Error as e:
+            print(f"Помилка завантаження нагадувань: {e}")
+            return []
+
+
+class FileBackend(StorageBackend):
+    """Файлове сховище (JSON) як резервний варіант"""
+
+    name = "file"
+    history_limit = HISTORY_LIMIT
+
+    def __init__(self, directory="."):
+        self.directory = directory
+
+    def _path(self, filename):
+        """Повний шлях до файлу сховища"""
+        return os.path.join(self.directory, filename)
+
+    def _calculations_file(self, user_id):
+        """Файл історії користувача"""
+        return self._path(f"calculations_{user_id}.json")
+
+    def register_user(self, username, password, email=""):
+        """Реєстрація користувача у файлі"""
+        users_file = self._path("users.json")
+        users = {}
+
+        if os.path.exists(users_file):
+            with open(users_file, 'r', encoding='utf-8') as f:
+                users = json.load(f)
+
+        if username in users:
+            return False
+
+        users[username] = {
+            "password_hash": hash_password(password),
+            "email": email,
+            "id": len(users) + 1
+        }
+
+        with open(users_file, 'w', encoding='utf-8') as f:
+            json.dump(users, f, ensure_ascii=False, indent=2)
+
+        return True
+
+    def login_user(self, username, password):
+        """Авторизація користувача з файлу"""
+        users_file = self._path("users.json")
+
+        if not os.path.exists(users_file):
+            return None
+
+        with open(users_file, 'r', encoding='utf-8') as f:
+            users = json.load(f)
+
+        if username not in users:
+            return None
+
+        if users[username]["password_hash"] == hash_password(password):
+            return {"id": users[username]["id"], "username": username}
+
+        return None
+
+    def _load_calculations(self, user_id):
+        """Завантаження записів історії з файлу (з ідентифікаторами)"""
+        calc_file = self._calculations_file(user_id)
+
+        if not os.path.exists(calc_file):
+            return []
+
+        with open(calc_file, 'r', encoding='utf-8') as f:
+            calculations = json.load(f)
+
+        # Старі записи не мають id - використовуємо позицію у файлі
+        for index, calc in enumerate(calculations, 1):
+            calc.setdefault("id", index)
+
+        return calculations
+
+    def _store_calculations(self, user_id, calculations):
+        """Запис історії у файл (зберігаються тільки останні записи)"""
+        calculations = calculations[-self.history_limit:]
+
+        with open(self._calculations_file(user_id), 'w', encoding='utf-8') as f:
+            json.dump(calculations, f, ensure_ascii=False, indent=2)
+
+    def save_calculation(self, user_id, calc_type, input_data, result):
+        """Збереження обчислення у файл"""
+        self.save_calculations_batch(
+            user_id, [(calc_type, input_data, result, None)])
+
+    def save_calculations_batch(self, user_id, rows):
+        """Пакетне збереження обчислень у файл"""
+        calculations = self._load_calculations(user_id)
+        next_id = max((calc["id"] for calc in calculations), default=0) + 1
+        now = datetime.now().isoformat()
+
+        for offset, (calc_type, input_data, result, created_at) in enumerate(rows):
+            calculations.append({
+                "id": next_id + offset,
+                "type": calc_type,
+                "input": str(input_data),
+                "result": str(result),
+                "timestamp": created_at or now
+            })
+
+        self._store_calculations(user_id, calculations)
+        return True
+
+    def get_user_calculations(self, user_id):
+        """Отримання історії обчислень з файлу"""
+        return [(calc["type"], calc["input"], calc["result"], calc["timestamp"])
+                for calc in reversed(self._load_calculations(user_id))]
+
+    def get_calculations_page(self, user_id, offset=0, limit=50,
+                              sort_by="created_at", descending=True,
+                              calc_type=None):
+        """Отримання сторінки історії з файлу"""
+        check_sort_column(sort_by)
+        return _page_from_records(self._load_calculations(user_id), offset, limit,
+                                  sort_by, descending, calc_type)
+
+    def count_user_calculations(self, user_id, calc_type=None):
+        """Кількість записів в історії користувача"""
+        records = self._load_calculations(user_id)
+        if calc_type:
+            return sum(1 for record in records if record["type"] == calc_type)
+        return len(records)
+
+    def get_calculation_types(self, user_id):
+        """Список типів обчислень користувача"""
+        return sorted({calc["type"] for calc in self._load_calculations(user_id)})
+
+    def iter_user_calculations(self, user_id, chunk_size=1000):
+        """Потокове читання історії з файлу порціями"""
+        yield from _chunks_from_records(self._load_calculations(user_id), chunk_size)
+
+    def save_reminders(self, reminders):
+        """Збереження нагадувань у файл"""
+        _update_reminders_file(self._path("reminders.json"), reminders=reminders)
+        return True
+
+    def delete_reminders(self, reminder_ids):
+        """Видалення нагадувань з файлу"""
+        _update_reminders_file(self._path("reminders.json"), deleted_ids=reminder_ids)
+        return True
+
+    def load_reminders(self):
+        """Нагадування з файлу"""
+        return list(_read_reminders_file(self._path("reminders.json")).values())
+
+
+_process_locks = {}
+_process_locks_guard = threading.Lock()
+
+
+@contextmanager
+def file_lock(lock_path):
+    """Виключне рекомендаційне блокування (fcntl.flock) файлу lock_path"""
+    if fcntl is None:
+        with _process_locks_guard:
+            lock = _process_locks.setdefault(os.path.abspath(lock_path), threading.Lock())
+        with lock:
+            yield
+        return
+
+    with open(lock_path, 'a') as lock_file:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def _replacement_mode(path):
+    """Права файлу, що замінює path: права наявного файлу або 0666 з урахуванням umask"""
+    try:
+        return os.stat(path).st_mode & 0o7777
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+
+def atomic_write_json(path, data):
+    """Запис JSON у тимчасовий файл та атомарна заміна (читачі бачать старий або новий файл)
+
+    mkstemp створює файл з правами 0600, тому перед заміною йому
+    надаються права наявного файлу (або звичайні права нового файлу).
+    """
+    fd, temp_name = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)),
+                                     suffix=".tmp")
+    try:
+        if hasattr(os, "fchmod"):
+            os.fchmod(fd, _replacement_mode(path))
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(temp_name, path)
+    except BaseException:
+        os.unlink(temp_name)
+        raise
+
+
+class ShardedFileBackend(StorageBackend):
+    """Файлове сховище для кількох процесів на спільному диску
+
+    Користувачі розподіляються за хешем імені (crc32) між shards файлами
+    users_NN.json, тому реєстрації в різних сегментах не чекають одна
+    одну. Сегмент змінюється під блокуванням fcntl та записується через
+    тимчасовий файл з атомарною заміною; вхід читає файл без блокувань.
+    Ідентифікатор користувача - номер у сегменті * shards + сегмент + 1,
+    тобто унікальний для всіх сегментів.
+
+    Історія кожного користувача - окремий файл JSON Lines, до якого
+    записи дописуються під блокуванням цього користувача (без
+    перезапису файлу). Читачі не блокуються і пропускають незавершений
+    останній рядок. Як і в MySQL, історія не обрізається.
+    """
+
+    name = "sharded"
+
+    def __init__(self, directory=".", shards=16):
+        if shards < 1:
+            raise ValueError(f"Невірна кількість сегментів: {shards}")
+        self.directory = directory
+        self.shards = shards
+        self.history_directory = os.path.join(directory, "history")
+        os.makedirs(self.history_directory, exist_ok=True)
+        self._users_cache = {}
+
+    def _shard(self, username):
+        """Сегмент користувача (стабільний між процесами)"""
+        return zlib.crc32(username.encode('utf-8')) % self.shards
+
+    def _users_file(self, shard):
+        """Файл користувачів сегмента"""
+        return os.path.join(self.directory, f"users_{shard:02d}.json")
+
+    def _history_file(self, user_id):
+        """Файл історії користувача"""
+        return os.path.join(self.history_directory, f"calculations_{user_id}.jsonl")
+
+    def _read_users(self, shard):
+        """Користувачі сегмента (кешуються до заміни файлу)"""
+        users_file = self._users_file(shard)
+        try:
+            stat = os.stat(users_file)
+        except FileNotFoundError:
+            return {}
+
+        signature = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        cached = self._users_cache.get(shard)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+
+        with open(users_file, 'r', encoding='utf-8') as f:
+            users = json.load(f)
+        self._users_cache[shard] = (signature, users)
+        return users
+
+    def register_user(self, username, password, email=""):
+        """Реєстрація користувача у файлі його сегмента"""
+        shard = self._shard(username)
+        users_file = self._users_file(shard)
+
+        with file_lock(users_file + ".lock"):
+            users = dict(self._read_users(shard))
+            if username in users:
+                return False
+
+            users[username] = {
+                "password_hash": hash_password(password),
+                "email": email,
+                "id": len(users) * self.shards + shard + 1
+            }
+            atomic_write_json(users_file, users)
+
+        return True
+
+    def login_user(self, username, password):
+        """Авторизація користувача (без блокувань)"""
+        user = self._read_users(self._shard(username)).get(username)
+
+        if user and user["password_hash"] == hash_password(password):
+            return {"id": user["id"], "username": username}
+        return None
+
+    @staticmethod
+    def _tail_records(f, limit):
+        """Останні limit повних записів файлу історії (читання блоками з кінця)"""
+        size = f.seek(0, os.SEEK_END)
+        block = 4096
+        while True:
+            start = max(size - block, 0)
+            f.seek(start)
+            lines = f.read(size - start).split(b"\n")
+            # Перший елемент блоку може бути неповним рядком, останній -
+            # незавершеним записом або порожнім після \n
+            records = []
+            for line in reversed(lines[1:-1] if start else lines[:-1]):
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue
+                if len(records) == limit:
+                    break
+            if len(records) == limit or not start:
+                records.reverse()
+                return records
+            block *= 4
+
+    @classmethod
+    def _last_record_id(cls, f):
+        """Ідентифікатор останнього повного запису файлу історії (0 - записів немає)"""
+        records = cls._tail_records(f, 1)
+        return records[0]["id"] if records else 0
+
+    @staticmethod
+    def _ends_with_newline(f):
+        """Чи закінчується непорожній файл символом нового рядка"""
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
+
+    def save_calculation(self, user_id, calc_type, input_data, result):
+        """Збереження обчислення (дописування у файл історії)"""
+        self.save_calculations_batch(
+            user_id, [(calc_type, input_data, result, None)])
+
+    def save_calculations_batch(self, user_id, rows):
+        """Пакетне дописування обчислень одним записом у файл історії"""
+        history_file = self._history_file(user_id)
+        now = datetime.now().isoformat()
+
+        with file_lock(history_file + ".lock"):
+            with open(history_file, 'ab+') as f:
+                next_id = self._last_record_id(f) + 1
+                # Незавершений рядок після збою не повинен злитися з новим записом
+                size = f.seek(0, os.SEEK_END)
+                lines = [""] if size and not self._ends_with_newline(f) else []
+                for offset, (calc_type, input_data, result, created_at) in enumerate(rows):
+                    lines.append(json.dumps({
+                        "id": next_id + offset,
+                        "type": calc_type,
+                        "input": str(input_data),
+                        "result": str(result),
+                        "timestamp": created_at or now
+                    }, ensure_ascii=False))
+                if rows:
+                    f.write(("\n".join(lines) + "\n").encode('utf-8'))
+        return True
+
+    def _load_calculations(self, user_id):
+        """Записи історії без блокувань (незавершені та пошкоджені рядки пропускаються)"""
+        try:
+            with open(self._history_file(user_id), 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return []
+
+        records = []
+        for line in data.split(b"\n")[:-1]:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue
+        return records
+
+    def get_user_calculations(self, user_id):
+        """Останні обчислення користувача (спочатку нові), читається лише кінець файлу"""
+        try:
+            with open(self._history_file(user_id), 'rb') as f:
+                records = self._tail_records(f, HISTORY_LIMIT)
+        except FileNotFoundError:
+            return []
+
+        return [(calc["type"], calc["input"], calc["result"], calc["timestamp"])
+                for calc in reversed(records)]
+
+    def get_calculations_page(self, user_id, offset=0, limit=50,
+                              sort_by="created_at", descending=True,
+                              calc_type=None):
+        """Сторінка історії з сортуванням та фільтром"""
+        check_sort_column(sort_by)
+        return _page_from_records(self._load_calculations(user_id), offset, limit,
+                                  sort_by, descending, calc_type)
+
+    def count_user_calculations(self, user_id, calc_type=None):
+        """Кількість записів в історії користувача"""
+        records = self._load_calculations(user_id)
+        if calc_type:
+            return sum(1 for record in records if record["type"] == calc_type)
+        return len(records)
+
+    def get_calculation_types(self, user_id):
+        """Список типів обчислень користувача"""
+        return sorted({calc["type"] for calc in self._load_calculations(user_id)})
+
+    def iter_user_calculations(self, user_id, chunk_size=1000):
+        """Потокове читання історії порціями"""
+        yield from _chunks_from_records(self._load_calculations(user_id), chunk_size)
+
+    def _reminders_file(self):
+        """Файл нагадувань"""
+        return os.path.join(self.directory, "reminders.json")
+
+    def save_reminders(self, reminders):
+        """Збереження нагадувань під блокуванням файлу"""
+        reminders_file = self._reminders_file()
+        with file_lock(reminders_file + ".lock"):
+            _update_reminders_file(reminders_file, reminders=reminders)
+        return True
+
+    def delete_reminders(self, reminder_ids):
+        """Видалення нагадувань під блокуванням файлу"""
+        reminders_file = self._reminders_file()
+        with file_lock(reminders_file + ".lock"):
+            _update_reminders_file(reminders_file, deleted_ids=reminder_ids)
+        return True
+
+    def load_reminders(self):
+        """Нагадування з файлу (без блокувань)"""
+        return list(_read_reminders_file(self._reminders_file()).values())
+
+
+class MemoryBackend(StorageBackend):
+    """Сховище в пам'яті з семантикою MySQL
+
+    Історія не обмежується за розміром, get_user_calculations повертає
+    останні записи. latency - штучна затримка (секунди) кожної операції
+    для імітації повільної бази даних.
+    """
+
+    name = "memory"
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self._lock = threading.Lock()
+        self._users = {}
+        self._calculations = {}
+        self._user_ids = count(1)
+        self._calc_ids = count(1)
+        self._reminders = {}
+
+    def _simulate_latency(self):
+        """Штучна затримка операції"""
+        if self.latency:
+            time.sleep(self.latency)
+
+    def register_user(self, username, password, email=""):
+        """Реєстрація нового користувача"""
+        self._simulate_latency()
+        with self._lock:
+            if username in self._users:
+                return False
+
+            self._users[username] = {
+                "id": next(self._user_ids),
+                "password_hash": hash_password(password),
+                "email": email
+            }
+            return True
+
+    def login_user(self, username, password):
+        """Авторизація користувача"""
+        self._simulate_latency()
+        user = self._users.get(username)
+
+        if user and user["password_hash"] == hash_password(password):
+            return {"id": user["id"], "username": username}
+        return None
+
+    def save_calculation(self, user_id, calc_type, input_data, result):
+        """Збереження результату обчислення"""
+        self.save_calculations_batch(
+            user_id, [(calc_type, input_data, result, None)])
+
+    def save_calculations_batch(self, user_id, rows):
+        """Збереження пакета обчислень"""
+        self._simulate_latency()
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+        with self._lock:
+            records = self._calculations.setdefault(user_id, [])
+            for calc_type, input_data, result, created_at in rows:
+                records.append({
+                    "id": next(self._calc_ids),
+                    "type": calc_type,
+                    "input": str(input_data),
+                    "result": str(result),
+                    "timestamp": created_at or now
+                })
+        return True
+
+    def _records(self, user_id):
+        """Знімок записів історії користувача"""
+        with self._lock:
+            return list(self._calculations.get(user_id, ()))
+
+    def get_user_calculations(self, user_id):
+        """Останні обчислення користувача (спочатку нові)"""
+        return [row[1:] for row in self.get_calculations_page(user_id, 0, HISTORY_LIMIT)]
+
+    def get_calculations_page(self, user_id, offset=0, limit=50,
+                              sort_by="created_at", descending=True,
+                              calc_type=None):
+        """Сторінка історії з сортуванням та фільтром"""
+        check_sort_column(sort_by)
+        self._simulate_latency()
+        return _page_from_records(self._records(user_id), offset, limit,
+                                  sort_by, descending, calc_type)
+
+    def count_user_calculations(self, user_id, calc_type=None):
+        """Кількість записів в історії користувача"""
+        self._simulate_latency()
+        records = self._records(user_id)
+        if calc_type:
+            return sum(1 for record in records if record["type"] == calc_type)
+        return len(records)
+
+    def get_calculation_types(self, user_id):
+        """Список типів обчислень користувача"""
+        self._simulate_latency()
+        return sorted({record["type"] for record in self._records(user_id)})
+
+    def iter_user_calculations(self, user_id, chunk_size=1000):
+        """Потокове читання історії порціями"""
+        self._simulate_latency()
+        yield from _chunks_from_records(self._records(user_id), chunk_size)
+
+    def save_reminders(self, reminders):
+        """Вставка або оновлення нагадувань"""
+        self._simulate_latency()
+        with self._lock:
+            for reminder in reminders:
+                self._reminders[reminder["id"]] = {
+                    field: reminder.get(field) for field in REMINDER_FIELDS}
+        return True
+
+    def delete_reminders(self, reminder_ids):
+        """Видалення нагадувань"""
+        self._simulate_latency()
+        with self._lock:
+            for reminder_id in reminder_ids:
+                self._reminders.pop(reminder_id, None)
+        return True
+
+    def load_reminders(self):
+        """Усі збережені нагадування"""
+        self._simulate_latency()
+        with self._lock:
+            return [dict(reminder) for reminder in self._reminders.values()]
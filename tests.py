@@ -3,7 +3,40 @@
 """
 
 from main import DateTimeCalculator, DatabaseManager
+from storage import FileBackend, MemoryBackend, ShardedFileBackend
+from columnar import ColumnarHistory, write_columnar_history
+from partitions import (CALCULATIONS_COLUMNS, add_months, build_reorganize_sql,
+                        calculations_table_sql, parse_partition_bound)
+from benchmarks import Benchmark, compare_with_baseline, measure, missing_from_baseline
+import metrics
+from profiling import Profiler
+import batch
+from timezones import convert_timestamps, get_transition_index, local_date, parse_timestamp
+import pytz
+from business_hours import BusinessSchedule
+from recurrence import RecurrenceRule, parse_rrule
+from itertools import islice
+from intervals import DateRangeIndex, count_working_days
+from compact_dates import Day, DayColumn
+from result_cache import CachedCalculator, ResultCache
+from periods import FiscalCalendar, PeriodCalculator
+from calendar_snapshot import load_snapshot, open_snapshot
+from birthdays import BirthdayIndex
+from scheduler import ReminderScheduler
+import calendar
+from utils import (Logger, ConfigManager, DateFormatter, DateValidator, HolidayCalculator,
+                   export_calculations_to_csv, stream_calculations_to_csv,
+                   import_calculations_to_database)
 import unittest
+from unittest import mock
+from mysql.connector import Error
+import multiprocessing
+import threading
+import tempfile
+import time
+import json
+import csv
+import gzip
 from datetime import datetime, timedelta
 import sys
 import os
@@ -11,6 +44,31 @@ import os
 # Додаємо поточну директорію до шляху для імпорту
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
+# Тимчасовий каталог для знімка календаря замість каталогу кешу користувача
+_snapshot_dir = None
+_snapshot_path_patch = None
+
+
+def setUpModule():
+    """Спільний знімок календаря у тимчасовому каталозі"""
+    global _snapshot_dir, _snapshot_path_patch
+    _snapshot_dir = tempfile.TemporaryDirectory()
+    _snapshot_path_patch = mock.patch(
+        "calendar_snapshot.default_snapshot_path",
+        return_value=os.path.join(_snapshot_dir.name, "calendar_snapshot.bin"))
+    _snapshot_path_patch.start()
+
+
+def tearDownModule():
+    """Закриття спільного знімка та видалення тимчасового каталогу"""
+    import calendar_snapshot
+
+    if calendar_snapshot._snapshot is not None:
+        calendar_snapshot._snapshot.close()
+        calendar_snapshot._snapshot = None
+    _snapshot_path_patch.stop()
+    _snapshot_dir.cleanup()
+
 
 class TestDateTimeCalculator(unittest.TestCase):
     """Тести для класу DateTimeCalculator"""
@@ -125,18 +183,16 @@ class TestDatabaseManager(unittest.TestCase):
 
     def setUp(self):
         """Підготовка до тестів"""
-        self.db_manager = DatabaseManager()
-        # Використовуємо файлову базу даних для тестів
-        self.db_manager.connection = None
+        # Файлова база даних у тимчасовому каталозі, без підключення до MySQL
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_manager = DatabaseManager(backend=FileBackend(self.temp_dir.name))
+
+    def tearDown(self):
+        """Очищення після тестів"""
+        self.temp_dir.cleanup()
 
     def test_file_register_and_login(self):
         """Тест реєстрації та авторизації через файли"""
-        # Очищення тестових файлів
-        test_files = ["users.json", "calculations_999.json"]
-        for file in test_files:
-            if os.path.exists(file):
-                os.remove(file)
-
         # Тест реєстрації
         result = self.db_manager.file_register_user(
             "test_user", "test_password", "test@example.com")
@@ -156,19 +212,13 @@ class TestDatabaseManager(unittest.TestCase):
         user = self.db_manager.file_login_user("test_user", "wrong_password")
         self.assertIsNone(user)
 
-        # Очищення після тестів
-        for file in test_files:
-            if os.path.exists(file):
-                os.remove(file)
+        # Файли створюються лише в каталозі сховища
+        self.assertTrue(os.path.exists(
+            os.path.join(self.temp_dir.name, "users.json")))
 
     def test_file_calculations(self):
         """Тест збереження та отримання обчислень через файли"""
         user_id = 999
-        calc_file = f"calculations_{user_id}.json"
-
-        # Очищення тестового файлу
-        if os.path.exists(calc_file):
-            os.remove(calc_file)
 
         # Збереження обчислень
         self.db_manager.file_save_calculation(
@@ -184,9 +234,147 @@ class TestDatabaseManager(unittest.TestCase):
         self.assertEqual(calculations[0][0], "test_type2")
         self.assertEqual(calculations[1][0], "test_type")
 
-        # Очищення після тестів
-        if os.path.exists(calc_file):
-            os.remove(calc_file)
+    def test_file_calculations_page(self):
+        """Тест посторінкового отримання історії з файлу"""
+        user_id = 998
+        for i in range(5):
+            calc_type = "Вік" if i % 2 else "Календар"
+            self.db_manager.save_calculation(
+                user_id, calc_type, f"input{i}", f"result{i}")
+
+        self.assertEqual(self.db_manager.count_user_calculations(user_id), 5)
+        self.assertEqual(
+            self.db_manager.count_user_calculations(user_id, "Вік"), 2)
+        self.assertEqual(self.db_manager.get_calculation_types(user_id),
+                         ["Вік", "Календар"])
+
+        # Останні записи спочатку, сторінками по 2
+        page = self.db_manager.get_calculations_page(user_id, 0, 2)
+        self.assertEqual([row[2] for row in page], ["input4", "input3"])
+        page = self.db_manager.get_calculations_page(user_id, 4, 2)
+        self.assertEqual([row[2] for row in page], ["input0"])
+
+        # Сортування та фільтр
+        page = self.db_manager.get_calculations_page(
+            user_id, 0, 10, sort_by="input_data", descending=False,
+            calc_type="Вік")
+        self.assertEqual([row[2] for row in page], ["input1", "input3"])
+
+        with self.assertRaises(ValueError):
+            self.db_manager.get_calculations_page(user_id, sort_by="password")
+
+    def test_stream_export(self):
+        """Тест потокового експорту історії у CSV та gzip"""
+        user_id = 997
+        for i in range(5):
+            self.db_manager.save_calculation(
+                user_id, "Вік", f"input{i}", f"result{i}")
+
+        chunks = list(self.db_manager.iter_user_calculations(user_id, 2))
+        self.assertEqual([len(chunk) for chunk in chunks], [2, 2, 1])
+        self.assertEqual(chunks[0][0][1], "input0")
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            progress = []
+            plain = os.path.join(temp_dir, "export.csv")
+            stats = stream_calculations_to_csv(
+                self.db_manager, user_id, plain, chunk_size=2,
+                progress_callback=lambda rows, *_: progress.append(rows))
+            self.assertEqual(stats["rows"], 5)
+            self.assertFalse(stats["compressed"])
+            self.assertEqual(progress, [2, 4, 5])
+
+            packed = os.path.join(temp_dir, "export.csv.gz")
+            stats = stream_calculations_to_csv(self.db_manager, user_id, packed)
+            self.assertTrue(stats["compressed"])
+
+            with open(plain, newline='', encoding='utf-8') as f:
+                plain_rows = list(csv.reader(f))
+            with gzip.open(packed, 'rt', newline='', encoding='utf-8') as f:
+                packed_rows = list(csv.reader(f))
+            self.assertEqual(plain_rows, packed_rows)
+            self.assertEqual(len(plain_rows), 6)
+
+    def test_import_with_checkpoint(self):
+        """Тест пакетного імпорту з відновленням після збою"""
+        user_id = 996
+        # Файлове сховище зберігає лише останні записи - імпорт у нього відхиляється
+        self.assertIsNone(import_calculations_to_database(self.db_manager, user_id, "none.csv"))
+        self.db_manager = DatabaseManager(backend=MemoryBackend())
+        with tempfile.TemporaryDirectory() as temp_dir:
+            filename = os.path.join(temp_dir, "import.csv")
+            with open(filename, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                writer.writerow(['Тип обчислення', 'Вхідні дані', 'Результат', 'Дата'])
+                for i in range(6):
+                    writer.writerow(["Вік", f"input{i}", f"result{i}",
+                                     f"2024-01-0{i + 1} 10:00:00"])
+                writer.writerow(["Вік", "bad", "bad", "2024-13-01"])
+                writer.writerow(["Вік", "bad", "bad", "2024-01-05 25:99:00"])
+                writer.writerow(["Вік", "bad", "bad", "2024-01-05 10:00:00 зайве"])
+
+            # Імітація збою на другому пакеті
+            original_save = self.db_manager.save_calculations_batch
+            calls = []
+
+            def failing_save(uid, rows):
+                calls.append(len(rows))
+                if len(calls) == 2:
+                    return False
+                return original_save(uid, rows)
+
+            self.db_manager.save_calculations_batch = failing_save
+            stats = import_calculations_to_database(
+                self.db_manager, user_id, filename, batch_size=3)
+            self.assertFalse(stats["completed"])
+            self.assertEqual(stats["imported"], 3)
+            self.assertTrue(os.path.exists(filename + ".checkpoint"))
+
+            # Повторний запуск продовжує з контрольної точки
+            stats = import_calculations_to_database(
+                self.db_manager, user_id, filename, batch_size=3)
+            self.assertTrue(stats["completed"])
+            self.assertEqual(stats["resumed_from"], 3)
+            self.assertEqual(stats["imported"], 3)
+            self.assertEqual(stats["invalid"], 3)
+            self.assertFalse(os.path.exists(filename + ".checkpoint"))
+
+        calculations = self.db_manager.get_user_calculations(user_id)
+        self.assertEqual([calc[1] for calc in reversed(calculations)],
+                         [f"input{i}" for i in range(6)])
+        self.assertEqual(calculations[0][3], "2024-01-06 10:00:00")
+
+    def test_async_connection(self):
+        """Тест фонового підключення без сервера MySQL (підміна connect)"""
+        with mock.patch("mysql.connector.connect", side_effect=Error("недоступний")):
+            db_manager = DatabaseManager(connect_async=True, connect_timeout=1)
+            self.assertTrue(db_manager.wait_for_connection(timeout=5))
+        self.assertFalse(db_manager.is_connecting())
+        self.assertEqual(db_manager.backend_status(), "file")
+
+    def test_abandon_hung_connection(self):
+        """Тест відмови від підключення, що зависло"""
+        release = threading.Event()
+        connection = mock.Mock()
+
+        def hung_connect(**config):
+            release.wait(5)
+            return connection
+
+        with mock.patch("mysql.connector.connect", hung_connect):
+            db_manager = DatabaseManager(connect_async=True, connect_timeout=1)
+            future = db_manager._connect_future
+            self.assertEqual(db_manager.backend_status(), "connecting")
+            self.assertFalse(db_manager.wait_for_connection(timeout=0.05))
+
+            self.assertTrue(db_manager.abandon_connection())
+            self.assertEqual(db_manager.backend_status(), "file")
+            release.set()
+            future.result(timeout=5)
+
+        # Пізнє з'єднання закривається і не замінює файлову базу
+        connection.close.assert_called_once_with()
+        self.assertEqual(db_manager.backend_status(), "file")
 
 
 class TestIntegration(unittest.TestCase):
@@ -195,23 +383,17 @@ class TestIntegration(unittest.TestCase):
     def setUp(self):
         """Підготовка до тестів"""
         self.calculator = DateTimeCalculator()
-        self.db_manager = DatabaseManager()
-        self.db_manager.connection = None
+        # Сховище в пам'яті: без диска та мережі
+        self.db_manager = DatabaseManager(backend=MemoryBackend())
 
     def test_full_workflow(self):
         """Тест повного робочого процесу"""
-        # Очищення тестових файлів
-        test_files = ["users.json", "calculations_1.json"]
-        for file in test_files:
-            if os.path.exists(file):
-                os.remove(file)
-
         # Реєстрація користувача
-        self.assertTrue(self.db_manager.file_register_user(
+        self.assertTrue(self.db_manager.register_user(
             "integration_user", "password123"))
 
         # Авторизація
-        user = self.db_manager.file_login_user(
+        user = self.db_manager.login_user(
             "integration_user", "password123")
         self.assertIsNotNone(user)
 
@@ -221,7 +403,7 @@ class TestIntegration(unittest.TestCase):
         self.assertEqual(diff_result['total_days'], 365)
 
         # Збереження результату
-        self.db_manager.file_save_calculation(
+        self.db_manager.save_calculation(
             user['id'],
             "Різниця дат",
             "2024-01-01 - 2024-12-31",
@@ -229,14 +411,1211 @@ class TestIntegration(unittest.TestCase):
         )
 
         # Перевірка збереження
-        calculations = self.db_manager.file_get_calculations(user['id'])
+        calculations = self.db_manager.get_user_calculations(user['id'])
         self.assertEqual(len(calculations), 1)
         self.assertEqual(calculations[0][0], "Різниця дат")
 
-        # Очищення після тестів
-        for file in test_files:
-            if os.path.exists(file):
-                os.remove(file)
+
+class TestMemoryBackend(unittest.TestCase):
+    """Тести для сховища в пам'яті"""
+
+    def setUp(self):
+        """Підготовка до тестів"""
+        self.db_manager = DatabaseManager(backend=MemoryBackend())
+
+    def test_users_and_history(self):
+        """Тест користувачів та історії в пам'яті"""
+        self.assertEqual(self.db_manager.backend_status(), "memory")
+        self.assertIsNone(self.db_manager.connection)
+
+        self.assertTrue(self.db_manager.register_user("user", "secret"))
+        self.assertFalse(self.db_manager.register_user("user", "other"))
+        self.assertIsNone(self.db_manager.login_user("user", "wrong"))
+        user = self.db_manager.login_user("user", "secret")
+
+        # Історія не обмежується, повертаються останні 10 записів
+        for i in range(15):
+            self.db_manager.save_calculation(user['id'], "Вік", f"input{i}", i)
+
+        calculations = self.db_manager.get_user_calculations(user['id'])
+        self.assertEqual(len(calculations), 10)
+        self.assertEqual(calculations[0][1], "input14")
+        self.assertEqual(self.db_manager.count_user_calculations(user['id']), 15)
+
+        page = self.db_manager.get_calculations_page(user['id'], 10, 10)
+        self.assertEqual([row[2] for row in page],
+                         [f"input{i}" for i in range(4, -1, -1)])
+
+    def test_artificial_latency(self):
+        """Тест штучної затримки операцій"""
+        db_manager = DatabaseManager(backend=MemoryBackend(latency=0.02))
+        started = time.perf_counter()
+        db_manager.register_user("slow", "secret")
+        db_manager.login_user("slow", "secret")
+        self.assertGreaterEqual(time.perf_counter() - started, 0.04)
+
+
+class TestDateValidator(unittest.TestCase):
+    """Тести для валідації дат"""
+
+    def setUp(self):
+        """Підготовка до тестів"""
+        self.values = ["2024-01-01", "2024-13-01", "2024-02-29", "2023-02-29",
+                       "invalid", "2024-1-01", "2024-01-01\n", "0000-01-01"]
+
+    def test_bulk_matches_scalar(self):
+        """Тест збігу пакетної та поодинокої валідації"""
+        mask = DateValidator.validate_dates(self.values)
+        self.assertEqual(list(mask),
+                         [int(DateValidator.is_valid_date(v)) for v in self.values])
+        self.assertEqual(DateValidator.find_invalid_dates(self.values),
+                         [1, 3, 4, 5, 6, 7])
+
+    def test_streaming_and_reference_date(self):
+        """Тест потокової валідації та перевірки відносно дати відліку"""
+        today = datetime(2024, 6, 1).date()
+        values = ["2024-05-31", "2024-06-01", "2024-06-02", "bad"]
+
+        self.assertEqual(list(DateValidator.validate_dates(
+            values, require="future", today=today)), [0, 0, 1, 0])
+        self.assertEqual(list(DateValidator.iter_invalid_dates(
+            iter(values), require="past", today=today)),
+            [(1, "2024-06-01"), (2, "2024-06-02"), (3, "bad")])
+
+        masks = list(DateValidator.iter_validation_masks(
+            iter(self.values), chunk_size=3))
+        self.assertEqual([len(mask) for mask in masks], [3, 3, 2])
+        self.assertEqual(b"".join(masks),
+                         DateValidator.validate_dates(self.values))
+
+
+class TestDateFormatter(unittest.TestCase):
+    """Тести для форматування дат"""
+
+    def test_batch_matches_scalar(self):
+        """Тест збігу пакетного та поодинокого форматування"""
+        day_counts = list(range(-40, 800)) + [36500, 5.0]
+        self.assertEqual(DateFormatter.format_durations(day_counts),
+                         [DateFormatter.format_duration(d) for d in day_counts])
+        self.assertEqual(DateFormatter.format_duration(365 + 60 + 3),
+                         "1 рік 2 місяці 3 дні")
+
+        dates = ["2024-01-01", "2024-03-08", datetime(2024, 8, 24, 15, 30)]
+        self.assertEqual(DateFormatter.format_ukrainian_dates(dates),
+                         ["1 січня 2024 року", "8 березня 2024 року",
+                          "24 серпня 2024 року"])
+
+    def test_relative_dates_with_reference(self):
+        """Тест відносних дат з фіксованою датою відліку"""
+        reference = datetime(2024, 3, 8).date()
+        dates = ["2024-03-07", "2024-03-08", "2024-03-09", "2024-03-18",
+                 datetime(2024, 3, 1)]
+        expected = ["вчора", "сьогодні", "завтра", "через 10 днів", "7 днів тому"]
+
+        self.assertEqual(
+            DateFormatter.format_relative_dates(dates, reference), expected)
+        self.assertEqual(
+            [DateFormatter.format_relative_date(d, reference) for d in dates],
+            expected)
+
+
+class TestLogger(unittest.TestCase):
+    """Тести для буферизованого логера"""
+
+    def setUp(self):
+        """Підготовка до тестів"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.log_file = os.path.join(self.temp_dir.name, "test.log")
+
+    def tearDown(self):
+        """Очищення після тестів"""
+        self.temp_dir.cleanup()
+
+    def test_flush_and_level_filter(self):
+        """Тест запису повідомлень та фільтрації за рівнем"""
+        logger = Logger(self.log_file, level="WARNING", echo=False)
+        logger.info("не записується")
+        logger.warning("попередження")
+        logger.error("помилка")
+        self.assertTrue(logger.flush(timeout=5))
+
+        with open(self.log_file, encoding='utf-8') as f:
+            lines = f.read().splitlines()
+        logger.close()
+
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(lines[0].endswith("WARNING: попередження"))
+        self.assertTrue(lines[1].endswith("ERROR: помилка"))
+
+    def test_rotation_and_close(self):
+        """Тест ротації файлу за розміром та скидання при закритті"""
+        logger = Logger(self.log_file, max_bytes=200, backup_count=2,
+                        batch_size=1, echo=False)
+        for i in range(20):
+            logger.info(f"повідомлення {i}")
+        logger.close()
+
+        self.assertTrue(os.path.exists(self.log_file))
+        self.assertTrue(os.path.exists(self.log_file + ".1"))
+        self.assertTrue(os.path.exists(self.log_file + ".2"))
+        self.assertFalse(os.path.exists(self.log_file + ".3"))
+
+        with open(self.log_file, encoding='utf-8') as f:
+            self.assertIn("повідомлення 19", f.read())
+
+
+class TestConfigManager(unittest.TestCase):
+    """Тести для менеджера конфігурації"""
+
+    def setUp(self):
+        """Підготовка до тестів"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.config_file = os.path.join(self.temp_dir.name, "config.json")
+
+    def tearDown(self):
+        """Очищення після тестів"""
+        self.temp_dir.cleanup()
+
+    def write_config(self, data):
+        """Запис тестового файлу конфігурації"""
+        with open(self.config_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+
+    def test_defaults_from_config_module(self):
+        """Тест типових значень з config.py та перевизначень з файлу"""
+        self.write_config({"ui": {"font_size": 14}})
+        config = ConfigManager(self.config_file)
+
+        self.assertEqual(config.get("database.database"), "datetime_app")
+        self.assertEqual(config.get("ui.font_size"), 14)
+        self.assertEqual(config.get("history.max_records"), 10)
+        self.assertEqual(config.get("database")["host"], "localhost")
+        self.assertIsNone(config.get("ui.missing"))
+        self.assertEqual(config.get("ui.missing", 1), 1)
+
+    def test_reload_notifies_subscribers(self):
+        """Тест перезавантаження при зміні файлу та сповіщення підписників"""
+        self.write_config({"history": {"max_records": 10}})
+        config = ConfigManager(self.config_file)
+        changes = []
+        config.subscribe("history", lambda *change: changes.append(change))
+
+        self.assertFalse(config.check_for_updates())
+
+        self.write_config({"history": {"max_records": 1000}})
+        self.assertTrue(config.check_for_updates())
+        self.assertEqual(config.get("history.max_records"), 1000)
+        self.assertEqual(changes, [("history.max_records", 10, 1000)])
+
+        config.set("history.max_records", 50)
+        self.assertEqual(config.get("history.max_records"), 50)
+        self.assertEqual(changes[-1], ("history.max_records", 1000, 50))
+
+    def test_sections_and_cache_follow_config(self):
+        """Тест копій розділів та застосування розміру кешу з файлу"""
+        config = ConfigManager(self.config_file)
+        section = config.get("database")
+        section["host"] = "changed"
+        self.assertIsInstance(section, dict)
+        self.assertEqual(config.get("database.host"), "localhost")
+
+        cache = ResultCache(max_size=3)
+        cache.follow_config(config)
+        for number in range(3):
+            cache.put(number, number)
+
+        self.write_config({"result_cache": {"max_size": 1, "ttl": 5}})
+        self.assertTrue(config.check_for_updates())
+        self.assertEqual((cache.max_size, cache.ttl, len(cache)), (1, 5, 1))
+        self.assertEqual(cache.get(2), 2)
+
+    def test_module_sections_follow_config(self):
+        """Тест налаштувань модулів з config.json без зміни config.py"""
+        self.write_config({"fiscal": {"start_month": 4},
+                           "timezones": {"default_zone": "Europe/Warsaw",
+                                         "offices": {"Київ": "Europe/Warsaw"}},
+                           "business_hours": {"pre_holiday_minutes": 30}})
+        config = ConfigManager(self.config_file)
+
+        with mock.patch("utils._config_manager", config):
+            self.assertEqual(FiscalCalendar().start_month, 4)
+            self.assertEqual(BusinessSchedule().pre_holiday_seconds, 1800)
+            self.assertEqual(local_date("2024-03-31 21:30:00+00:00"), datetime(2024, 3, 31).date())
+            self.assertEqual(config.get("timezones.offices")["Київ"], "Europe/Warsaw")
+
+            self.write_config({"fiscal": {"start_month": 7}})
+            self.assertTrue(config.check_for_updates())
+            self.assertEqual(FiscalCalendar().start_month, 7)
+
+        self.assertEqual(ConfigManager.default_config()["timezones"]["offices"]["Київ"],
+                         "Europe/Kyiv")
+
+
+class TestColumnarHistory(unittest.TestCase):
+    """Тести для колонкового формату історії"""
+
+    def test_write_and_read(self):
+        """Тест запису та читання колонкового формату"""
+        rows = [
+            ("Вік", "1990-01-01", "34 років", datetime(2024, 3, 8, 12, 30, 15)),
+            ("Календар", "3/2024", "Березень 2024", "2024-03-09T08:00:00.250000"),
+            ("Вік", "", "", None)
+        ]
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            stats = write_columnar_history(rows, temp_dir, chunk_size=2)
+            self.assertEqual(stats["rows"], 3)
+
+            with ColumnarHistory(temp_dir) as history:
+                self.assertEqual(len(history), 3)
+                self.assertEqual(history.row(0), rows[0])
+                self.assertEqual(history.row(1)[3], datetime(2024, 3, 9, 8, 0, 0, 250000))
+                self.assertEqual(history.row(2), ("Вік", "", "", None))
+                self.assertEqual(history.count_by_type(), {"Вік": 2, "Календар": 1})
+                self.assertEqual(list(history.column("type_code")), [0, 1, 0])
+
+            aware = [("Вік", "", "", datetime(2024, 3, 8, tzinfo=pytz.utc))]
+            with self.assertRaises(ValueError):
+                write_columnar_history(aware, temp_dir)
+
+    def test_long_strings_and_size_versus_csv(self):
+        """Тест довгих рядків (багатобайтовий префікс) та розміру порівняно з CSV"""
+        rows = [("Різниця між датами", f"2024-01-01 - 2024-{month:02d}-15",
+                 f"{month * 30} днів", datetime(2024, 3, 8, 12, minute % 60, 5))
+                for month in range(1, 13) for minute in range(500)]
+        rows.append(("Календар", "x" * 300, "ф" * 200, None))
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            csv_file = os.path.join(temp_dir, "history.csv")
+            export_calculations_to_csv(rows, csv_file)
+            columnar_dir = os.path.join(temp_dir, "columnar")
+            stats = write_columnar_history(rows, columnar_dir)
+
+            # Дата з часом у CSV займає 19 байтів, у колонках - 12
+            self.assertLess(stats["bytes"], os.path.getsize(csv_file) * 0.75)
+            with ColumnarHistory(columnar_dir) as history:
+                self.assertEqual(list(history), rows)
+
+
+class TestPartitions(unittest.TestCase):
+    """Тести для допоміжних функцій секціонування"""
+
+    def test_month_arithmetic(self):
+        """Тест зсуву місяців"""
+        self.assertEqual(add_months(datetime(2024, 11, 15).date(), 3),
+                         datetime(2025, 2, 1).date())
+        self.assertEqual(add_months(datetime(2024, 1, 31).date(), -24),
+                         datetime(2022, 1, 1).date())
+
+    def test_reorganize_sql(self):
+        """Тест побудови SQL для додавання секцій"""
+        sql = build_reorganize_sql("calculations", datetime(2024, 12, 1).date(),
+                                   datetime(2025, 1, 1).date())
+        self.assertIn("REORGANIZE PARTITION pmax INTO", sql)
+        self.assertIn("PARTITION p202412 VALUES LESS THAN ('2025-01-01')", sql)
+        self.assertIn("PARTITION p202501 VALUES LESS THAN ('2025-02-01')", sql)
+        self.assertTrue(sql.rstrip().endswith("VALUES LESS THAN (MAXVALUE)\n)"))
+
+        self.assertIsNone(build_reorganize_sql(
+            "calculations", datetime(2025, 2, 1).date(), datetime(2025, 1, 1).date()))
+
+        self.assertEqual(parse_partition_bound("'2025-02-01'"),
+                         datetime(2025, 2, 1).date())
+        self.assertIsNone(parse_partition_bound("MAXVALUE"))
+
+    def test_table_sql_matches_setup_scripts(self):
+        """Тест однакової структури таблиці у програмі та SQL-скриптах"""
+        sql = calculations_table_sql(today=datetime(2026, 10, 19).date())
+        self.assertIn("PARTITION p_old VALUES LESS THAN ('2026-10-01')", sql)
+        self.assertIn("PARTITION p202701 VALUES LESS THAN ('2027-02-01')", sql)
+        self.assertIn("PARTITION BY RANGE COLUMNS (created_at)", sql)
+
+        directory = os.path.dirname(os.path.abspath(__file__))
+        for script, table in (("database_setup.sql", "calculations"),
+                              ("database_migration_partitioning.sql",
+                               "calculations_partitioned")):
+            with open(os.path.join(directory, script), encoding="utf-8") as f:
+                text = f.read()
+            body = text.split(f"CREATE TABLE IF NOT EXISTS {table} (", 1)[1]
+            body = body.split("\n)\nPARTITION BY RANGE COLUMNS (created_at)", 1)[0]
+            columns = [line.strip().rstrip(",") for line in body.splitlines()
+                       if line.strip() and not line.strip().startswith("--")]
+            self.assertEqual(columns, list(CALCULATIONS_COLUMNS), script)
+
+
+class TestBenchmarks(unittest.TestCase):
+    """Тести для інфраструктури вимірювання продуктивності"""
+
+    def test_measure(self):
+        """Тест вимірювання з фіксованою кількістю викликів"""
+        calls = []
+        result = measure(Benchmark("test", lambda: lambda: calls.append(1), number=10),
+                         repeat=3)
+        self.assertEqual(len(calls), 30)
+        self.assertLessEqual(result["seconds_per_op"], result["median_seconds_per_op"])
+
+    def test_compare_with_baseline(self):
+        """Тест виявлення регресій відносно базових результатів"""
+        baseline = {"results": {"fast": {"relative": 1.0, "seconds_per_op": 1.0},
+                                "slow": {"relative": 1.0, "seconds_per_op": 1.0}}}
+        results = {"results": {"fast": {"relative": 1.2, "seconds_per_op": 3.0},
+                               "slow": {"relative": 2.0, "seconds_per_op": 1.0},
+                               "new": {"relative": 5.0, "seconds_per_op": 5.0}}}
+
+        regressions = compare_with_baseline(results, baseline, threshold=0.5)
+        self.assertEqual([name for name, _ in regressions], ["slow"])
+
+        regressions = compare_with_baseline(results, baseline, threshold=0.5,
+                                            normalize=False)
+        self.assertEqual([name for name, _ in regressions], ["fast"])
+
+        # Шум субмікросекундних вимірювань та власний поріг дискових вимірювань
+        baseline["results"]["tiny"] = {"relative": 1.0, "seconds_per_op": 0.3e-6}
+        baseline["results"]["disk"] = {"relative": 1.0, "seconds_per_op": 1e-4}
+        noisy = {"results": {"tiny": {"relative": 1.6, "seconds_per_op": 0.5e-6},
+                             "disk": {"relative": 1.6, "seconds_per_op": 1.6e-4,
+                                      "threshold": 1.0}}}
+        self.assertEqual(compare_with_baseline(noisy, baseline, threshold=0.5), [])
+        noisy["results"]["disk"]["relative"] = 2.5
+        self.assertEqual([name for name, _ in compare_with_baseline(noisy, baseline)], ["disk"])
+        del baseline["results"]["tiny"], baseline["results"]["disk"]
+
+        # Нове вимірювання без базового результату не пропускається мовчки
+        self.assertEqual(missing_from_baseline(results, baseline), ["new"])
+        self.assertIsNone(results["results"]["new"]["baseline_ratio"])
+
+
+class TestMetrics(unittest.TestCase):
+    """Тести для метрик продуктивності"""
+
+    def setUp(self):
+        """Налаштування окремого реєстру метрик"""
+        self.registry = metrics.MetricsRegistry()
+        metrics.enable_metrics(self.registry)
+
+    def tearDown(self):
+        """Відновлення оригінальних методів"""
+        metrics.disable_metrics()
+
+    def test_calls_and_errors(self):
+        """Тест підрахунку викликів, помилок та мітки сховища"""
+        calculator = DateTimeCalculator()
+        calculator.get_day_of_week("2024-01-01")
+        with self.assertRaises(ValueError):
+            calculator.calculate_date_difference("дата", "2024-01-01")
+
+        db_manager = DatabaseManager(backend=MemoryBackend())
+        db_manager.register_user("metrics_user", "password")
+
+        calls = self.registry.calls()
+        self.assertEqual(calls[("calculator", "get_day_of_week", None)].count, 1)
+        self.assertEqual(calls[("calculator", "calculate_date_difference", None)].errors, 1)
+        self.assertEqual(calls[("database", "register_user", "memory")].count, 1)
+
+        text = self.registry.render_prometheus()
+        self.assertIn('datetime_app_calls_total{component="database",'
+                      'method="register_user",backend="memory"} 1', text)
+        self.assertIn('datetime_app_call_duration_seconds_bucket{component="calculator",'
+                      'method="get_day_of_week",le="+Inf"} 1', text)
+        self.assertIn('datetime_app_cache_hits_total{cache="format_duration"}', text)
+
+    def test_disable_restores_methods(self):
+        """Тест відсутності обгорток після вимкнення метрик"""
+        self.assertTrue(metrics.metrics_enabled())
+        metrics.disable_metrics()
+        self.assertFalse(metrics.metrics_enabled())
+        self.assertFalse(hasattr(DateTimeCalculator.get_day_of_week, "__metrics_original__"))
+
+        DateTimeCalculator().get_day_of_week("2024-01-01")
+        self.assertEqual(self.registry.calls(), {})
+
+
+class TestProfiling(unittest.TestCase):
+    """Тести для профілювання пакетних запусків"""
+
+    def setUp(self):
+        """Налаштування тимчасового каталогу"""
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Видалення тимчасових файлів"""
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_profiler_reports(self):
+        """Тест звітів профілювання та піку пам'яті за операціями"""
+        report_dir = os.path.join(self.temp_dir, "profile")
+
+        with Profiler(report_dir) as profiler:
+            with profiler.operation("batch.test"):
+                db_manager = DatabaseManager(backend=MemoryBackend())
+                db_manager.save_calculation(1, "Вік", "2000-01-01", "24 роки")
+                DateTimeCalculator().get_working_days("2024-01-01", "2024-12-31")
+
+        self.assertFalse(hasattr(DateTimeCalculator.get_working_days, "__wrapped__"))
+        for name in ("hot_functions.txt", "scoped_functions.txt", "allocations.txt",
+                     "operations.json", "profile.pstats"):
+            self.assertTrue(os.path.exists(os.path.join(report_dir, name)))
+
+        with open(os.path.join(report_dir, "operations.json"), encoding="utf-8") as f:
+            operations = json.load(f)
+        self.assertEqual(operations["calculator.get_working_days"]["calls"], 1)
+        self.assertEqual(operations["database.save_calculation"]["calls"], 1)
+        self.assertGreaterEqual(operations["batch.test"]["peak_bytes"],
+                                operations["calculator.get_working_days"]["peak_bytes"])
+
+        with open(os.path.join(report_dir, "scoped_functions.txt"), encoding="utf-8") as f:
+            scoped = f.read()
+        self.assertIn("DateTimeCalculator.get_working_days", scoped)
+        self.assertIn("MemoryBackend.save_calculation", scoped)
+
+    def test_batch_calc(self):
+        """Тест пакетного обчислення з файлу"""
+        input_file = os.path.join(self.temp_dir, "dates.txt")
+        output_file = os.path.join(self.temp_dir, "result.csv")
+        with open(input_file, "w", encoding="utf-8") as f:
+            f.write("2024-03-08\nне дата\n")
+
+        code = batch.main(["calc", "weekday", "--input", input_file, "--output", output_file])
+        self.assertEqual(code, 0)
+
+        with open(output_file, encoding="utf-8") as f:
+            rows = list(csv.reader(f))
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(json.loads(rows[1][1])["day_name"], "П'ятниця")
+        self.assertEqual(rows[1][2], "")
+        self.assertEqual(rows[2][1], "")
+        self.assertTrue(rows[2][2])
+
+    def test_profiler_keeps_external_tracing(self):
+        """Тест: профілювальник не зупиняє tracemalloc, запущений до нього"""
+        import tracemalloc
+
+        tracemalloc.start()
+        try:
+            with Profiler(os.path.join(self.temp_dir, "profile")):
+                DateTimeCalculator().get_day_of_week("2024-03-08")
+            self.assertTrue(tracemalloc.is_tracing())
+        finally:
+            tracemalloc.stop()
+
+    def test_operation_peak_without_reset_peak(self):
+        """Тест піку операцій без tracemalloc.reset_peak (Python 3.8)"""
+        import tracemalloc
+
+        profiler = Profiler(os.path.join(self.temp_dir, "profile"), classes={})
+        tracemalloc.start()
+        try:
+            with mock.patch("profiling._reset_peak", None):
+                with profiler.operation("outer"):
+                    with profiler.operation("inner"):
+                        data = bytearray(1 << 20)
+                    del data
+                with profiler.operation("small"):
+                    pass
+        finally:
+            tracemalloc.stop()
+
+        self.assertGreaterEqual(profiler.operations["inner"]["peak_bytes"], 1 << 20)
+        self.assertGreaterEqual(profiler.operations["outer"]["peak_bytes"], 1 << 20)
+        self.assertLess(profiler.operations["small"]["peak_bytes"], 1 << 20)
+
+
+class TestTimezones(unittest.TestCase):
+    """Тести для роботи з часовими поясами"""
+
+    def setUp(self):
+        """Налаштування калькулятора"""
+        self.calculator = DateTimeCalculator()
+
+    def test_index_matches_pytz(self):
+        """Тест збігу індексу переходів з pytz поблизу переходів на літній час"""
+        for zone_name in ("Europe/Kyiv", "Europe/Warsaw", "America/New_York"):
+            zone = pytz.timezone(zone_name)
+            index = get_transition_index(zone_name)
+            for moment in zone._utc_transition_times[-40:]:
+                for shift in range(-7200, 7201, 1800):
+                    value = moment + timedelta(seconds=shift)
+                    for is_dst in (False, True):
+                        self.assertIs(index.localize(value, is_dst).tzinfo,
+                                      zone.localize(value, is_dst=is_dst).tzinfo)
+                    self.assertEqual(index.from_utc(value),
+                                     pytz.utc.localize(value).astimezone(zone))
+
+    def test_convert_timestamps(self):
+        """Тест пакетного переведення між поясами офісів"""
+        result = convert_timestamps(["2024-03-08 09:00", "2024-07-01 09:00"],
+                                    "America/New_York", "Europe/Kyiv")
+        self.assertEqual([value.strftime("%H:%M %Z") for value in result],
+                         ["02:00 EST", "02:00 EDT"])
+
+        warsaw = convert_timestamps([result[0]], "Europe/Warsaw")[0]
+        self.assertEqual(warsaw.strftime("%Y-%m-%d %H:%M"), "2024-03-08 08:00")
+
+        # Мітки зі зміщенням розбираються через strptime (Python 3.8+)
+        for text in ("2024-03-01 23:30 -05:00", "2024-03-01T23:30:00-0500"):
+            self.assertEqual(parse_timestamp(text),
+                             datetime.strptime("2024-03-01 23:30 -0500", "%Y-%m-%d %H:%M %z"))
+
+    def test_zoned_operations(self):
+        """Тест різниці, додавання та робочих днів з урахуванням поясів"""
+        # Перехід на літній час 31.03.2024: доба триває 23 години
+        difference = self.calculator.calculate_datetime_difference(
+            "2024-03-30 12:00", "2024-03-31 12:00", "Europe/Kyiv")
+        self.assertEqual(difference["total_hours"], 23)
+
+        self.assertEqual(self.calculator.add_to_datetime(
+            "2024-03-30 12:00", "Europe/Kyiv", days=1)["new_datetime"], "2024-03-31 12:00:00")
+        self.assertEqual(self.calculator.add_to_datetime(
+            "2024-03-30 12:00", "Europe/Kyiv", hours=24)["new_datetime"], "2024-03-31 13:00:00")
+
+        # 23:30 у Нью-Йорку - вже наступна доба в Києві
+        result = self.calculator.get_working_days_in_zone(
+            "2024-03-01 23:30 -05:00", "2024-03-04 09:00 -05:00", "Europe/Kyiv")
+        self.assertEqual(result["total_days"], 3)
+
+        with self.assertRaises(ValueError):
+            self.calculator.calculate_datetime_difference("2024-01-01", "2024-01-02", "Марс/Олімп")
+
+
+class TestBusinessHours(unittest.TestCase):
+    """Тести для обчислення робочих годин за графіком"""
+
+    def setUp(self):
+        """Графік 09:00-18:00 з обідом 13:00-14:00"""
+        self.schedule = BusinessSchedule(
+            week=["09:00-18:00"] * 5 + [None, None], breaks=["13:00-14:00"],
+            pre_holiday_minutes=60)
+
+    def test_single_day(self):
+        """Тест робочого часу в межах дня з перервою"""
+        self.assertEqual(self.schedule.working_hours("2024-01-15 08:00", "2024-01-15 19:00"), 8)
+        self.assertEqual(self.schedule.working_hours("2024-01-15 12:30", "2024-01-15 14:30"), 1)
+        self.assertEqual(self.schedule.working_hours("2024-01-15 14:30", "2024-01-15 12:30"), -1)
+
+    def test_holidays_and_weekends(self):
+        """Тест свят, передсвяткових днів та вихідних"""
+        # 07.03.2024 - передсвятковий (скорочений), 08.03 - свято, 09-10.03 - вихідні
+        self.assertEqual(self.schedule.day_kind("2024-03-08")[0], "holiday")
+        self.assertEqual(self.schedule.working_hours("2024-03-07", "2024-03-11"), 7)
+        self.assertEqual(self.schedule.working_days("2024-03-04", "2024-03-10"), 4)
+
+        # Рік: 262 будні дні 2024 мінус 7 свят у будні
+        self.assertEqual(self.schedule.working_days("2024-01-01", "2024-12-31"), 255)
+
+    def test_matches_day_by_day_sum(self):
+        """Тест збігу з підсумовуванням за окремими днями"""
+        start = datetime(2023, 12, 20, 10, 15)
+        end = datetime(2024, 2, 3, 16, 40)
+        total = self.schedule.working_seconds(start, datetime(2023, 12, 21))
+        day = datetime(2023, 12, 21)
+        while day + timedelta(days=1) <= end:
+            total += self.schedule.working_seconds(day, day + timedelta(days=1))
+            day += timedelta(days=1)
+        total += self.schedule.working_seconds(day, end)
+
+        self.assertEqual(self.schedule.working_seconds(start, end), total)
+
+    def test_sla_report(self):
+        """Тест пакетного звіту SLA"""
+        starts = [datetime(2024, 1, 15, 9), datetime(2024, 1, 19, 17)]
+        ends = [datetime(2024, 1, 15, 12), datetime(2024, 1, 22, 12)]
+        self.assertEqual(list(self.schedule.working_seconds_batch(starts, ends)),
+                         [3 * 3600, 4 * 3600])
+
+        report = self.schedule.sla_report(starts, ends, limit_hours=3)
+        self.assertEqual(report["tickets"], 2)
+        self.assertEqual(report["breached"], 1)
+        self.assertEqual(report["max_hours"], 4)
+
+    def test_add_working_days_matches_day_by_day(self):
+        """Тест додавання робочих днів порівняно з перебором днів"""
+        def day_by_day(start, days):
+            step = 1 if days >= 0 else -1
+            day = start
+            for _ in range(abs(days)):
+                day += timedelta(days=step)
+                while self.schedule.day_kind(day)[0] not in ("workday", "pre_holiday"):
+                    day += timedelta(days=step)
+            return day
+
+        start = datetime(2023, 12, 20).date()
+        for offset in range(0, 120, 7):
+            for days in (-260, -23, -1, 0, 1, 5, 23, 260):
+                day = start + timedelta(days=offset)
+                self.assertEqual(self.schedule.add_working_days(day, days),
+                                 day_by_day(day, days), (day, days))
+        self.assertEqual(self.schedule.add_working_days("2024-04-26", 3),
+                         datetime(2024, 5, 2).date())
+
+
+class TestRecurrence(unittest.TestCase):
+    """Тести для правил повторення подій"""
+
+    def test_parse_rrule(self):
+        """Тест розбору рядка RRULE"""
+        params = parse_rrule("RRULE:FREQ=WEEKLY;INTERVAL=2;BYDAY=MO,-1FR;COUNT=5")
+        self.assertEqual(params["freq"], "WEEKLY")
+        self.assertEqual(params["interval"], 2)
+        self.assertEqual(params["count"], 5)
+        self.assertEqual(params["byweekday"][1].n, -1)
+
+        with self.assertRaises(ValueError):
+            parse_rrule("INTERVAL=2")
+
+    def test_lazy_occurrences(self):
+        """Тест лінивої генерації подій нескінченного правила"""
+        rule = RecurrenceRule.from_string("FREQ=MONTHLY;BYDAY=-1FR", "2024-01-01")
+        events = [event.strftime("%Y-%m-%d") for event in islice(rule, 3)]
+        self.assertEqual(events, ["2024-01-26", "2024-02-23", "2024-03-29"])
+
+    def test_arithmetic_matches_iteration(self):
+        """Тест збігу арифметичних count/nth з перебором подій"""
+        for text in ("FREQ=DAILY;INTERVAL=3", "FREQ=WEEKLY;INTERVAL=2;BYDAY=MO,TH",
+                     "FREQ=DAILY;BYDAY=MO,TU,WE,TH,FR;UNTIL=20241231"):
+            for exclude in (False, True):
+                rule = RecurrenceRule.from_string(text, datetime(2024, 1, 3, 10),
+                                                  exclude_holidays=exclude)
+                start, end = datetime(2024, 2, 1), datetime(2025, 3, 1)
+                events = list(rule.occurrences(start, end))
+                self.assertEqual(rule.count_between(start, end), len(events))
+
+                all_events = list(islice(rule.occurrences(), 60))
+                self.assertEqual(rule.nth(60), all_events[59])
+
+    def test_holiday_exclusion(self):
+        """Тест виключення свят"""
+        rule = RecurrenceRule.from_string("FREQ=DAILY", "2024-03-07", exclude_holidays=True)
+        self.assertEqual(rule.nth(2), datetime(2024, 3, 9))
+        # 300 днів з 07.03 по 31.12.2024, з них 8 свят
+        self.assertEqual(rule.count_between("2024-01-01", "2024-12-31"), 300 - 8)
+
+
+class TestDateRangeIndex(unittest.TestCase):
+    """Тести для індексу періодів дат"""
+
+    def setUp(self):
+        """Налаштування періодів"""
+        self.index = DateRangeIndex([
+            ("2024-03-01", "2024-03-10", "відпустка"),
+            ("2024-03-05", "2024-03-15", "лікарняний"),
+            ("2024-04-01", "2024-04-30", "договір"),
+            ("2024-05-01", "2024-05-03", "відрядження"),
+        ])
+
+    def test_overlapping(self):
+        """Тест пошуку перетинів порівняно з повним перебором"""
+        names = [payload for _, _, payload in self.index.overlapping("2024-03-12", "2024-04-01")]
+        self.assertEqual(names, ["лікарняний", "договір"])
+        self.assertEqual(self.index.overlapping("2024-03-20"), [])
+
+        periods = [(738000 + i * 7 % 500, 738000 + i * 7 % 500 + i % 40, i) for i in range(400)]
+        index = DateRangeIndex(periods)
+        for first in range(737990, 738560, 13):
+            expected = sorted(p[2] for p in periods if p[0] <= first + 5 and p[1] >= first)
+            found = sorted(p[2] for p in index.overlapping(first, first + 5))
+            self.assertEqual(found, expected)
+
+    def test_union_and_gaps(self):
+        """Тест об'єднання, покритих робочих днів та вільних проміжків"""
+        # 01.03-15.03 (11 робочих днів) та 01.04-03.05 як суміжні періоди
+        self.assertEqual(len(self.index.merged()), 2)
+        self.assertEqual(self.index.covered_working_days("2024-03-01", "2024-03-31"), 11)
+        self.assertEqual(self.index.covered_days(), 15 + 33)
+
+        gaps = self.index.gaps("2024-02-25", "2024-04-05")
+        self.assertEqual([(str(a), str(b)) for a, b in gaps],
+                         [("2024-02-25", "2024-02-29"), ("2024-03-16", "2024-03-31")])
+
+    def test_count_working_days(self):
+        """Тест формули робочих днів"""
+        first = datetime(2024, 1, 1).toordinal()
+        self.assertEqual(count_working_days(first, first + 6), 5)
+        self.assertEqual(count_working_days(first + 5, first + 6), 0)
+        self.assertEqual(count_working_days(first + 3, first), 0)
+
+
+class TestCompactDates(unittest.TestCase):
+    """Тести для компактних дат та стовпців дат"""
+
+    def test_day(self):
+        """Тест порівнянь, арифметики та перетворень Day"""
+        day = Day.from_iso("2024-02-28")
+        self.assertEqual((day + 1).isoformat(), "2024-02-29")
+        self.assertEqual(Day.from_iso("2024-03-01") - day, 2)
+        self.assertTrue(day < day + 1)
+        self.assertEqual(len({day, Day.from_iso("2024-02-28")}), 1)
+        self.assertEqual(day.weekday(), day.to_date().weekday())
+        self.assertEqual((day.year, day.month, day.day), (2024, 2, 28))
+        with self.assertRaises(ValueError):
+            Day.from_iso("2023-02-29")
+
+    def test_column(self):
+        """Тест перетворень стовпця та роботи калькуляторів зі стовпцем"""
+        values = ["2024-01-01", "2024-01-06", "2024-08-24", "2024-01-01"]
+        column = DayColumn.from_iso(values)
+        self.assertEqual(column.ordinals.typecode, "i")
+        self.assertEqual(column.to_iso(), values)
+        self.assertEqual(DayColumn.from_dates(column.to_dates()), column)
+        self.assertEqual(DayColumn.from_bytes(column.tobytes()), column)
+        self.assertEqual(list(column.weekdays()), [0, 5, 5, 0])
+
+        mask = HolidayCalculator().holiday_mask(column)
+        self.assertEqual(list(mask), [1, 0, 1, 1])
+
+        calculator = DateTimeCalculator()
+        ends = DayColumn.from_iso(["2024-01-07"] * 4)
+        self.assertEqual(list(calculator.get_working_days_batch(column, ends)), [5, 0, 0, 5])
+        self.assertEqual(calculator.get_day_of_week(column[1])["day_name"], "Субота")
+        self.assertEqual(calculator.calculate_date_difference(column[0], "2024-01-31")["total_days"], 30)
+
+
+class TestResultCache(unittest.TestCase):
+    """Тести для спільного кешу результатів"""
+
+    def test_cached_calculator(self):
+        """Тест спільних ключів для рівнозначних аргументів та get_age"""
+        calculator = CachedCalculator(cache=ResultCache(max_size=100))
+        first = calculator.get_working_days("2024-01-01", "2024-01-31")
+        first["working_days"] = 0
+        second = calculator.get_working_days(datetime(2024, 1, 1), Day.from_iso("2024-01-31"))
+        self.assertEqual(second["working_days"], 23)
+        self.assertEqual(calculator.cache.stats()["hits"], 1)
+
+        # Вік без зафіксованої дати не кешується
+        calculator.get_age("2000-01-01")
+        self.assertEqual(len(calculator.cache), 1)
+        age = calculator.get_age("2000-03-01", reference_date="2024-02-29")
+        self.assertEqual((age["age_years"], age["days_to_birthday"]), (23, 1))
+        self.assertEqual(len(calculator.cache), 2)
+
+        # Позиційна дата відліку - той самий ключ, що й іменована
+        calculator.get_age("2000-03-01", "2024-02-29")
+        self.assertEqual(calculator.cache.stats()["hits"], 2)
+        calculator.get_age("2000-03-01", None)
+        self.assertEqual(len(calculator.cache), 2)
+
+    def test_key_normalisation(self):
+        """Тест ключів для рядків, що калькулятор не приймає, локалі та is_leap_year"""
+        calculator = CachedCalculator(cache=ResultCache(max_size=100))
+        self.assertEqual(calculator.get_day_of_week("2024-01-01")["day_name"], "Понеділок")
+        with self.assertRaises(ValueError):
+            calculator.get_day_of_week(" 2024-01-01")
+        self.assertEqual(calculator.cache.stats()["hits"], 0)
+
+        calculator.is_leap_year(2024)
+        self.assertEqual(len(calculator.cache), 1)
+
+        calculator.get_calendar_month(2024, 2)
+        with mock.patch("result_cache._time_locale", return_value="uk_UA.UTF-8"):
+            calculator.get_calendar_month(2024, 2)
+        self.assertEqual(len(calculator.cache), 3)
+
+    def test_eviction_and_persistence(self):
+        """Тест витіснення LRU, TTL та збереження у файл"""
+        cache = ResultCache(max_size=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), 1)
+
+        expiring = ResultCache(ttl=0.01)
+        expiring.put("a", 1)
+        time.sleep(0.02)
+        self.assertIsNone(expiring.get("a"))
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            filename = os.path.join(temp_dir, "cache.json")
+            self.assertTrue(cache.save(filename))
+            restored = ResultCache(filename=filename)
+            self.assertEqual((restored.get("a"), restored.get("c")), (1, 3))
+
+
+class TestPeriods(unittest.TestCase):
+    """Тести для пакетного визначення тижнів, кварталів та фіскальних періодів"""
+
+    def test_iso_weeks_and_quarters(self):
+        """Тест порівняно з isocalendar для дат навколо меж років"""
+        dates = [datetime(2019, 12, 20) + timedelta(days=i * 5) for i in range(400)]
+        dates.reverse()
+        calculator = DateTimeCalculator()
+
+        weeks = calculator.get_iso_weeks(dates)
+        expected = [tuple(value.isocalendar()[:2]) for value in dates]
+        self.assertEqual(list(zip(weeks["years"], weeks["weeks"])), expected)
+
+        quarters = calculator.get_quarters(DayColumn.from_dates(dates))
+        self.assertEqual(list(quarters["quarters"]),
+                         [(value.month - 1) // 3 + 1 for value in dates])
+
+    def test_last_supported_years(self):
+        """Тест дат 9998-9999: таблиця закінчується на 9999 році без помилок datetime"""
+        calculator = PeriodCalculator()
+        dates = [datetime(9998, 1, 1) + timedelta(days=i * 7) for i in range(100)]
+        years, weeks = calculator.iso_weeks(dates)
+        self.assertEqual(list(zip(years, weeks)),
+                         [tuple(value.isocalendar()[:2]) for value in dates])
+        self.assertEqual(list(calculator.quarters(["9999-06-30"])[1]), [2])
+
+        for lookup in (calculator.iso_weeks, calculator.quarters, calculator.fiscal_periods):
+            with self.assertRaisesRegex(ValueError, "поза підтримуваним діапазоном"):
+                lookup(["9999-12-31"])
+
+    def test_fiscal_periods(self):
+        """Тест помісячного фіскального року з липня та календаря 4-4-5"""
+        monthly = PeriodCalculator(FiscalCalendar(start_month=7))
+        years, periods = monthly.fiscal_periods(["2024-06-30", "2024-07-01", "2025-01-15"])
+        self.assertEqual(list(zip(years, periods)), [(2024, 12), (2025, 1), (2025, 7)])
+
+        weekly = FiscalCalendar(start_month=7, week_pattern=(4, 4, 5), end_weekday=5)
+        # Рік закінчується в останню суботу червня; 2024 рік має 53 тижні
+        self.assertEqual((weekly.year_end(2024) - weekly.year_end(2023)) // 7, 53)
+        years, periods = PeriodCalculator(weekly).fiscal_periods(
+            ["2024-06-29", "2024-06-30", "2024-07-28", "2024-09-28"])
+        self.assertEqual(list(zip(years, periods)),
+                         [(2024, 12), (2025, 1), (2025, 2), (2025, 3)])
+
+
+class TestCalendarSnapshot(unittest.TestCase):
+    """Тести для знімка календарних таблиць"""
+
+    def setUp(self):
+        """Тимчасовий файл знімка"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "snapshot.bin")
+
+    def tearDown(self):
+        """Видалення тимчасових файлів"""
+        self.temp_dir.cleanup()
+
+    def test_tables(self):
+        """Тест таблиць знімка порівняно з HolidayCalculator та calendar"""
+        holidays = HolidayCalculator(use_snapshot=False)
+        with open_snapshot(self.path, 2020, 2030) as snapshot:
+            self.assertEqual(snapshot.holidays_in_year(2024), holidays.get_holidays_in_year(2024))
+            self.assertEqual(snapshot.is_holiday("2024-05-05"), (True, "Великдень"))
+            self.assertEqual(snapshot.easter_date(2025), holidays.calculate_easter(2025))
+            self.assertEqual(snapshot.month_calendar(2024, 2), calendar.monthcalendar(2024, 2))
+
+            start = datetime(2024, 1, 1)
+            expected = sum(1 for i in range(366)
+                           if (start + timedelta(days=i)).weekday() < 5
+                           and not holidays.is_holiday(start + timedelta(days=i))[0])
+            self.assertEqual(snapshot.working_days("2024-01-01", "2024-12-31"), expected)
+
+    def test_rebuild_on_rules_change(self):
+        """Тест автоматичної перебудови при зміні правил свят та діапазону"""
+        open_snapshot(self.path, 2020, 2030).close()
+
+        holidays = HolidayCalculator()
+        holidays.fixed_holidays[(2, 2)] = "Тестове свято"
+        with open_snapshot(self.path, 2020, 2030, holidays) as snapshot:
+            self.assertEqual(snapshot.rules_version, holidays.rules_version())
+            self.assertEqual(snapshot.is_holiday("2024-02-02"), (True, "Тестове свято"))
+
+        with open_snapshot(self.path, 2020, 2040, holidays) as snapshot:
+            self.assertEqual(snapshot.last_year, 2040)
+
+    def test_rules_version_follows_computed_holidays(self):
+        """Тест зміни версії правил при зміні алгоритму Великодня"""
+        holidays = HolidayCalculator(use_snapshot=False)
+        version = holidays.rules_version()
+        easter = holidays.calculate_easter
+        with mock.patch.object(holidays, "calculate_easter",
+                               side_effect=lambda year: easter(year) + timedelta(days=1)):
+            self.assertNotEqual(holidays.rules_version(), version)
+        self.assertEqual(holidays.rules_version(), version)
+
+    def test_calculators_read_snapshot(self):
+        """Тест читання знімка HolidayCalculator, BusinessSchedule та DateTimeCalculator"""
+        snapshot = open_snapshot(self.path, 2020, 2030)
+        self.addCleanup(snapshot.close)
+        computed = HolidayCalculator(use_snapshot=False)
+
+        with mock.patch("calendar_snapshot.get_snapshot", return_value=snapshot) as get_snapshot:
+            holidays = HolidayCalculator()
+            self.assertIs(holidays.snapshot(), snapshot)
+            self.assertEqual(holidays.holidays_between("2023-12-01", "2025-01-31"),
+                             computed.holidays_between("2023-12-01", "2025-01-31"))
+            self.assertEqual(holidays.working_days("2024-01-01", "2024-12-31"),
+                             computed.working_days("2024-01-01", "2024-12-31"))
+            self.assertEqual(holidays.is_holiday("2024-05-05"), (True, "Великдень"))
+            # Дати поза знімком обчислюються за правилами
+            self.assertEqual(holidays.working_days("2035-01-01", "2035-12-31"),
+                             computed.working_days("2035-01-01", "2035-12-31"))
+
+            schedule = BusinessSchedule(holiday_calculator=holidays)
+            self.assertEqual(schedule.day_kind("2024-08-24"), ("holiday", "День незалежності України"))
+
+            calculator = DateTimeCalculator()
+            calculator.holiday_calculator = holidays
+            result = calculator.get_working_days("2024-01-01", "2024-01-31")
+            self.assertNotIn("business_days", result)
+            result = calculator.get_working_days("2024-01-01", "2024-01-31",
+                                                 exclude_holidays=True)
+            self.assertEqual((result["working_days"], result["business_days"]), (23, 22))
+            batch = calculator.get_working_days_batch(["2024-01-01"], ["2024-01-31"],
+                                                      exclude_holidays=True)
+            self.assertEqual(list(batch), [22])
+
+            # Змінені правила не читаються зі знімка, побудованого за іншими
+            holidays.fixed_holidays[(2, 2)] = "Тестове свято"
+            self.assertIsNone(holidays.snapshot())
+            self.assertEqual(holidays.is_holiday("2024-02-02"), (True, "Тестове свято"))
+            self.assertEqual(get_snapshot.call_count, 2)
+
+
+    def test_shared_snapshot_is_built_explicitly(self):
+        """Тест: калькулятори лише читають знімок, будують його пакетні команди"""
+        self.assertIsNone(load_snapshot(self.path, 2020, 2030))
+        self.assertFalse(os.path.exists(self.path))
+
+        with mock.patch("calendar_snapshot._snapshot", None), \
+                mock.patch("calendar_snapshot.default_snapshot_path", return_value=self.path):
+            holidays = HolidayCalculator()
+            self.assertIsNone(holidays.snapshot())
+            self.assertEqual(holidays.is_holiday("2024-05-05"), (True, "Великдень"))
+            self.assertFalse(os.path.exists(self.path))
+
+            ranges = os.path.join(self.temp_dir.name, "ranges.txt")
+            with open(ranges, "w", encoding="utf-8") as file:
+                file.write("2024-01-01,2024-01-31\n")
+            output = os.path.join(self.temp_dir.name, "result.csv")
+            with mock.patch("sys.stdout"):
+                self.assertEqual(batch.main(["calc", "working-days", "--input", ranges,
+                                             "--output", output]), 0)
+            self.assertTrue(os.path.exists(self.path))
+            if hasattr(os, "fchmod"):
+                umask = os.umask(0)
+                os.umask(umask)
+                self.assertEqual(os.stat(self.path).st_mode & 0o777, 0o666 & ~umask)
+
+            import calendar_snapshot
+            snapshot = calendar_snapshot._snapshot
+            self.addCleanup(snapshot.close)
+            self.assertIs(HolidayCalculator().snapshot(), snapshot)
+
+
+class TestBirthdays(unittest.TestCase):
+    """Тести для індексу днів народження"""
+
+    def setUp(self):
+        """Особи з днями народження навколо кінця року та 29 лютого"""
+        self.people = [(1, "1990-12-30"), (2, "1985-01-02"), (3, "2000-02-29"),
+                       (4, "1975-03-01"), (5, "1999-06-15")]
+        self.calculator = DateTimeCalculator()
+
+    def test_upcoming_with_year_wrap(self):
+        """Тест пошуку з переходом через кінець року та оновленнями"""
+        index = BirthdayIndex(self.people)
+        found = self.calculator.get_upcoming_birthdays(index, 5, "2024-12-29")
+        self.assertEqual([(e["person_id"], e["days_to_birthday"]) for e in found],
+                         [(1, 1), (2, 4)])
+        self.assertEqual(found[1]["turning_age"], 40)
+
+        index.add(6, "2001-12-31")
+        index.remove(2)
+        found = index.upcoming(5, "2024-12-29")
+        self.assertEqual([e["person_id"] for e in found], [1, 6])
+
+    def test_feb29(self):
+        """Тест 29 лютого у невисокосному році та в get_age"""
+        found = BirthdayIndex(self.people).upcoming(1, "2023-02-28")
+        self.assertEqual([(e["person_id"], e["birthday"]) for e in found],
+                         [(3, "2023-02-28"), (4, "2023-03-01")])
+        found = BirthdayIndex(self.people, feb29_rule="mar1").upcoming(0, "2023-03-01")
+        self.assertEqual([e["person_id"] for e in found], [3, 4])
+
+        age = self.calculator.get_age("2000-02-29", reference_date="2023-02-27")
+        self.assertEqual((age["age_years"], age["days_to_birthday"]), (22, 1))
+        age = self.calculator.get_age("2000-02-29", reference_date="2024-02-29")
+        self.assertEqual((age["age_years"], age["days_to_birthday"]), (24, 0))
+
+    def test_bulk_load_is_atomic(self):
+        """Тест відхилення пакета з повторами без зміни індексу"""
+        index = BirthdayIndex([("a", "1990-01-01")])
+        for batch in ([("b", "1991-02-02"), ("a", "1992-03-03")],
+                      [("b", "1991-02-02"), ("b", "1992-03-03")],
+                      [("b", "1991-02-02"), ("c", "не дата")]):
+            with self.assertRaises(ValueError):
+                index.bulk_load(batch)
+            self.assertEqual((len(index), index.person_ids), (1, ["a"]))
+
+        index.bulk_load([("b", "1991-02-02")])
+        index.remove("b")
+        self.assertEqual(index.person_ids, ["a"])
+
+
+class TestScheduler(unittest.TestCase):
+    """Тести для планувальника нагадувань"""
+
+    def setUp(self):
+        """Планувальник з керованим годинником та сховищем у пам'яті"""
+        self.now = datetime(2023, 2, 20, 10, 0)
+        self.store = MemoryBackend()
+        self.batches = []
+        self.scheduler = ReminderScheduler(self.store, self.batches.append, batch_size=2,
+                                           clock=lambda: self.now)
+
+    def test_batches_cancel_and_persistence(self):
+        """Тест порядку спрацювання, пакетів, скасування та відновлення зі сховища"""
+        later = self.scheduler.schedule("2023-02-22", "later")
+        self.scheduler.schedule_many([("2023-02-20", "first"), ("2023-02-19", "earliest"),
+                                      (datetime(2023, 2, 20, 9, 0), "daily", None, None, "daily")])
+        cancelled = self.scheduler.schedule(datetime(2023, 2, 20, 9, 30), "cancelled")
+        self.assertTrue(self.scheduler.cancel(cancelled.id))
+
+        self.assertEqual(self.scheduler.run_pending(), 3)
+        self.assertEqual([[r.kind for r in batch] for batch in self.batches],
+                         [["earliest", "first"], ["daily"]])
+
+        restored = ReminderScheduler(self.store, clock=lambda: self.now)
+        self.assertEqual(len(restored), 2)
+        self.assertEqual(restored.next_due(), datetime(2023, 2, 21, 9, 0))
+        self.assertIn(later.id, [record["id"] for record in self.store.load_reminders()])
+
+    def test_yearly_birthdays_and_deadline(self):
+        """Тест щорічних нагадувань для 29 лютого та терміну в робочих днях"""
+        self.scheduler.schedule_birthdays([(1, "2000-02-29")], days_before=1)
+        deadline = self.scheduler.schedule_deadline("2024-04-26", 3)
+        self.assertEqual(deadline.due, datetime(2024, 5, 2, 9, 0))
+
+        expected = [datetime(2023, 2, 27, 9, 0), datetime(2024, 2, 28, 9, 0),
+                    datetime(2024, 5, 2, 9, 0), datetime(2025, 2, 27, 9, 0)]
+        for due in expected:
+            self.assertEqual(self.scheduler.next_due(), due)
+            self.now = due
+            self.scheduler.run_pending()
+        self.assertEqual([batch[0].kind for batch in self.batches],
+                         ["birthday", "birthday", "deadline", "birthday"])
+
+    def test_cancel_during_processing(self):
+        """Тест скасування нагадувань, що обробляються або чекають повтору"""
+        daily = self.scheduler.schedule(datetime(2023, 2, 20, 9, 0), "daily", repeat="daily")
+        failing = self.scheduler.schedule(datetime(2023, 2, 20, 9, 30), "failing")
+
+        def callback(batch):
+            self.batches.append(batch)
+            self.assertTrue(self.scheduler.cancel(daily.id))
+            self.assertFalse(self.scheduler.cancel(daily.id))
+            raise RuntimeError("збій")
+
+        self.scheduler.callback = callback
+        self.assertEqual(self.scheduler.run_pending(), 0)
+        self.assertEqual(len(self.scheduler), 1)
+        self.assertEqual([record["id"] for record in self.store.load_reminders()], [failing.id])
+
+        self.scheduler.callback = lambda batch: self.scheduler.cancel(failing.id)
+        self.now += timedelta(minutes=5)
+        self.assertEqual(self.scheduler.run_pending(), 1)
+        self.assertEqual((len(self.scheduler), self.store.load_reminders()), (0, []))
+
+    def test_birthdays_are_not_duplicated(self):
+        """Тест повторного планування днів народження без дублікатів"""
+        first = self.scheduler.schedule_birthdays([(1, "1990-03-01"), (2, "1985-06-15")])
+        again = self.scheduler.schedule_birthdays([(1, "1990-03-01"), (2, "1985-06-15")])
+        self.assertEqual([r.id for r in again], [r.id for r in first])
+        self.assertEqual(len(self.scheduler), 2)
+
+        moved = self.scheduler.schedule_birthdays([(1, "1990-03-01")], days_before=2)
+        self.assertEqual(len(self.scheduler), 2)
+        self.assertEqual(moved[0].due, datetime(2023, 2, 27, 9, 0))
+        self.assertEqual(sorted(record["due"] for record in self.store.load_reminders()),
+                         ["2023-02-27 09:00:00", "2023-06-15 09:00:00"])
+
+    def test_holidays_are_not_duplicated(self):
+        """Тест повторного планування свят року без дублікатів"""
+        holidays = HolidayCalculator(use_snapshot=False)
+        first = self.scheduler.schedule_holidays(2024, holidays)
+        count = len(self.store.load_reminders())
+        self.assertEqual(count, len(holidays.get_holidays_in_year(2024)))
+
+        again = self.scheduler.schedule_holidays(2024, holidays)
+        self.assertEqual(sorted(r.id for r in again), sorted(r.id for r in first))
+        restored = ReminderScheduler(self.store, clock=lambda: self.now)
+        self.assertEqual(len(restored.schedule_holidays(2024, holidays)), count)
+        self.assertEqual(len(self.store.load_reminders()), count)
+
+        moved = self.scheduler.schedule_holidays(2024, holidays, days_before=2)
+        self.assertEqual((len(self.scheduler), len(self.store.load_reminders())),
+                         (count, count))
+        self.assertIn(datetime(2024, 8, 22, 9, 0), [r.due for r in moved])
+        self.scheduler.schedule_holidays(2025, holidays)
+        self.assertEqual(len(self.scheduler), 2 * count)
+
+
+def _sharded_writer(directory, worker, count):
+    """Процес, що одночасно з іншими реєструє користувачів та дописує історію"""
+    backend = ShardedFileBackend(directory, shards=4)
+    for number in range(count):
+        backend.register_user(f"user{worker}_{number}", "password")
+        backend.save_calculation(1, "Тест", f"{worker}-{number}", "ok")
+
+
+class TestShardedFileBackend(unittest.TestCase):
+    """Тести для файлового сховища з сегментами"""
+
+    def setUp(self):
+        """Тимчасовий каталог сховища"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.backend = ShardedFileBackend(self.temp_dir.name, shards=4)
+
+    def tearDown(self):
+        """Видалення тимчасових файлів"""
+        self.temp_dir.cleanup()
+
+    def test_users_and_history(self):
+        """Тест реєстрації, входу та історії"""
+        self.assertTrue(self.backend.register_user("alice", "secret"))
+        self.assertFalse(self.backend.register_user("alice", "other"))
+        self.assertTrue(self.backend.register_user("bob", "secret"))
+        alice = self.backend.login_user("alice", "secret")
+        self.assertIsNone(self.backend.login_user("alice", "wrong"))
+        self.assertNotEqual(alice["id"], self.backend.login_user("bob", "secret")["id"])
+
+        rows = [("Тип", f"вхід {i}", "результат", f"2024-01-{i + 1:02d} 10:00:00")
+                for i in range(12)]
+        self.backend.save_calculations_batch(alice["id"], rows)
+        self.assertEqual(self.backend.count_user_calculations(alice["id"]), 12)
+        self.assertEqual(len(self.backend.get_user_calculations(alice["id"])), 10)
+        page = self.backend.get_calculations_page(alice["id"], 0, 3)
+        self.assertEqual([row[0] for row in page], [12, 11, 10])
+
+    @unittest.skipUnless(hasattr(os, "fchmod"), "права файлів POSIX")
+    def test_shard_file_mode(self):
+        """Тест прав файлу сегмента: umask для нового файлу, збережені при заміні"""
+        self.assertTrue(self.backend.register_user("alice", "secret"))
+        path = os.path.join(self.temp_dir.name,
+                            f"users_{self.backend._shard('alice'):02d}.json")
+        umask = os.umask(0)
+        os.umask(umask)
+        self.assertEqual(os.stat(path).st_mode & 0o777, 0o666 & ~umask)
+
+        os.chmod(path, 0o640)
+        # Другий користувач того ж сегмента - заміна того ж файлу
+        other = next(name for name in (f"user{i}" for i in range(100))
+                     if self.backend._shard(name) == self.backend._shard("alice"))
+        self.assertTrue(self.backend.register_user(other, "secret"))
+        self.assertEqual(os.stat(path).st_mode & 0o777, 0o640)
+
+    def test_concurrent_processes(self):
+        """Тест одночасного запису з кількох процесів"""
+        context = multiprocessing.get_context("fork" if os.name == "posix" else "spawn")
+        workers = [context.Process(target=_sharded_writer,
+                                   args=(self.temp_dir.name, worker, 25))
+                   for worker in range(4)]
+        for process in workers:
+            process.start()
+        for process in workers:
+            process.join()
+
+        ids = [self.backend.login_user(f"user{worker}_{number}", "password")["id"]
+               for worker in range(4) for number in range(25)]
+        self.assertEqual(len(set(ids)), 100)
+        records = self.backend.get_calculations_page(1, 0, 1000, descending=False)
+        self.assertEqual(sorted(row[0] for row in records), list(range(1, 101)))
 
 
 def run_tests():
@@ -252,6 +1631,27 @@ def run_tests():
     test_suite.addTests(loader.loadTestsFromTestCase(TestDateTimeCalculator))
     test_suite.addTests(loader.loadTestsFromTestCase(TestDatabaseManager))
     test_suite.addTests(loader.loadTestsFromTestCase(TestIntegration))
+    test_suite.addTests(loader.loadTestsFromTestCase(TestMemoryBackend))
+    test_suite.addTests(loader.loadTestsFromTestCase(TestDateValidator))
+    test_suite.addTests(loader.loadTestsFromTestCase(TestDateFormatter))
+    test_suite.addTests(loader.loadTestsFromTestCase(TestLogger))
+    test_suite.addTests(loader.loadTestsFromTestCase(TestConfigManager))
+    test_suite.addTests(loader.loadTestsFromTestCase(TestColumnarHistory))
+    test_suite.addTests(loader.loadTestsFromTestCase(TestPartitions))
+    test_suite.addTests(loader.loadTestsFromTestCase(TestBenchmarks))
+    test_suite.addTests(loader.loadTestsFromTestCase(TestMetrics))
+    test_suite.addTests(loader.loadTestsFromTestCase(TestProfiling))
+    test_suite.addTests(loader.loadTestsFromTestCase(TestTimezones))
+    test_suite.addTests(loader.loadTestsFromTestCase(TestBusinessHours))
+    test_suite.addTests(loader.loadTestsFromTestCase(TestRecurrence))
+    test_suite.addTests(loader.loadTestsFromTestCase(TestDateRangeIndex))
+    test_suite.addTests(loader.loadTestsFromTestCase(TestCompactDates))
+    test_suite.addTests(loader.loadTestsFromTestCase(TestResultCache))
+    test_suite.addTests(loader.loadTestsFromTestCase(TestPeriods))
+    test_suite.addTests(loader.loadTestsFromTestCase(TestCalendarSnapshot))
+    test_suite.addTests(loader.loadTestsFromTestCase(TestShardedFileBackend))
+    test_suite.addTests(loader.loadTestsFromTestCase(TestBirthdays))
+    test_suite.addTests(loader.loadTestsFromTestCase(TestScheduler))
 
     # Запуск тестів
     runner = unittest.TextTestRunner(verbosity=2)
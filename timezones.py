@@ -0,0 +1,242 @@
+"""
+Робота з часовими поясами (IANA) на основі таблиць переходів pytz
+
+Для кожного поясу один раз будується індекс переходів: моменти зміни
+зміщення від UTC (секунди від епохи) та відповідні зміщення. Переведення
+часу між поясами - це двійковий пошук (bisect) у цьому індексі замість
+виклику localize/astimezone pytz для кожного значення, тому пакетне
+переведення великої кількості міток часу працює значно швидше.
+"""
+
+from bisect import bisect_right
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+import pytz
+
+from utils import get_config_manager
+
+EPOCH_ORDINAL = datetime(1970, 1, 1).toordinal()
+SECONDS_PER_DAY = 86400
+
+# Формати міток часу; зі зміщенням (%z приймає "-05:00" з Python 3.7) розбираються
+# через strptime, бо datetime.fromisoformat до Python 3.11 не приймає пробіл
+# перед зміщенням
+TIMESTAMP_FORMATS = ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%dT%H:%M:%S",
+                     "%Y-%m-%dT%H:%M", "%Y-%m-%d",
+                     "%Y-%m-%d %H:%M:%S %z", "%Y-%m-%d %H:%M %z",
+                     "%Y-%m-%d %H:%M:%S%z", "%Y-%m-%dT%H:%M:%S%z", "%Y-%m-%dT%H:%M%z")
+
+
+def _to_seconds(value):
+    """Секунди від епохи для наївного datetime (без мікросекунд)"""
+    return ((value.toordinal() - EPOCH_ORDINAL) * SECONDS_PER_DAY
+            + value.hour * 3600 + value.minute * 60 + value.second)
+
+
+class TransitionIndex:
+    """Індекс переходів зміщення UTC для одного часового поясу"""
+
+    def __init__(self, zone_name):
+        try:
+            self.zone = pytz.timezone(zone_name)
+        except pytz.UnknownTimeZoneError:
+            raise ValueError(f"Невідомий часовий пояс: {zone_name}")
+
+        self.name = zone_name
+        transition_times = getattr(self.zone, "_utc_transition_times", None)
+
+        if transition_times:
+            # Перший перехід pytz - datetime.min, він замінюється на мінус нескінченність
+            self.utc_starts = [_to_seconds(moment) for moment in transition_times[1:]]
+            self.utc_starts.insert(0, float("-inf"))
+            infos = self.zone._transition_info
+            self.tzinfos = [self.zone._tzinfos[info] for info in infos]
+        else:
+            # Пояс без переходів (UTC, фіксоване зміщення)
+            reference = datetime(2000, 1, 1)
+            self.utc_starts = [float("-inf")]
+            infos = [(self.zone.utcoffset(reference), self.zone.dst(reference), None)]
+            self.tzinfos = [self.zone]
+
+        self.offsets = [int(offset.total_seconds()) for offset, _, _ in infos]
+        self.deltas = [timedelta(seconds=offset) for offset in self.offsets]
+        self.is_dst = [bool(dst) for _, dst, _ in infos]
+
+    def index_for_utc(self, utc_seconds):
+        """Номер періоду для моменту UTC"""
+        return bisect_right(self.utc_starts, utc_seconds) - 1
+
+    def index_for_local(self, local_seconds, is_dst=False):
+        """Номер періоду для місцевого часу (та сама логіка, що й у pytz localize)
+
+        Кандидати - періоди, чинні за добу до та після місцевого часу.
+        Для неоднозначного часу (перехід назад) вибирається період з
+        відповідним is_dst, для неіснуючого (перехід вперед) - період,
+        чинний за 6 годин до (is_dst=False) або після (is_dst=True).
+        """
+        candidates = []
+        for shift in (-SECONDS_PER_DAY, SECONDS_PER_DAY):
+            candidate = max(bisect_right(self.utc_starts, local_seconds + shift) - 1, 0)
+            if candidate in candidates:
+                continue
+            utc_seconds = local_seconds - self.offsets[candidate]
+            if self.index_for_utc(utc_seconds) == candidate:
+                candidates.append(candidate)
+
+        if len(candidates) == 1:
+            return candidates[0]
+
+        if not candidates:
+            if is_dst:
+                return self.index_for_local(local_seconds + 6 * 3600, True)
+            return self.index_for_local(local_seconds - 6 * 3600, False)
+
+        filtered = [c for c in candidates if self.is_dst[c] == is_dst] or candidates
+        if len(filtered) == 1:
+            return filtered[0]
+
+        # Однаковий is_dst: як у pytz, найпізніший за UTC період для is_dst=False
+        choose = min if is_dst else max
+        return choose(filtered, key=lambda c: local_seconds - self.offsets[c])
+
+    def from_utc(self, utc_value):
+        """Переведення наївного UTC datetime у місцевий час поясу (aware)"""
+        index = self.index_for_utc(_to_seconds(utc_value))
+        return (utc_value + self.deltas[index]).replace(tzinfo=self.tzinfos[index])
+
+    def localize(self, local_value, is_dst=False):
+        """Прив'язка наївного місцевого datetime до поясу (аналог pytz localize)"""
+        index = self.index_for_local(_to_seconds(local_value), is_dst)
+        return local_value.replace(tzinfo=self.tzinfos[index])
+
+    def to_utc(self, local_value, is_dst=False):
+        """Переведення наївного місцевого datetime у наївний UTC"""
+        index = self.index_for_local(_to_seconds(local_value), is_dst)
+        return local_value - self.deltas[index]
+
+
+def _default_zone():
+    """Пояс за замовчуванням з конфігурації ('timezones.default_zone')"""
+    return get_config_manager().get('timezones.default_zone')
+
+
+@lru_cache(maxsize=None)
+def get_transition_index(zone_name):
+    """Кешований індекс переходів для поясу"""
+    return TransitionIndex(zone_name)
+
+
+def parse_timestamp(value, zone_name=None, is_dst=False):
+    """Мітка часу (рядок або datetime) як aware datetime
+
+    Рядок без зміщення (або наївний datetime) вважається місцевим часом
+    поясу zone_name (за замовчуванням - 'timezones.default_zone' з конфігурації).
+    """
+    if isinstance(value, str):
+        text = value.strip()
+        parsed = None
+        for pattern in TIMESTAMP_FORMATS:
+            try:
+                parsed = datetime.strptime(text, pattern)
+                break
+            except ValueError:
+                continue
+        if parsed is None:
+            try:
+                parsed = datetime.fromisoformat(text)
+            except ValueError:
+                raise ValueError(f"Невірний формат мітки часу: {value}")
+        value = parsed
+
+    if value.tzinfo is not None:
+        return value
+
+    index = get_transition_index(zone_name or _default_zone())
+    return index.localize(value, is_dst)
+
+
+def _utc_naive(value):
+    """Наївний UTC datetime для aware datetime"""
+    return (value - value.utcoffset()).replace(tzinfo=None)
+
+
+def convert_timestamps(values, to_zone, from_zone=None, is_dst=False):
+    """Пакетне переведення міток часу у пояс to_zone
+
+    values - рядки або datetime; наївні значення вважаються місцевим часом
+    from_zone. Повертає список aware datetime у поясі to_zone.
+    """
+    target = get_transition_index(to_zone)
+    source = get_transition_index(from_zone or _default_zone())
+    target_starts = target.utc_starts
+    target_deltas = target.deltas
+    target_tzinfos = target.tzinfos
+    result = []
+
+    for value in values:
+        if isinstance(value, str):
+            value = parse_timestamp(value, source.name, is_dst)
+
+        if value.tzinfo is None:
+            utc_value = source.to_utc(value, is_dst)
+        else:
+            utc_value = _utc_naive(value)
+
+        index = bisect_right(target_starts, _to_seconds(utc_value)) - 1
+        result.append((utc_value + target_deltas[index]).replace(tzinfo=target_tzinfos[index]))
+
+    return result
+
+
+def convert_between_offices(value, from_office, to_office):
+    """Переведення місцевого часу одного офісу в час іншого (назви з 'timezones.offices')"""
+    offices = get_config_manager().get('timezones.offices')
+    return convert_timestamps([value], offices[to_office], offices[from_office])[0]
+
+
+def zoned_difference(start, end, start_zone=None, end_zone=None):
+    """Різниця між мітками часу у (можливо різних) поясах
+
+    Рахується фактично прожитий час, тобто з урахуванням переходів на
+    літній/зимовий час.
+    """
+    start = parse_timestamp(start, start_zone)
+    end = parse_timestamp(end, end_zone or start_zone)
+
+    seconds = int((_utc_naive(end) - _utc_naive(start)).total_seconds())
+    total = abs(seconds)
+
+    return {
+        "total_seconds": seconds,
+        "days": total // SECONDS_PER_DAY,
+        "hours": total % SECONDS_PER_DAY // 3600,
+        "minutes": total % 3600 // 60,
+        "seconds": total % 60,
+        "total_hours": round(seconds / 3600, 2),
+        "start_utc": _utc_naive(start).strftime("%Y-%m-%d %H:%M:%S"),
+        "end_utc": _utc_naive(end).strftime("%Y-%m-%d %H:%M:%S")
+    }
+
+
+def zoned_add(value, zone_name=None, days=0, hours=0, minutes=0, seconds=0):
+    """Додавання інтервалу до мітки часу в поясі
+
+    Дні додаються за місцевим календарем (той самий час доби), а години,
+    хвилини та секунди - як фактично прожитий час.
+    """
+    zone_name = zone_name or _default_zone()
+    index = get_transition_index(zone_name)
+    start = parse_timestamp(value, zone_name)
+
+    local = index.from_utc(_utc_naive(start)).replace(tzinfo=None)
+    local = index.localize(local + timedelta(days=days))
+    utc_value = _utc_naive(local) + timedelta(hours=hours, minutes=minutes, seconds=seconds)
+    return index.from_utc(utc_value)
+
+
+def local_date(value, zone_name=None):
+    """Місцева дата мітки часу в поясі"""
+    zone_name = zone_name or _default_zone()
+    value = parse_timestamp(value, zone_name)
+    return get_transition_index(zone_name).from_utc(_utc_naive(value)).date()
@@ -3,21 +3,69 @@
 """
 
 import re
+import copy
 from datetime import datetime, timedelta
 import calendar
 import locale
 import os
 import json
+import hashlib
+import atexit
+import queue
+import threading
+import time
+from types import MappingProxyType
+from functools import lru_cache
+from itertools import islice
+
+from config import (DATABASE_CONFIG, UI_CONFIG, COLORS, LOCALE_CONFIG, HISTORY_CONFIG,
+                    RESULT_CACHE_CONFIG, FILE_STORAGE_CONFIG, PARTITION_CONFIG, METRICS_CONFIG,
+                    TIMEZONE_CONFIG, FISCAL_CONFIG, CALENDAR_SNAPSHOT_CONFIG,
+                    BUSINESS_HOURS_CONFIG)
+from compact_dates import DayColumn, as_datetime, to_day_ordinal
+from intervals import count_working_days
+
+
+# Формат дати YYYY-MM-DD
+DATE_PATTERN = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+
+# Кількість днів у місяці звичайного року (індекс - номер місяця)
+DAYS_IN_MONTH = (0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+
+def parse_date_fast(date_string):
+    """Швидкий розбір рядка YYYY-MM-DD без strptime
+
+    Повертає (рік, місяць, день) або None, якщо рядок не є валідною датою.
+    Результат збігається з DateValidator.is_valid_date.
+    """
+    if not isinstance(date_string, str) or len(date_string) != 10 \
+            or not date_string.isascii() or not DATE_PATTERN.match(date_string):
+        return None
+
+    year = int(date_string[:4])
+    month = int(date_string[5:7])
+    day = int(date_string[8:])
+
+    if year < 1 or not 1 <= month <= 12 or day < 1:
+        return None
+    if day > DAYS_IN_MONTH[month] and not (
+            month == 2 and day == 29 and calendar.isleap(year)):
+        return None
+
+    return year, month, day
 
 
 class DateValidator:
     """Клас для валідації дат"""
 
+    # Розмір кешу результатів перевірки для повторюваних рядків
+    BULK_CACHE_SIZE = 100000
+
     @staticmethod
     def is_valid_date_format(date_string):
         """Перевірка формату дати YYYY-MM-DD"""
-        pattern = r'^\d{4}-\d{2}-\d{2}$'
-        return bool(re.match(pattern, date_string))
+        return bool(DATE_PATTERN.match(date_string))
 
     @staticmethod
     def is_valid_date(date_string):
@@ -49,49 +97,159 @@ class DateValidator:
         except ValueError:
             return False
 
+    @staticmethod
+    def _make_bulk_checker(require=None, today=None):
+        """Створення функції перевірки для пакетної валідації
+
+        require: None - лише валідність, 'future' або 'past' - додатково
+        положення відносно today (один знімок поточної дати на весь пакет).
+        """
+        if require not in (None, "future", "past"):
+            raise ValueError(f"Невідома умова перевірки: {require}")
+
+        today_ordinal = (today or datetime.now().date()).toordinal()
+        cache = {}
+        cache_size = DateValidator.BULK_CACHE_SIZE
+
+        def check(value):
+            result = cache.get(value)
+            if result is not None:
+                return result
+
+            parts = parse_date_fast(value)
+            if parts is None:
+                result = False
+            elif require is None:
+                result = True
+            else:
+                ordinal = datetime(*parts).toordinal()
+                if require == "future":
+                    result = ordinal > today_ordinal
+                else:
+                    result = ordinal < today_ordinal
+
+            if isinstance(value, str):
+                if len(cache) >= cache_size:
+                    cache.clear()
+                cache[value] = result
+            return result
+
+        return check
+
+    @staticmethod
+    def validate_dates(values, require=None, today=None):
+        """Пакетна валідація дат
+
+        Повертає bytearray-маску тієї ж довжини, що й values
+        (1 - валідна дата, 0 - невалідна).
+        """
+        check = DateValidator._make_bulk_checker(require, today)
+        return bytearray(map(check, values))
+
+    @staticmethod
+    def find_invalid_dates(values, require=None, today=None):
+        """Пакетна валідація дат: список індексів невалідних значень"""
+        check = DateValidator._make_bulk_checker(require, today)
+        return [index for index, valid in enumerate(map(check, values))
+                if not valid]
+
+    @staticmethod
+    def iter_invalid_dates(values, require=None, today=None):
+        """Потокова валідація: генератор пар (індекс, значення) невалідних дат
+
+        Підходить для джерел, що не вміщуються в пам'ять (наприклад,
+        колонка CSV файлу, що читається построково).
+        """
+        check = DateValidator._make_bulk_checker(require, today)
+        for index, value in enumerate(values):
+            if not check(value):
+                yield index, value
+
+    @staticmethod
+    def iter_validation_masks(values, chunk_size=65536, require=None, today=None):
+        """Потокова валідація: генератор bytearray-масок по chunk_size значень"""
+        check = DateValidator._make_bulk_checker(require, today)
+        iterator = iter(values)
+
+        while True:
+            mask = bytearray(map(check, islice(iterator, chunk_size)))
+            if not mask:
+                return
+            yield mask
+
+
+# Назви місяців у родовому відмінку (індекс - номер місяця)
+MONTHS_UK_GENITIVE = (
+    "", "січня", "лютого", "березня", "квітня", "травня", "червня",
+    "липня", "серпня", "вересня", "жовтня", "листопада", "грудня"
+)
+
+# Форми множини: (1, 2-4, 5+)
+YEAR_FORMS = ("рік", "роки", "років")
+MONTH_FORMS = ("місяць", "місяці", "місяців")
+DAY_FORMS = ("день", "дні", "днів")
+
+
+def _plural_part(number, forms):
+    """Число з відповідною формою слова (1 рік, 3 роки, 7 років)"""
+    if number == 1:
+        return f"1 {forms[0]}"
+    elif number < 5:
+        return f"{number} {forms[1]}"
+    return f"{number} {forms[2]}"
+
+
+# Готові частини тривалості для можливих значень місяців та днів
+_MONTH_PARTS = tuple(_plural_part(n, MONTH_FORMS) for n in range(13))
+_DAY_PARTS = tuple(_plural_part(n, DAY_FORMS) for n in range(30))
+_YEAR_PARTS = tuple(_plural_part(n, YEAR_FORMS) for n in range(200))
+
+
+def _table_part(number, forms, table):
+    """Частина тривалості з готової таблиці або обчислена для рідкісних значень"""
+    if type(number) is int and 0 <= number < len(table):
+        return table[number]
+    return _plural_part(number, forms)
+
+
+def _relative_phrase(diff):
+    """Текст відносної дати для різниці в днях"""
+    if diff == 0:
+        return "сьогодні"
+    elif diff == 1:
+        return "завтра"
+    elif diff == -1:
+        return "вчора"
+    elif diff > 1:
+        return f"через {diff} днів"
+    else:
+        return f"{abs(diff)} днів тому"
+
 
 class DateFormatter:
     """Клас для форматування дат"""
 
+    # Максимальний розмір кешу форматованих тривалостей
+    DURATION_CACHE_SIZE = 65536
+
     @staticmethod
     def format_ukrainian_date(date_obj):
         """Форматування дати в українському стилі"""
-        months_uk = {
-            1: "січня", 2: "лютого", 3: "березня", 4: "квітня",
-            5: "травня", 6: "червня", 7: "липня", 8: "серпня",
-            9: "вересня", 10: "жовтня", 11: "листопада", 12: "грудня"
-        }
-
         if isinstance(date_obj, str):
             date_obj = datetime.strptime(date_obj, "%Y-%m-%d")
 
-        day = date_obj.day
-        month = months_uk[date_obj.month]
-        year = date_obj.year
-
-        return f"{day} {month} {year} року"
+        return f"{date_obj.day} {MONTHS_UK_GENITIVE[date_obj.month]} {date_obj.year} року"
 
     @staticmethod
-    def format_relative_date(date_obj):
+    def format_relative_date(date_obj, reference_date=None):
         """Форматування відносної дати (вчора, сьогодні, завтра)"""
         if isinstance(date_obj, str):
             date_obj = datetime.strptime(date_obj, "%Y-%m-%d")
 
-        today = datetime.now().date()
+        today = reference_date or datetime.now().date()
         target_date = date_obj.date()
 
-        diff = (target_date - today).days
-
-        if diff == 0:
-            return "сьогодні"
-        elif diff == 1:
-            return "завтра"
-        elif diff == -1:
-            return "вчора"
-        elif diff > 1:
-            return f"через {diff} днів"
-        else:
-            return f"{abs(diff)} днів тому"
+        return _relative_phrase((target_date - today).days)
 
     @staticmethod
     def format_duration(days):
@@ -107,59 +265,130 @@ class DateFormatter:
         parts = []
 
         if years > 0:
-            if years == 1:
-                parts.append("1 рік")
-            elif years < 5:
-                parts.append(f"{years} роки")
-            else:
-                parts.append(f"{years} років")
+            parts.append(_table_part(years, YEAR_FORMS, _YEAR_PARTS))
 
         if months > 0:
-            if months == 1:
-                parts.append("1 місяць")
-            elif months < 5:
-                parts.append(f"{months} місяці")
-            else:
-                parts.append(f"{months} місяців")
+            parts.append(_table_part(months, MONTH_FORMS, _MONTH_PARTS))
 
         if days_left > 0:
-            if days_left == 1:
-                parts.append("1 день")
-            elif days_left < 5:
-                parts.append(f"{days_left} дні")
-            else:
-                parts.append(f"{days_left} днів")
+            parts.append(_table_part(days_left, DAY_FORMS, _DAY_PARTS))
 
         return " ".join(parts)
 
+    @staticmethod
+    def format_ukrainian_dates(dates):
+        """Пакетне форматування дат в українському стилі
+
+        Рядки розбираються один раз для кожного унікального значення.
+        """
+        cache = {}
+        result = []
+        append = result.append
+
+        for date_obj in dates:
+            if isinstance(date_obj, str):
+                text = cache.get(date_obj)
+                if text is None:
+                    text = cache[date_obj] = DateFormatter.format_ukrainian_date(
+                        date_obj)
+                append(text)
+            else:
+                append(
+                    f"{date_obj.day} {MONTHS_UK_GENITIVE[date_obj.month]} {date_obj.year} року")
 
-class ConfigManager:
-    """Менеджер конфігурації програми"""
+        return result
 
-    def __init__(self, config_file="config.json"):
+    @staticmethod
+    def format_relative_dates(dates, reference_date=None):
+        """Пакетне форматування відносних дат з одним знімком поточної дати"""
+        today = (reference_date or datetime.now().date()).toordinal()
+        ordinals = {}
+        phrases = {}
+        result = []
+        append = result.append
+
+        for date_obj in dates:
+            if isinstance(date_obj, str):
+                ordinal = ordinals.get(date_obj)
+                if ordinal is None:
+                    ordinal = ordinals[date_obj] = datetime.strptime(
+                        date_obj, "%Y-%m-%d").toordinal()
+            else:
+                ordinal = date_obj.toordinal()
+
+            diff = ordinal - today
+            phrase = phrases.get(diff)
+            if phrase is None:
+                phrase = phrases[diff] = _relative_phrase(diff)
+            append(phrase)
+
+        return result
+
+    @staticmethod
+    def format_durations(day_counts):
+        """Пакетне форматування тривалостей з кешем повторюваних значень"""
+        format_cached = _format_duration_cached
+        return [format_cached(days) for days in day_counts]
+
+
+# Кеш тривалостей; typed=True, щоб 5 та 5.0 форматувались окремо, як у format_duration
+_format_duration_cached = lru_cache(maxsize=DateFormatter.DURATION_CACHE_SIZE,
+                                    typed=True)(DateFormatter.format_duration)
+
+
+class ConfigManager:
+    """Менеджер конфігурації програми
+
+    Типові значення беруться з config.py, поверх них накладається
+    config.json. Результат компілюється в незмінну пласку таблицю
+    'розділ.ключ' -> значення, тому get() - це один пошук у словнику.
+    Програма використовує спільний екземпляр get_config_manager(): модулі
+    читають з нього свої розділи при кожному використанні (тож
+    перезавантаження config.json діє без перезапуску), а спільний кеш
+    результатів підписаний на розділ 'result_cache'.
+    """
+
+    def __init__(self, config_file="config.json", watch_interval=None):
         self.config_file = config_file
+        self._lock = threading.RLock()
+        self._subscribers = []
+        self._file_signature = None
+        self._watcher = None
+        self._stop_watching = threading.Event()
+
         self.config = self.load_config()
+        self._flat, self._leaves = self._compile(self.config)
+
+        if watch_interval:
+            self.start_watching(watch_interval)
+
+    @staticmethod
+    def default_config():
+        """Типова конфігурація на основі config.py
+
+        Розділи копіюються повністю, щоб config.json не змінював вкладені
+        значення config.py.
+        """
+        return copy.deepcopy({
+            "database": DATABASE_CONFIG,
+            "ui": {"theme": "default", **UI_CONFIG},
+            "colors": COLORS,
+            "locale": LOCALE_CONFIG,
+            "history": HISTORY_CONFIG,
+            "result_cache": RESULT_CACHE_CONFIG,
+            "file_storage": FILE_STORAGE_CONFIG,
+            "partitions": PARTITION_CONFIG,
+            "metrics": METRICS_CONFIG,
+            "timezones": TIMEZONE_CONFIG,
+            "fiscal": FISCAL_CONFIG,
+            "calendar_snapshot": CALENDAR_SNAPSHOT_CONFIG,
+            "business_hours": BUSINESS_HOURS_CONFIG
+        })
 
     def load_config(self):
         """Завантаження конфігурації з файлу"""
-        default_config = {
-            "database": {
-                "host": "localhost",
-                "database": "datetime_app",
-                "user": "root",
-                "password": ""
-            },
-            "ui": {
-                "theme": "default",
-                "font_size": 10,
-                "window_width": 800,
-                "window_height": 600
-            },
-            "locale": {
-                "language": "uk_UA",
-                "date_format": "%Y-%m-%d"
-            }
-        }
+        default_config = self.default_config()
+        self._file_signature = self._get_file_signature()
 
         if os.path.exists(self.config_file):
             try:
@@ -178,6 +407,7 @@ class ConfigManager:
         try:
             with open(self.config_file, 'w', encoding='utf-8') as f:
                 json.dump(self.config, f, ensure_ascii=False, indent=2)
+            self._file_signature = self._get_file_signature()
         except Exception as e:
             print(f"Помилка збереження конфігурації: {e}")
 
@@ -190,69 +420,349 @@ class ConfigManager:
                 else:
                     default[key] = value
 
-    def get(self, path, default=None):
-        """Отримання значення конфігурації за шляхом (наприклад, 'database.host')"""
-        keys = path.split('.')
-        current = self.config
+    @staticmethod
+    def _compile(config):
+        """Перетворення вкладеної конфігурації в пласку таблицю пошуку
+
+        Повертає (таблиця для get, таблиця лише кінцевих значень).
+        Розділи доступні як незмінні словники.
+        """
+        flat = {}
+        leaves = {}
+
+        def walk(node, prefix):
+            frozen = {}
+            for key, value in node.items():
+                path = f"{prefix}.{key}" if prefix else key
+                if isinstance(value, dict):
+                    value = walk(value, path)
+                else:
+                    leaves[path] = value
+                flat[path] = value
+                frozen[key] = value
+            return MappingProxyType(frozen)
 
-        for key in keys:
-            if isinstance(current, dict) and key in current:
-                current = current[key]
-            else:
-                return default
+        walk(config, "")
+        return MappingProxyType(flat), leaves
 
-        return current
+    def get(self, path, default=None):
+        """Отримання значення конфігурації за шляхом (наприклад, 'database.host')
+
+        Розділи повертаються як копії dict, які можна змінювати.
+        """
+        value = self._flat.get(path, default)
+        if isinstance(value, (MappingProxyType, list)):
+            return self._thaw(value)
+        return value
+
+    @classmethod
+    def _thaw(cls, value):
+        """Змінна копія розділу або списку"""
+        if isinstance(value, MappingProxyType):
+            return {key: cls._thaw(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [cls._thaw(item) for item in value]
+        return value
 
     def set(self, path, value):
         """Встановлення значення конфігурації за шляхом"""
         keys = path.split('.')
-        current = self.config
 
-        for key in keys[:-1]:
-            if key not in current:
-                current[key] = {}
-            current = current[key]
+        with self._lock:
+            current = self.config
+            for key in keys[:-1]:
+                if key not in current:
+                    current[key] = {}
+                current = current[key]
+
+            current[keys[-1]] = value
+            self._apply(self.config)
+
+    def subscribe(self, path, callback):
+        """Підписка на зміни значень за шляхом або розділом
+
+        callback(шлях, старе значення, нове значення) викликається для
+        кожного зміненого значення, шлях якого дорівнює path або
+        починається з 'path.'.
+        """
+        with self._lock:
+            self._subscribers.append((path, callback))
+        return callback
+
+    def unsubscribe(self, callback):
+        """Скасування підписки"""
+        with self._lock:
+            self._subscribers = [(path, cb) for path, cb in self._subscribers
+                                 if cb is not callback]
+
+    def reload(self):
+        """Повторне завантаження конфігурації з файлу"""
+        with self._lock:
+            self._apply(self.load_config())
+
+    def _apply(self, config):
+        """Компіляція нової конфігурації та сповіщення підписників"""
+        old_leaves = self._leaves
+        self.config = config
+        self._flat, self._leaves = self._compile(config)
+
+        changes = [(path, old_leaves.get(path), value)
+                   for path, value in self._leaves.items()
+                   if path not in old_leaves or old_leaves[path] != value]
+        changes.extend((path, value, None) for path, value in old_leaves.items()
+                       if path not in self._leaves)
+
+        for changed_path, old_value, new_value in changes:
+            for path, callback in list(self._subscribers):
+                if changed_path == path or changed_path.startswith(path + "."):
+                    try:
+                        callback(changed_path, old_value, new_value)
+                    except Exception as e:
+                        print(f"Помилка обробки зміни конфігурації: {e}")
+
+    def _get_file_signature(self):
+        """Час зміни та розмір файлу конфігурації"""
+        try:
+            stat = os.stat(self.config_file)
+            return stat.st_mtime_ns, stat.st_size
+        except OSError:
+            return None
+
+    def check_for_updates(self):
+        """Перезавантаження конфігурації, якщо файл змінився"""
+        if self._get_file_signature() == self._file_signature:
+            return False
+
+        self.reload()
+        return True
+
+    def start_watching(self, interval=1.0):
+        """Запуск фонового відстеження змін файлу конфігурації"""
+        if self._watcher is not None and self._watcher.is_alive():
+            return
+
+        self._stop_watching.clear()
 
-        current[keys[-1]] = value
+        def watch():
+            while not self._stop_watching.wait(interval):
+                self.check_for_updates()
+
+        self._watcher = threading.Thread(target=watch, name="ConfigWatcher",
+                                         daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self):
+        """Зупинка відстеження змін файлу конфігурації"""
+        self._stop_watching.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+
+
+_config_manager = None
+_config_manager_lock = threading.Lock()
+
+
+def get_config_manager():
+    """Спільний менеджер конфігурації програми (config.py + config.json)"""
+    global _config_manager
+
+    with _config_manager_lock:
+        if _config_manager is None:
+            _config_manager = ConfigManager()
+        return _config_manager
 
 
 class Logger:
-    """Простий логер для програми"""
+    """Буферизований логер програми з фоновим записом у файл
 
-    def __init__(self, log_file="datetime_app.log"):
-        self.log_file = log_file
+    Повідомлення кладуться в чергу і записуються окремим потоком пакетами
+    через постійно відкритий файл. Файл ротується за розміром та/або
+    за часом, а при завершенні програми черга гарантовано скидається.
+    """
 
-    def log(self, level, message):
+    LEVELS = {"DEBUG": 10, "INFO": 20, "WARNING": 30, "ERROR": 40}
+
+    def __init__(self, log_file="datetime_app.log", level="INFO",
+                 max_bytes=5 * 1024 * 1024, backup_count=3,
+                 rotate_interval=None, batch_size=256, echo=True):
+        self.log_file = log_file
+        self.min_level = self.LEVELS.get(level, 0)
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.rotate_interval = rotate_interval
+        self.batch_size = batch_size
+        self.echo = echo
+
+        self._queue = queue.SimpleQueue()
+        self._file = None
+        self._file_size = 0
+        self._opened_at = 0.0
+        self._closed = False
+
+        # Кеш відформатованої секунди для міток часу
+        self._cached_second = None
+        self._cached_timestamp = ""
+
+        self._writer = threading.Thread(target=self._writer_loop,
+                                        name="LoggerWriter", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    def _timestamp(self, now):
+        """Мітка часу з повторним використанням форматування в межах секунди"""
+        second = int(now)
+        if second != self._cached_second:
+            self._cached_timestamp = time.strftime(
+                "%Y-%m-%d %H:%M:%S", time.localtime(second))
+            self._cached_second = second
+        return self._cached_timestamp
+
+    def log(self, level, message, echo=False):
         """Запис повідомлення в лог"""
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        log_entry = f"[{timestamp}] {level}: {message}\n"
+        if self.LEVELS.get(level, 0) < self.min_level or self._closed:
+            return
 
-        try:
-            with open(self.log_file, 'a', encoding='utf-8') as f:
-                f.write(log_entry)
-        except Exception as e:
-            print(f"Помилка запису в лог: {e}")
+        self._queue.put((time.time(), level, message, echo and self.echo))
+
+    def debug(self, message):
+        """Налагоджувальне повідомлення"""
+        self.log("DEBUG", message, echo=True)
 
     def info(self, message):
         """Інформаційне повідомлення"""
-        self.log("INFO", message)
-        print(f"INFO: {message}")
+        self.log("INFO", message, echo=True)
 
     def error(self, message):
         """Повідомлення про помилку"""
-        self.log("ERROR", message)
-        print(f"ERROR: {message}")
+        self.log("ERROR", message, echo=True)
 
     def warning(self, message):
         """Попереджувальне повідомлення"""
-        self.log("WARNING", message)
-        print(f"WARNING: {message}")
+        self.log("WARNING", message, echo=True)
+
+    def flush(self, timeout=None):
+        """Очікування запису всіх повідомлень, що вже в черзі"""
+        if self._closed or not self._writer.is_alive():
+            return False
+
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self):
+        """Скидання черги та зупинка потоку запису"""
+        if self._closed:
+            return
+
+        self._closed = True
+        self._queue.put(None)
+        self._writer.join()
+        atexit.unregister(self.close)
+
+    def _writer_loop(self):
+        """Фоновий потік: пакетний запис повідомлень з черги"""
+        running = True
+        while running:
+            items = [self._queue.get()]
+            while len(items) < self.batch_size:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            lines = []
+            events = []
+            for item in items:
+                if item is None:
+                    running = False
+                elif isinstance(item, threading.Event):
+                    events.append(item)
+                else:
+                    created, level, message, echo = item
+                    lines.append(
+                        f"[{self._timestamp(created)}] {level}: {message}\n")
+                    if echo:
+                        print(f"{level}: {message}")
+
+            if lines:
+                self._write("".join(lines))
+
+            if not running:
+                self._close_file()
+            for event in events:
+                event.set()
+
+    def _write(self, text):
+        """Запис тексту в файл з ротацією за потреби"""
+        try:
+            if self._file is None:
+                self._open_file()
+            elif self._should_rotate():
+                self._rotate()
+
+            self._file.write(text)
+            self._file.flush()
+            self._file_size += len(text.encode("utf-8"))
+        except Exception as e:
+            print(f"Помилка запису в лог: {e}")
+            self._close_file()
+
+    def _open_file(self):
+        """Відкриття файлу логу для дописування"""
+        self._file = open(self.log_file, 'a', encoding='utf-8')
+        self._file_size = self._file.tell()
+        self._opened_at = time.time()
+
+    def _close_file(self):
+        """Закриття файлу логу"""
+        if self._file is not None:
+            try:
+                self._file.close()
+            except Exception:
+                pass
+            self._file = None
+
+    def _should_rotate(self):
+        """Перевірка умов ротації за розміром та часом"""
+        if self.max_bytes and self._file_size >= self.max_bytes:
+            return True
+        if self.rotate_interval and time.time() - self._opened_at >= self.rotate_interval:
+            return True
+        return False
+
+    def _rotate(self):
+        """Ротація: datetime_app.log -> datetime_app.log.1 -> ..."""
+        self._close_file()
+
+        if self.backup_count > 0:
+            for index in range(self.backup_count - 1, 0, -1):
+                source = f"{self.log_file}.{index}"
+                if os.path.exists(source):
+                    os.replace(source, f"{self.log_file}.{index + 1}")
+            if os.path.exists(self.log_file):
+                os.replace(self.log_file, f"{self.log_file}.1")
+        elif os.path.exists(self.log_file):
+            os.remove(self.log_file)
+
+        self._open_file()
 
 
 class HolidayCalculator:
-    """Калькулятор свят та вихідних днів"""
+    """Калькулятор свят та вихідних днів
+
+    Перевірка свят, підрахунок робочих днів та свята між датами читаються
+    зі знімка календарних таблиць (calendar_snapshot.py), якщо він
+    побудований за тими самими правилами і покриває дати; інакше
+    обчислюються за правилами. get_holidays_in_year та calculate_easter
+    завжди обчислюються за правилами - з них будується знімок.
+    """
 
-    def __init__(self):
+    # Роки, за обчисленими святами яких визначається версія правил:
+    # 76 років покривають 19-річний місячний цикл разом з 4-річним циклом
+    RULES_SAMPLE_YEARS = range(2000, 2076)
+
+    def __init__(self, use_snapshot=True):
         # Фіксовані свята України
         self.fixed_holidays = {
             (1, 1): "Новий рік",
@@ -266,10 +776,51 @@ class HolidayCalculator:
             (12, 25): "Католицьке Різдво"
         }
 
+        self.use_snapshot = use_snapshot
+        self._snapshot = None
+        # Перелік свят, для якого перевірено версію правил знімка
+        self._snapshot_holidays = None
+
+    def snapshot(self):
+        """Знімок календарних таблиць для поточних правил свят або None
+
+        Спільний знімок відкривається при першому зверненні лише для
+        читання: відсутній або застарілий файл не перебудовується, а свята
+        обчислюються за правилами. Після зміни fixed_holidays версія правил
+        перевіряється знову.
+        """
+        if not self.use_snapshot:
+            return None
+
+        if self._snapshot_holidays != self.fixed_holidays:
+            from calendar_snapshot import get_snapshot
+            try:
+                snapshot = get_snapshot()
+            except (OSError, ValueError) as e:
+                print(f"Помилка відкриття знімка календаря: {e}")
+                self.use_snapshot = False
+                return None
+            if snapshot is not None and snapshot.rules_version != self.rules_version():
+                snapshot = None
+            self._snapshot = snapshot
+            self._snapshot_holidays = dict(self.fixed_holidays)
+        return self._snapshot
+
+    def _covering_snapshot(self, first_ordinal, last_ordinal):
+        """Знімок, що містить дні first_ordinal..last_ordinal, або None"""
+        snapshot = self.snapshot()
+        if snapshot is not None and snapshot.covers_days(first_ordinal, last_ordinal):
+            return snapshot
+        return None
+
     def is_holiday(self, date):
         """Перевірка чи є дата святом"""
-        if isinstance(date, str):
-            date = datetime.strptime(date, "%Y-%m-%d")
+        date = as_datetime(date)
+
+        ordinal = date.toordinal()
+        snapshot = self._covering_snapshot(ordinal, ordinal)
+        if snapshot is not None:
+            return snapshot.is_holiday(ordinal)
 
         # Перевірка фіксованих свят
         if (date.month, date.day) in self.fixed_holidays:
@@ -322,6 +873,83 @@ class HolidayCalculator:
 
         return holidays
 
+    def holidays_between(self, start, end):
+        """Свята між датами включно: список (дата, назва) за датою, одна назва на день"""
+        first = to_day_ordinal(start)
+        last = to_day_ordinal(end)
+        if last < first:
+            return []
+
+        snapshot = self._covering_snapshot(first, last)
+        if snapshot is not None:
+            return snapshot.holidays_between(first, last)
+
+        holidays = {}
+        for year in range(datetime.fromordinal(first).year, datetime.fromordinal(last).year + 1):
+            for holiday, name in self.get_holidays_in_year(year):
+                if first <= holiday.toordinal() <= last:
+                    holidays.setdefault(holiday, name)
+        return sorted(holidays.items())
+
+    def working_days(self, start, end):
+        """Робочі дні (Пн-Пт без свят) між датами включно"""
+        first = to_day_ordinal(start)
+        last = to_day_ordinal(end)
+        if last < first:
+            return 0
+
+        snapshot = self._covering_snapshot(first, last)
+        if snapshot is not None:
+            return snapshot.working_days(first, last)
+
+        holidays = sum(1 for holiday, _ in self.holidays_between(first, last)
+                       if holiday.weekday() < 5)
+        return count_working_days(first, last) - holidays
+
+    def rules_version(self):
+        """Версія правил свят: хеш свят, обчислених за роками RULES_SAMPLE_YEARS
+
+        Змінюється разом з переліком свят або алгоритмом Великодня без
+        ручного позначення змін.
+        """
+        holidays = [self.get_holidays_in_year(year) for year in self.RULES_SAMPLE_YEARS]
+        return hashlib.sha1(repr(holidays).encode('utf-8')).hexdigest()[:12]
+
+    def holiday_mask(self, dates):
+        """Позначки свят для стовпця дат: bytearray з 1 для святкових днів
+
+        Приймає DayColumn (масив порядкових номерів використовується без
+        копіювання) або послідовність дат; свята кожного року обчислюються
+        один раз.
+        """
+        ordinals = dates.ordinals if isinstance(dates, DayColumn) else DayColumn(dates).ordinals
+        if ordinals:
+            snapshot = self._covering_snapshot(min(ordinals), max(ordinals))
+            if snapshot is not None:
+                ids = snapshot.holiday_ids
+                base = snapshot.first_ordinal
+                return bytearray(1 if ids[ordinal - base] else 0 for ordinal in ordinals)
+
+        mask = bytearray(len(ordinals))
+        by_year = {}
+        holidays = set()
+        year_first = year_last = None
+
+        for position, ordinal in enumerate(ordinals):
+            # Межі та свята поточного року перераховуються лише при зміні року
+            if year_first is None or not year_first <= ordinal <= year_last:
+                year = datetime.fromordinal(ordinal).year
+                year_first = datetime(year, 1, 1).toordinal()
+                year_last = datetime(year, 12, 31).toordinal()
+                holidays = by_year.get(year)
+                if holidays is None:
+                    holidays = by_year[year] = {
+                        holiday.toordinal() for holiday, _ in self.get_holidays_in_year(year)}
+            if ordinal in holidays:
+                mask[position] = 1
+
+        return mask
+
 
 class StatisticsCalculator:
     """Калькулятор статистики використання програми"""
@@ -390,6 +1018,59 @@ def export_calculations_to_csv(calculations, filename="calculations_export.csv")
         return False
 
 
+def stream_calculations_to_csv(db_manager, user_id, filename="calculations_export.csv",
+                               chunk_size=1000, compress=None, progress_callback=None):
+    """Потоковий експорт історії користувача у CSV файл
+
+    Рядки читаються з бази порціями по chunk_size і одразу записуються,
+    тому використання пам'яті не залежить від розміру історії.
+    compress: True - gzip, None - gzip, якщо ім'я файлу закінчується на .gz.
+    progress_callback(рядків, секунд, рядків/с) викликається після кожної порції.
+
+    Повертає статистику експорту або None у разі помилки.
+    """
+    if compress is None:
+        compress = filename.endswith(".gz")
+
+    try:
+        import csv
+        import gzip
+
+        started = time.perf_counter()
+        rows = 0
+
+        if compress:
+            csvfile = gzip.open(filename, 'wt', newline='', encoding='utf-8')
+        else:
+            csvfile = open(filename, 'w', newline='', encoding='utf-8')
+
+        with csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(
+                ['Тип обчислення', 'Вхідні дані', 'Результат', 'Дата'])
+
+            for chunk in db_manager.iter_user_calculations(user_id, chunk_size):
+                writer.writerows(chunk)
+                rows += len(chunk)
+
+                if progress_callback:
+                    elapsed = time.perf_counter() - started
+                    progress_callback(rows, elapsed,
+                                      rows / elapsed if elapsed else 0.0)
+
+        elapsed = time.perf_counter() - started
+        return {
+            "rows": rows,
+            "seconds": elapsed,
+            "rows_per_second": rows / elapsed if elapsed else 0.0,
+            "bytes": os.path.getsize(filename),
+            "compressed": compress
+        }
+    except Exception as e:
+        print(f"Помилка експорту: {e}")
+        return None
+
+
 def import_calculations_from_csv(filename="calculations_import.csv"):
     """Імпорт обчислень з CSV файлу"""
     try:
@@ -410,6 +1091,162 @@ def import_calculations_from_csv(filename="calculations_import.csv"):
         return []
 
 
+# Формати часу рядків імпорту (як у export_calculations_to_csv, з частками
+# секунди або роздільником 'T'; лише дата - початок дня)
+IMPORT_TIMESTAMP_FORMATS = ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M:%S.%f",
+                            "%Y-%m-%dT%H:%M:%S", "%Y-%m-%dT%H:%M:%S.%f", "%Y-%m-%d")
+
+
+def _is_import_timestamp(value):
+    """Перевірка часу рядка імпорту за IMPORT_TIMESTAMP_FORMATS"""
+    for fmt in IMPORT_TIMESTAMP_FORMATS:
+        try:
+            datetime.strptime(value, fmt)
+            return True
+        except ValueError:
+            pass
+    return False
+
+
+def _validate_import_row(row):
+    """Перевірка рядка імпорту; повертає кортеж для збереження або None"""
+    if len(row) < 4:
+        return None
+
+    calc_type, input_data, result, created_at = row[:4]
+    if not calc_type or len(calc_type) > 50:
+        return None
+
+    created_at = created_at.strip()
+    if created_at and not _is_import_timestamp(created_at):
+        return None
+
+    return calc_type, input_data, result, created_at or None
+
+
+def _write_checkpoint(checkpoint_file, source, rows):
+    """Атомарний запис контрольної точки імпорту"""
+    temp_file = checkpoint_file + ".tmp"
+    with open(temp_file, 'w', encoding='utf-8') as f:
+        json.dump({"source": source, "rows": rows}, f)
+    os.replace(temp_file, checkpoint_file)
+
+
+def import_calculations_to_database(db_manager, user_id, filename="calculations_import.csv",
+                                    batch_size=1000, checkpoint_file=None,
+                                    use_load_data=False, progress_callback=None):
+    """Потоковий імпорт обчислень з CSV у базу даних пакетами
+
+    Файл (CSV або .csv.gz у форматі export_calculations_to_csv) читається
+    построково, рядки валідуються та зберігаються пакетами по batch_size
+    через DatabaseManager.save_calculations_batch, кожен пакет - окрема
+    транзакція. Після кожного пакета записується контрольна точка, тож
+    після збою повторний виклик продовжить з останнього збереженого пакета.
+    use_load_data=True для MySQL використовує LOAD DATA LOCAL INFILE
+    (без валідації та контрольних точок, лише для нестиснених файлів).
+    Сховища, що зберігають лише останні записи історії (history_limit),
+    не підтримуються: імпорт у них втратив би дані.
+
+    Повертає статистику імпорту або None у разі помилки читання файлу
+    чи непідтримуваного сховища.
+    """
+    started = time.perf_counter()
+
+    backend = db_manager.get_backend()
+    if backend.history_limit is not None:
+        print(f"Помилка імпорту: сховище '{backend.name}' зберігає лише "
+              f"{backend.history_limit} останніх обчислень")
+        return None
+
+    if use_load_data and getattr(db_manager, "connection", None) \
+            and not filename.endswith(".gz"):
+        loaded = db_manager.load_calculations_infile(user_id, filename)
+        if loaded is not None:
+            return {
+                "imported": loaded,
+                "invalid": 0,
+                "resumed_from": 0,
+                "rows_read": loaded,
+                "seconds": time.perf_counter() - started,
+                "completed": True
+            }
+
+    source = os.path.abspath(filename)
+    checkpoint_file = checkpoint_file or filename + ".checkpoint"
+    resume_from = 0
+
+    if os.path.exists(checkpoint_file):
+        try:
+            with open(checkpoint_file, 'r', encoding='utf-8') as f:
+                checkpoint = json.load(f)
+            if checkpoint.get("source") == source:
+                resume_from = checkpoint.get("rows", 0)
+        except Exception as e:
+            print(f"Помилка читання контрольної точки: {e}")
+
+    stats = {
+        "imported": 0,
+        "invalid": 0,
+        "resumed_from": resume_from,
+        "rows_read": resume_from,
+        "seconds": 0.0,
+        "completed": False
+    }
+
+    def flush(batch):
+        """Валідація та збереження пакета з оновленням контрольної точки"""
+        valid = [row for row in map(_validate_import_row, batch) if row]
+        stats["invalid"] += len(batch) - len(valid)
+
+        if valid and not db_manager.save_calculations_batch(user_id, valid):
+            return False
+
+        stats["imported"] += len(valid)
+        stats["rows_read"] += len(batch)
+        _write_checkpoint(checkpoint_file, source, stats["rows_read"])
+
+        if progress_callback:
+            progress_callback(stats["rows_read"],
+                              time.perf_counter() - started)
+        return True
+
+    try:
+        import csv
+        import gzip
+
+        if filename.endswith(".gz"):
+            csvfile = gzip.open(filename, 'rt', newline='', encoding='utf-8')
+        else:
+            csvfile = open(filename, 'r', newline='', encoding='utf-8')
+
+        with csvfile:
+            reader = csv.reader(csvfile)
+            next(reader, None)  # Пропускаємо заголовок
+
+            # Пропуск рядків, імпортованих до збою
+            for _ in islice(reader, resume_from):
+                pass
+
+            while True:
+                batch = list(islice(reader, batch_size))
+                if not batch:
+                    break
+                if not flush(batch):
+                    stats["seconds"] = time.perf_counter() - started
+                    return stats
+
+    except Exception as e:
+        print(f"Помилка імпорту: {e}")
+        return None
+
+    if os.path.exists(checkpoint_file):
+        os.remove(checkpoint_file)
+
+    stats["completed"] = True
+    stats["seconds"] = time.perf_counter() - started
+    return stats
+
+
 if __name__ == "__main__":
     # Тестування утиліт
     print("Тестування допоміжних функцій...")